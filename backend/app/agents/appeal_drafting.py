@@ -4,13 +4,18 @@ Appeal Drafting Agent
 Generates professional appeal letters using Claude Sonnet.
 """
 
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List
 import time
 
 from app.agents.base_agent import BaseAgent
 from app.core.llm_factory import LLMFactory
 
 
+def policy_citations(excerpts: List[Dict[str, Any]]) -> List[str]:
+    """Parent section titles of the excerpts, once each, in rank order."""
+    return list(dict.fromkeys(excerpt["section_title"] for excerpt in excerpts))
+
+
 class AppealDraftingAgent(BaseAgent):
     """
     Drafts formal appeal letters with policy citations.
@@ -47,42 +52,45 @@ Structure:
         return "AppealDraftingAgent"
     
     def format_policy_excerpts(self, excerpts: list) -> str:
-        """Format policy excerpts for prompt."""
+        """
+        Format policy excerpts for prompt.
+        
+        Chunks of the same section are listed under one title, in
+        document order, so the prompt carries only the matching text.
+        """
         if not excerpts:
             return "No specific policy excerpts available for this payer."
         
+        sections: Dict[str, Dict[str, Any]] = {}
+        for excerpt in excerpts:
+            section = sections.setdefault(
+                excerpt["id"],
+                {"title": excerpt["section_title"], "chunks": [], "relevance": excerpt["similarity_score"]}
+            )
+            section["chunks"].append((excerpt.get("chunk_index", 0), excerpt["section_text"]))
+            section["relevance"] = max(section["relevance"], excerpt["similarity_score"])
+        
         formatted = []
-        for i, excerpt in enumerate(excerpts, 1):
+        for i, section in enumerate(sections.values(), 1):
+            quotes = "\n".join(f"   \"{text}\"" for _, text in sorted(section["chunks"], key=lambda chunk: chunk[0]))
             formatted.append(
-                f"{i}. {excerpt['section_title']}\n"
-                f"   \"{excerpt['section_text']}\"\n"
-                f"   (Relevance: {excerpt['similarity_score']:.2f})"
+                f"{i}. {section['title']}\n"
+                f"{quotes}\n"
+                f"   (Relevance: {section['relevance']:.2f})"
             )
         
         return "\n\n".join(formatted)
     
-    async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Generate appeal draft.
-        
-        Args:
-            state: Contains 'claim_data', 'category', 'policy_excerpts'
-            
-        Returns:
-            state with 'draft_text' and 'policy_citations' added
-        """
+    def build_prompt(self, state: Dict[str, Any]) -> str:
+        """Build the drafting prompt from claim data and policy excerpts."""
         claim_data = state.get("claim_data", {})
         category = state.get("category", "Other")
         policy_excerpts = state.get("policy_excerpts", [])
         
-        start_time = time.time()
+        # Format policy excerpts
+        formatted_excerpts = self.format_policy_excerpts(policy_excerpts)
         
-        try:
-            # Format policy excerpts
-            formatted_excerpts = self.format_policy_excerpts(policy_excerpts)
-            
-            # Prepare prompt
-            user_prompt = f"""Draft an appeal letter for this denied claim:
+        return f"""Draft an appeal letter for this denied claim:
 
 Claim ID: {claim_data.get("claim_id")}
 Payer: {claim_data.get("payer_name")}
@@ -94,51 +102,115 @@ Relevant Policy Excerpts:
 {formatted_excerpts}
 
 Draft the appeal letter:"""
+    
+    async def _record_draft(
+        self,
+        state: Dict[str, Any],
+        draft_text: str,
+        start_time: float,
+        streamed: bool = False
+    ) -> None:
+        """Store the finished draft in state and write the audit entry."""
+        claim_data = state.get("claim_data", {})
+        category = state.get("category", "Other")
+        policy_excerpts = state.get("policy_excerpts", [])
+        
+        # Extract policy citations (parent section titles)
+        citations = policy_citations(policy_excerpts)
+        
+        latency_ms = int((time.time() - start_time) * 1000)
+        
+        self.logger.info(
+            "drafting_complete",
+            draft_length=len(draft_text),
+            citations_count=len(citations),
+            latency_ms=latency_ms,
+            provider=self.llm.get_provider_name(),
+            streamed=streamed
+        )
+        
+        # Update state
+        state["draft_text"] = draft_text
+        state["policy_citations"] = citations
+        
+        # Log execution
+        await self.log_execution(
+            input_data={
+                "claim_id": claim_data.get("claim_id"),
+                "category": category,
+                "num_policies": len(policy_excerpts)
+            },
+            output_data={
+                "draft_length": len(draft_text),
+                "citations": len(citations)
+            },
+            metadata={
+                "latency_ms": latency_ms, 
+                "provider": self.llm.get_provider_name(),
+                "model": self.llm.model,
+                "streamed": streamed
+            }
+        )
+    
+    async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate appeal draft.
+        
+        Args:
+            state: Contains 'claim_data', 'category', 'policy_excerpts'
             
+        Returns:
+            state with 'draft_text' and 'policy_citations' added
+        """
+        start_time = time.time()
+        
+        try:
             # Call LLM
             draft_text = await self.llm.agenerate(
-                prompt=user_prompt,
+                prompt=self.build_prompt(state),
                 system_prompt=self.system_prompt
             )
             
-            draft_text = draft_text.strip()
-            
-            # Extract policy citations (section titles)
-            policy_citations = [
-                excerpt["section_title"] 
-                for excerpt in policy_excerpts
-            ]
+            await self._record_draft(state, draft_text.strip(), start_time)
             
-            latency_ms = int((time.time() - start_time) * 1000)
-            
-            self.logger.info(
-                "drafting_complete",
-                draft_length=len(draft_text),
-                citations_count=len(policy_citations),
-                latency_ms=latency_ms,
-                provider=self.llm.get_provider_name()
-            )
+        except Exception as e:
+            self.logger.error("drafting_failed", error=str(e))
+            state["draft_text"] = ""
+            state["policy_citations"] = []
+            state["error"] = f"Appeal drafting failed: {str(e)}"
+        
+        return state
+    
+    async def astream_draft(self, state: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Generate the appeal draft, yielding text as the LLM produces it.
+        
+        Once the stream finishes, state is updated exactly as execute()
+        would update it, so downstream agents can run unchanged.
+        
+        Args:
+            state: Contains 'claim_data', 'category', 'policy_excerpts'
             
-            # Update state
-            state["draft_text"] = draft_text
-            state["policy_citations"] = policy_citations
+        Yields:
+            Draft text fragments
+        """
+        start_time = time.time()
+        fragments = []
+        first_token_ms = None
+        
+        try:
+            async for token in self.llm.astream(
+                prompt=self.build_prompt(state),
+                system_prompt=self.system_prompt
+            ):
+                if first_token_ms is None:
+                    first_token_ms = int((time.time() - start_time) * 1000)
+                    self.logger.info("drafting_first_token", latency_ms=first_token_ms)
+                fragments.append(token)
+                yield token
             
-            # Log execution
-            await self.log_execution(
-                input_data={
-                    "claim_id": claim_data.get("claim_id"),
-                    "category": category,
-                    "num_policies": len(policy_excerpts)
-                },
-                output_data={
-                    "draft_length": len(draft_text),
-                    "citations": len(policy_citations)
-                },
-                metadata={
-                    "latency_ms": latency_ms, 
-                    "provider": self.llm.get_provider_name(),
-                    "model": self.llm.model
-                }
+            await self._record_draft(
+                state, "".join(fragments).strip(), start_time, streamed=True
             )
             
         except Exception as e:
@@ -146,5 +218,3 @@ Draft the appeal letter:"""
             state["draft_text"] = ""
             state["policy_citations"] = []
             state["error"] = f"Appeal drafting failed: {str(e)}"
-        
-        return state
@@ -0,0 +1,223 @@
+"""
+Denial Code Rule Table
+
+Deterministic CARC/RARC → category rules consulted by
+DenialClassifierAgent before it calls the LLM.
+
+Rules live in a JSON file (rules/denial_code_rules.json by default) and
+are compiled into dictionary lookups and regexes on load. The file is
+re-checked at most every CLASSIFIER_RULES_RELOAD_SECONDS and reloaded
+when its modification time changes, so the table can be tuned without a
+restart. A reload that fails to parse keeps the previous table.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple
+import json
+import re
+import time
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "rules" / "denial_code_rules.json"
+
+CONFIDENCE_LEVELS = {"low": 1, "medium": 2, "high": 3}
+
+CLAIM_CATEGORIES = ("Coverage", "Medical Necessity", "Coding", "Authorization", "Other")
+
+GROUP_CODES = ("CO", "PR", "OA", "PI", "CR")
+
+# Matches "CO-197", "CO 197", "CO197", "197", and RARC codes like "N386"/"MA130"
+_CODE_PATTERN = re.compile(
+    r"\b(?:(?P<group>" + "|".join(GROUP_CODES) + r")[\s-]*)?(?P<code>[A-Z]{0,2}\d{1,4})\b"
+)
+
+
+class RuleMatch:
+    """Outcome of a rule-table lookup."""
+
+    def __init__(
+        self,
+        code: str,
+        category: str,
+        confidence: str,
+        contradicted: bool,
+        table_version: str
+    ):
+        self.code = code
+        self.category = category
+        self.confidence = confidence
+        self.contradicted = contradicted
+        self.table_version = table_version
+
+    def is_decisive(self, min_confidence: str) -> bool:
+        """True if this match may replace the LLM call."""
+        return (
+            not self.contradicted
+            and CONFIDENCE_LEVELS[self.confidence] >= CONFIDENCE_LEVELS[min_confidence]
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "code": self.code,
+            "category": self.category,
+            "confidence": self.confidence,
+            "contradicted": self.contradicted,
+            "table_version": self.table_version
+        }
+
+
+class DenialRuleTable:
+    """
+    Compiled, hot-reloadable code → category table.
+
+    lookup() returns None when no code matches or the matched codes
+    disagree on the category; the caller should then use the LLM.
+    """
+
+    def __init__(self, path: Path, reload_seconds: float = 30.0):
+        self.path = Path(path)
+        self.reload_seconds = reload_seconds
+        self.version = "unloaded"
+        self._rules: Dict[Tuple[Optional[str], str], Tuple[str, str]] = {}
+        self._keywords: Dict[str, Pattern] = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self.logger = logger.bind(component="denial_rule_table")
+
+    def load(self) -> None:
+        """(Re)compile the table from disk."""
+        mtime = self.path.stat().st_mtime
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        rules: Dict[Tuple[Optional[str], str], Tuple[str, str]] = {}
+        for rule in data.get("rules", []):
+            confidence = rule.get("confidence", "medium")
+            if confidence not in CONFIDENCE_LEVELS:
+                raise ValueError(f"Unknown confidence '{confidence}' for code {rule.get('code')}")
+
+            parsed = _CODE_PATTERN.fullmatch(rule["code"].strip().upper())
+            if not parsed:
+                raise ValueError(f"Invalid denial code in rule table: {rule['code']}")
+
+            key = (parsed.group("group"), parsed.group("code"))
+            rules[key] = (rule["category"], confidence)
+
+        keywords = {
+            category: re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+            for category, patterns in data.get("category_keywords", {}).items()
+            if patterns
+        }
+
+        self._rules = rules
+        self._keywords = keywords
+        self._mtime = mtime
+        self.version = str(data.get("version", mtime))
+        self.logger.info("denial_rules_loaded", rules=len(rules), version=self.version)
+
+    def maybe_reload(self) -> None:
+        """Reload if the file changed; throttled to one stat per interval."""
+        now = time.monotonic()
+        if self._mtime is not None and now - self._checked_at < self.reload_seconds:
+            return
+        self._checked_at = now
+
+        try:
+            if self._mtime is None or self.path.stat().st_mtime != self._mtime:
+                self.load()
+        except Exception as e:
+            # Keep serving the last good table
+            self.logger.error("denial_rules_reload_failed", path=str(self.path), error=str(e))
+
+    @staticmethod
+    def parse_codes(denial_code: str) -> List[Tuple[Optional[str], str]]:
+        """Extract (group, code) pairs from a raw denial code string."""
+        return [
+            (m.group("group"), m.group("code"))
+            for m in _CODE_PATTERN.finditer((denial_code or "").upper())
+        ]
+
+    def _contradicts(self, category: str, description: str) -> bool:
+        """
+        True if the description points at a different category.
+
+        A description that mentions the rule's own category is never
+        treated as contradictory, even if it also uses other keywords
+        (e.g. CO-50 "non-covered ... not deemed a medical necessity").
+        """
+        if not description:
+            return False
+
+        own = self._keywords.get(category)
+        if own is not None and own.search(description):
+            return False
+
+        return any(
+            pattern.search(description)
+            for other, pattern in self._keywords.items()
+            if other != category
+        )
+
+    def lookup(self, denial_code: str, denial_description: str = "") -> Optional[RuleMatch]:
+        """
+        Map a denial code (CARC with optional group, and/or RARC) to a category.
+
+        Args:
+            denial_code: Raw code, e.g. "CO-197" or "CO-50, N386"
+            denial_description: Free-text reason used to detect contradictions
+
+        Returns:
+            RuleMatch, or None if no rule applies or matched rules disagree
+        """
+        self.maybe_reload()
+
+        matches = []
+        for group, code in self.parse_codes(denial_code):
+            rule = self._rules.get((group, code)) or self._rules.get((None, code))
+            if rule:
+                label = f"{group}-{code}" if group else code
+                matches.append((label, rule))
+
+        if not matches:
+            return None
+
+        categories = {category for _, (category, _) in matches}
+        if len(categories) > 1:
+            return None
+
+        # Strongest evidence among the agreeing codes
+        label, (category, confidence) = max(
+            matches, key=lambda m: CONFIDENCE_LEVELS[m[1][1]]
+        )
+
+        return RuleMatch(
+            code=label,
+            category=category,
+            confidence=confidence,
+            contradicted=self._contradicts(category, denial_description),
+            table_version=self.version
+        )
+
+
+# Global rule table instance
+denial_rule_table = DenialRuleTable(
+    Path(settings.CLASSIFIER_RULES_PATH) if settings.CLASSIFIER_RULES_PATH else DEFAULT_RULES_PATH,
+    reload_seconds=settings.CLASSIFIER_RULES_RELOAD_SECONDS
+)
+
+
+def provisional_category(denial_code: str, denial_description: str = "") -> str:
+    """
+    Category from the rule table alone, without the LLM.
+
+    Used where the classifier's answer isn't available yet (retrieval
+    runs alongside it); anything the table can't settle is "Other".
+    """
+    match = denial_rule_table.lookup(denial_code or "", denial_description or "")
+    if match is None or match.contradicted:
+        return "Other"
+    return match.category
@@ -2,15 +2,25 @@
 Compliance Guardrail Agent
 
 Validates appeal drafts for compliance, tone, and completeness.
+
+Deterministic checks (compliance_rules) run first; only drafts that
+pass them are sent to the LLM, which judges the subjective criteria.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, List
 import time
 import json
 
+from app.agents.appeal_drafting import policy_citations
 from app.agents.base_agent import BaseAgent
+from app.agents.compliance_rules import precheck_draft
+from app.core.config import settings
 from app.core.llm_factory import LLMFactory
 
+# Criteria the LLM judges once the deterministic pre-checks have passed
+SUBJECTIVE_CRITERIA = ("tone_compliant", "citations_valid", "addresses_denial")
+ALL_CRITERIA = SUBJECTIVE_CRITERIA + ("length_appropriate",)
+
 
 class ComplianceGuardrailAgent(BaseAgent):
     """
@@ -22,6 +32,10 @@ class ComplianceGuardrailAgent(BaseAgent):
     - Addresses denial reason
     - Appropriate length
     - No hallucinations
+    
+    Length, claim ID, denial code, letter sections, banned phrases and
+    citation of a provided section are checked deterministically; a
+    failing draft is rejected without an LLM call.
     """
     
     def __init__(self):
@@ -48,35 +62,56 @@ Respond ONLY with valid JSON:
   "length_appropriate": true/false,
   "issues": ["list of specific issues found, or empty array"]
 }"""
+        
+        # Prompt used after the pre-checks passed (length is already known)
+        self.subjective_prompt = """You are a compliance officer reviewing appeal letters.
+
+The letter has already passed automated checks for length, claim and
+denial references, letter structure, banned phrases, and citation of at
+least one provided policy section. Evaluate only these criteria:
+
+1. TONE: Is the letter professional, respectful, and non-accusatory?
+2. CITATIONS: Does it reference only the provided policy excerpts (no fabrications)?
+3. ADDRESSES_DENIAL: Does it directly address the denial reason?
+
+Respond ONLY with valid JSON:
+{
+  "tone_compliant": true/false,
+  "citations_valid": true/false,
+  "addresses_denial": true/false,
+  "issues": ["list of specific issues found, or empty array"]
+}"""
     
     def get_name(self) -> str:
         return "ComplianceGuardrailAgent"
     
-    async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def evaluate_with_llm(
+        self,
+        draft_text: str,
+        citations: List[str],
+        claim_data: Dict[str, Any],
+        subjective_only: bool
+    ) -> Dict[str, Any]:
         """
-        Validate appeal draft.
+        Ask the LLM to evaluate the draft.
         
         Args:
-            state: Contains 'draft_text', 'policy_excerpts', 'claim_data'
+            draft_text: Appeal letter
+            citations: Provided policy section titles
+            claim_data: Claim fields (denial description is used)
+            subjective_only: Pre-checks passed; ask only for SUBJECTIVE_CRITERIA
             
         Returns:
-            state with 'compliance_passed' and 'compliance_issues' added
+            Parsed evaluation (all criteria false if the response isn't JSON)
         """
-        draft_text = state.get("draft_text", "")
-        policy_excerpts = state.get("policy_excerpts", [])
-        claim_data = state.get("claim_data", {})
+        # Format policy excerpts (one line per parent section)
+        formatted_excerpts = "\n".join([
+            f"- {title}" 
+            for title in citations
+        ])
         
-        start_time = time.time()
-        
-        try:
-            # Format policy excerpts
-            formatted_excerpts = "\n".join([
-                f"- {e['section_title']}" 
-                for e in policy_excerpts
-            ])
-            
-            # Prepare prompt
-            user_prompt = f"""Review this appeal draft:
+        # Prepare prompt
+        user_prompt = f"""Review this appeal draft:
 
 DRAFT:
 {draft_text}
@@ -88,34 +123,75 @@ DENIAL REASON:
 {claim_data.get("denial_description")}
 
 Compliance evaluation (JSON only):"""
+        
+        # Call LLM
+        response = await self.llm.agenerate(
+            prompt=user_prompt,
+            system_prompt=self.subjective_prompt if subjective_only else self.system_prompt
+        )
+        
+        # Parse JSON response
+        try:
+            return json.loads(response.strip())
+        except json.JSONDecodeError:
+            # Fallback: treat as non-compliant if can't parse
+            self.logger.warning("failed_to_parse_compliance_json")
+            return {
+                **{criterion: False for criterion in ALL_CRITERIA},
+                "issues": ["Failed to parse compliance evaluation"]
+            }
+    
+    async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate appeal draft.
+        
+        Args:
+            state: Contains 'draft_text', 'policy_excerpts', 'claim_data'
             
-            # Call LLM
-            response = await self.llm.agenerate(
-                prompt=user_prompt,
-                system_prompt=self.system_prompt
-            )
+        Returns:
+            state with 'compliance_passed' and 'compliance_issues' added
+        """
+        draft_text = state.get("draft_text", "")
+        policy_excerpts = state.get("policy_excerpts", [])
+        claim_data = state.get("claim_data", {})
+        
+        start_time = time.time()
+        
+        try:
+            citations = policy_citations(policy_excerpts)
             
-            # Parse JSON response
-            try:
-                compliance_result = json.loads(response.strip())
-            except json.JSONDecodeError:
-                # Fallback: treat as non-compliant if can't parse
-                self.logger.warning("failed_to_parse_compliance_json")
-                compliance_result = {
-                    "tone_compliant": False,
-                    "citations_valid": False,
-                    "addresses_denial": False,
-                    "length_appropriate": False,
-                    "issues": ["Failed to parse compliance evaluation"]
-                }
+            precheck = None
+            if settings.COMPLIANCE_PRECHECK_ENABLED:
+                precheck = precheck_draft(
+                    draft_text,
+                    claim_data,
+                    citations,
+                    min_words=settings.COMPLIANCE_MIN_WORDS,
+                    max_words=settings.COMPLIANCE_MAX_WORDS
+                )
+            
+            if precheck and not precheck.passed:
+                compliance_result = {"issues": precheck.issues}
+                compliance_path = "precheck"
+            else:
+                compliance_result = await self.evaluate_with_llm(
+                    draft_text,
+                    citations,
+                    claim_data,
+                    subjective_only=precheck is not None
+                )
+                if precheck:
+                    compliance_result["length_appropriate"] = True
+                compliance_path = "llm"
+            
+            if precheck:
+                compliance_result["precheck"] = precheck.to_dict()
+            compliance_result["path"] = compliance_path
             
             # Determine if passed
-            compliance_passed = all([
-                compliance_result.get("tone_compliant", False),
-                compliance_result.get("citations_valid", False),
-                compliance_result.get("addresses_denial", False),
-                compliance_result.get("length_appropriate", False)
-            ])
+            compliance_passed = compliance_path == "llm" and all(
+                compliance_result.get(criterion, False) for criterion in ALL_CRITERIA
+            )
             
             issues = compliance_result.get("issues", [])
             
@@ -124,9 +200,10 @@ Compliance evaluation (JSON only):"""
             self.logger.info(
                 "compliance_check_complete",
                 passed=compliance_passed,
+                path=compliance_path,
                 issues_count=len(issues),
                 latency_ms=latency_ms,
-                provider=self.llm.get_provider_name()
+                provider=self.llm.get_provider_name() if compliance_path == "llm" else None
             )
             
             # Update state
@@ -139,12 +216,14 @@ Compliance evaluation (JSON only):"""
                 input_data={"draft_length": len(draft_text)},
                 output_data={
                     "passed": compliance_passed,
-                    "issues": issues
+                    "path": compliance_path,
+                    "issues": issues,
+                    "precheck": compliance_result.get("precheck")
                 },
                 metadata={
                     "latency_ms": latency_ms,
-                    "provider": self.llm.get_provider_name(),
-                    "model": self.llm.model
+                    "provider": self.llm.get_provider_name() if compliance_path == "llm" else None,
+                    "model": self.llm.model if compliance_path == "llm" else None
                 }
             )
             
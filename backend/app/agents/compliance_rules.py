@@ -0,0 +1,173 @@
+"""
+Compliance Pre-checks
+
+Deterministic appeal-draft checks run by ComplianceGuardrailAgent
+before it calls the LLM: word count, claim ID and denial code, required
+letter sections, a banned-phrase/tone lexicon, and citation of at least
+one provided policy section.
+
+Section and lexicon patterns live in rules/compliance_lexicon.json and
+are compiled once on import. A draft that fails any check is rejected
+without an LLM call; the model only judges what cannot be computed
+(overall tone, fabricated citations, whether the denial reason is
+actually addressed).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern
+import json
+import re
+
+LEXICON_PATH = Path(__file__).parent / "rules" / "compliance_lexicon.json"
+
+_WORD = re.compile(r"[A-Za-z0-9]+(?:['’.-][A-Za-z0-9]+)*")
+_SECTION_NUMBER = re.compile(r"\b\d+(?:\.\d+)+\b")
+_TITLE_SEPARATORS = re.compile(r"^[\s\-–—:,]+|[\s\-–—:,]+$")
+
+
+def _compile(patterns: Dict[str, List[str]]) -> Dict[str, List[Pattern]]:
+    return {
+        name: [re.compile(pattern, re.IGNORECASE) for pattern in group]
+        for name, group in patterns.items()
+    }
+
+
+with open(LEXICON_PATH) as _f:
+    _lexicon = json.load(_f)
+
+LEXICON_VERSION: str = _lexicon.get("version", "unknown")
+REQUIRED_SECTIONS = _compile(_lexicon["required_sections"])
+BANNED_PHRASES = _compile(_lexicon["banned_phrases"])
+
+
+class PrecheckResult:
+    """Outcome of the deterministic checks for one draft."""
+
+    def __init__(
+        self,
+        checks: Dict[str, bool],
+        issues: List[str],
+        word_count: int,
+        cited_sections: List[str]
+    ):
+        self.checks = checks
+        self.issues = issues
+        self.word_count = word_count
+        self.cited_sections = cited_sections
+
+    @property
+    def passed(self) -> bool:
+        return all(self.checks.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "passed": self.passed,
+            "checks": self.checks,
+            "word_count": self.word_count,
+            "cited_sections": self.cited_sections,
+            "lexicon_version": LEXICON_VERSION
+        }
+
+
+def count_words(text: str) -> int:
+    """Number of words in a draft (hyphenated words and numbers count once)."""
+    return len(_WORD.findall(text))
+
+
+def _mentions(draft_text: str, reference: str) -> bool:
+    """True if the draft contains a claim ID or code, allowing any spacing or hyphen between its parts."""
+    parts = re.findall(r"[A-Za-z0-9]+", reference)
+    if not parts:
+        return False
+    pattern = r"(?<![A-Za-z0-9])" + r"[\s-]*".join(map(re.escape, parts)) + r"(?![A-Za-z0-9])"
+    return re.search(pattern, draft_text, re.IGNORECASE) is not None
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _cites(normalized_draft: str, title: str) -> bool:
+    """
+    True if the draft refers to a policy section.
+
+    Accepts the full title, its descriptive name ("Prior Authorization
+    Requirements" from "Section 5.2 - Prior Authorization Requirements"),
+    or its section number ("Section 5.2", "§ 5.2").
+    """
+    normalized_title = _normalize(title)
+    if normalized_title and normalized_title in normalized_draft:
+        return True
+
+    name = _normalize(re.sub(r"\bsection\b|§", " ", _SECTION_NUMBER.sub(" ", title), flags=re.IGNORECASE))
+    name = _TITLE_SEPARATORS.sub("", name)
+    if len(name.split()) >= 2 and name in normalized_draft:
+        return True
+
+    return any(
+        re.search(r"(?:\bsection|§)\s*" + re.escape(number) + r"(?![\d.]*\d)", normalized_draft)
+        for number in _SECTION_NUMBER.findall(title)
+    )
+
+
+def precheck_draft(
+    draft_text: str,
+    claim_data: Dict[str, Any],
+    section_titles: List[str],
+    min_words: int = 200,
+    max_words: int = 500
+) -> PrecheckResult:
+    """
+    Run the deterministic checks on an appeal draft.
+
+    Args:
+        draft_text: Appeal letter
+        claim_data: Claim fields; claim_id and denial_code are required
+            in the letter when present
+        section_titles: Titles of the provided policy excerpts; when
+            non-empty, at least one must be cited
+        min_words: Lower word-count bound (inclusive)
+        max_words: Upper word-count bound (inclusive)
+
+    Returns:
+        PrecheckResult with one entry per check and readable issues
+    """
+    checks: Dict[str, bool] = {}
+    issues: List[str] = []
+
+    word_count = count_words(draft_text)
+    checks["length"] = min_words <= word_count <= max_words
+    if not checks["length"]:
+        issues.append(f"Letter is {word_count} words; it must be between {min_words} and {max_words}")
+
+    claim_id: Optional[str] = claim_data.get("claim_id")
+    if claim_id:
+        checks["claim_id"] = _mentions(draft_text, str(claim_id))
+        if not checks["claim_id"]:
+            issues.append(f"Letter does not reference claim ID {claim_id}")
+
+    denial_code: Optional[str] = claim_data.get("denial_code")
+    if denial_code:
+        checks["denial_code"] = _mentions(draft_text, str(denial_code))
+        if not checks["denial_code"]:
+            issues.append(f"Letter does not reference denial code {denial_code}")
+
+    for section, patterns in REQUIRED_SECTIONS.items():
+        checks[f"section_{section}"] = any(pattern.search(draft_text) for pattern in patterns)
+        if not checks[f"section_{section}"]:
+            issues.append(f"Letter is missing a {section.replace('_', ' ')}")
+
+    for tone, patterns in BANNED_PHRASES.items():
+        found = [match.group(0) for pattern in patterns for match in [pattern.search(draft_text)] if match]
+        checks[f"tone_{tone}"] = not found
+        if found:
+            issues.append(f"Letter uses {tone} language: {', '.join(repr(phrase) for phrase in found)}")
+
+    normalized_draft = _normalize(draft_text)
+    cited_sections = [title for title in section_titles if _cites(normalized_draft, title)]
+    if section_titles:
+        checks["citations"] = bool(cited_sections)
+        if not cited_sections:
+            issues.append("Letter does not cite any of the provided policy sections")
+
+    return PrecheckResult(checks, issues, word_count, cited_sections)
@@ -2,12 +2,15 @@
 Denial Classifier Agent
 
 Classifies denial into predefined categories using Claude Sonnet.
+Common CARC/RARC codes are resolved from a rule table without an LLM call.
 """
 
 from typing import Any, Dict
 import time
 
 from app.agents.base_agent import BaseAgent
+from app.agents.classification_rules import CLAIM_CATEGORIES, denial_rule_table
+from app.core.config import settings
 from app.core.llm_factory import LLMFactory
 
 
@@ -45,56 +48,75 @@ Respond with ONLY the category name. No explanation or additional text."""
     def get_name(self) -> str:
         return "DenialClassifierAgent"
     
+    async def classify_with_llm(self, claim_data: Dict[str, Any]) -> str:
+        """Ask the LLM for a category and normalize its answer."""
+        # Prepare prompt
+        user_prompt = f"""Denial Code: {claim_data.get("denial_code")}
+Denial Description: {claim_data.get("denial_description")}
+Payer: {claim_data.get("payer_name")}
+
+Category:"""
+        
+        # Call LLM
+        response = await self.llm.agenerate(
+            prompt=user_prompt,
+            system_prompt=self.system_prompt
+        )
+        
+        category = response.strip()
+        
+        # Normalize category (in case LLM adds extra text)
+        return next(
+            (cat for cat in CLAIM_CATEGORIES if cat.lower() in category.lower()),
+            "Other"
+        )
+    
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Classify the denial.
         
+        The rule table is consulted first; the LLM is only called when no
+        rule is decisive (unknown or ambiguous code, low confidence, or a
+        description that contradicts the code).
+        
         Args:
             state: Contains 'claim_data'
             
         Returns:
-            state with 'category' added
+            state with 'category' and 'classification_path' added
         """
         claim_data = state.get("claim_data", {})
         
         start_time = time.time()
         
         try:
-            # Prepare prompt
-            user_prompt = f"""Denial Code: {claim_data.get("denial_code")}
-Denial Description: {claim_data.get("denial_description")}
-Payer: {claim_data.get("payer_name")}
-
-Category:"""
-            
-            # Call LLM
-            response = await self.llm.agenerate(
-                prompt=user_prompt,
-                system_prompt=self.system_prompt
-            )
+            rule_match = None
+            if settings.CLASSIFIER_RULES_ENABLED:
+                rule_match = denial_rule_table.lookup(
+                    claim_data.get("denial_code"),
+                    claim_data.get("denial_description")
+                )
             
-            category = response.strip()
-            
-            # Normalize category (in case LLM adds extra text)
-            valid_categories = ["Coverage", "Medical Necessity", "Coding", "Authorization", "Other"]
-            
-            # Find matching category
-            matched_category = next(
-                (cat for cat in valid_categories if cat.lower() in category.lower()),
-                "Other"
-            )
+            if rule_match and rule_match.is_decisive(settings.CLASSIFIER_RULES_MIN_CONFIDENCE):
+                matched_category = rule_match.category
+                classification_path = "rule"
+            else:
+                matched_category = await self.classify_with_llm(claim_data)
+                classification_path = "llm"
             
             latency_ms = int((time.time() - start_time) * 1000)
             
             self.logger.info(
                 "classification_complete",
                 category=matched_category,
+                path=classification_path,
                 latency_ms=latency_ms,
-                provider=self.llm.get_provider_name()
+                provider=self.llm.get_provider_name() if classification_path == "llm" else None
             )
             
             # Update state
             state["category"] = matched_category
+            state["classification_path"] = classification_path
             
             # Log execution
             await self.log_execution(
@@ -102,17 +124,22 @@ Category:"""
                     "denial_code": claim_data.get("denial_code"),
                     "denial_description": claim_data.get("denial_description")[:100]
                 },
-                output_data={"category": matched_category},
+                output_data={
+                    "category": matched_category,
+                    "path": classification_path,
+                    "rule": rule_match.to_dict() if rule_match else None
+                },
                 metadata={
                     "latency_ms": latency_ms, 
-                    "provider": self.llm.get_provider_name(),
-                    "model": self.llm.model
+                    "provider": self.llm.get_provider_name() if classification_path == "llm" else None,
+                    "model": self.llm.model if classification_path == "llm" else None
                 }
             )
             
         except Exception as e:
             self.logger.error("classification_failed", error=str(e))
             state["category"] = "Other"
+            state["classification_path"] = "error"
             state["error"] = f"Classification failed: {str(e)}"
         
         return state
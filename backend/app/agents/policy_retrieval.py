@@ -1,34 +1,43 @@
 """
 Policy Retrieval Agent
 
-Performs semantic search over policy documents using pgvector RAG.
+Performs semantic search over policy documents using pgvector RAG,
+optionally fused with full-text search (RETRIEVAL_MODE=hybrid). With
+RETRIEVAL_GRANULARITY=chunk the excerpts are section chunks.
+
+Results are reused from the retrieval cache (RETRIEVAL_CACHE_ENABLED)
+for the same payer, provisional category and query-embedding bucket;
+the audit entry records whether they came from the cache.
 """
 
 from typing import Any, Dict, List
 import time
-from sqlalchemy import text
-from langchain_openai import OpenAIEmbeddings
 
 from app.agents.base_agent import BaseAgent
+from app.agents.classification_rules import provisional_category
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.embedding_factory import get_embedding_provider
+from app.db.policy_index import get_policy_retriever
+from app.db.retrieval_cache import retrieval_cache
 
 
 class PolicyRetrievalAgent(BaseAgent):
     """
     Retrieves relevant policy excerpts using RAG (Retrieval-Augmented Generation).
     
-    Uses pgvector for semantic similarity search.
+    Uses pgvector for semantic similarity search; in hybrid mode the
+    denial code and description also drive a full-text match so exact
+    codes and section numbers are not lost.
     """
     
     def __init__(self):
         super().__init__()
         
-        # Initialize embeddings
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.EMBEDDING_MODEL,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        # Shared embedding provider selected by EMBEDDING_PROVIDER
+        self.embeddings = get_embedding_provider()
+        
+        # pgvector or the in-process index, per RETRIEVAL_BACKEND
+        self.retriever = get_policy_retriever()
     
     def get_name(self) -> str:
         return "PolicyRetrievalAgent"
@@ -46,6 +55,7 @@ class PolicyRetrievalAgent(BaseAgent):
         claim_data = state.get("claim_data", {})
         payer_name = claim_data.get("payer_name")
         denial_description = claim_data.get("denial_description")
+        denial_code = claim_data.get("denial_code") or ""
         
         start_time = time.time()
         
@@ -53,51 +63,36 @@ class PolicyRetrievalAgent(BaseAgent):
             # Generate query embedding
             query_embedding = await self.embeddings.aembed_query(denial_description)
             
-            # Convert to PostgreSQL array format
-            embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
-            
-            # Perform vector similarity search
-            db = SessionLocal()
-            
-            query = text("""
-                SELECT 
-                    id,
-                    section_title,
-                    section_text,
+            policy_excerpts = None
+            retrieval_source = settings.RETRIEVAL_BACKEND
+            lookup = None
+            if settings.RETRIEVAL_CACHE_ENABLED:
+                lookup = await retrieval_cache.get(
                     payer_name,
-                    1 - (embedding <=> :embedding::vector) AS similarity
-                FROM policies
-                WHERE payer_name = :payer_name
-                ORDER BY embedding <=> :embedding::vector
-                LIMIT :top_k
-            """)
+                    provisional_category(denial_code, denial_description),
+                    query_embedding
+                )
+                policy_excerpts = lookup.results
             
-            result = db.execute(
-                query,
-                {
-                    "embedding": embedding_str,
-                    "payer_name": payer_name,
-                    "top_k": settings.RAG_TOP_K
-                }
-            )
-            
-            policy_excerpts = []
-            for row in result:
-                policy_excerpts.append({
-                    "id": str(row.id),
-                    "section_title": row.section_title,
-                    "section_text": row.section_text,
-                    "payer_name": row.payer_name,
-                    "similarity_score": float(row.similarity)
-                })
-            
-            db.close()
+            if policy_excerpts is None:
+                # Vector (+ full-text) search
+                policy_excerpts = await self.retriever.search(
+                    query_embedding,
+                    payer_name,
+                    settings.RAG_TOP_K,
+                    query_text=f"{denial_code} {denial_description}"
+                )
+                if lookup is not None:
+                    retrieval_cache.put(lookup, policy_excerpts)
+            else:
+                retrieval_source = "cache"
             
             latency_ms = int((time.time() - start_time) * 1000)
             
             self.logger.info(
                 "retrieval_complete",
                 num_excerpts=len(policy_excerpts),
+                retrieval_source=retrieval_source,
                 latency_ms=latency_ms
             )
             
@@ -112,9 +107,19 @@ class PolicyRetrievalAgent(BaseAgent):
                 },
                 output_data={
                     "num_excerpts": len(policy_excerpts),
-                    "top_similarity": policy_excerpts[0]["similarity_score"] if policy_excerpts else 0
+                    "num_sections": len({e["id"] for e in policy_excerpts}),
+                    "top_similarity": max((e["similarity_score"] for e in policy_excerpts), default=0)
                 },
-                metadata={"latency_ms": latency_ms, "top_k": settings.RAG_TOP_K}
+                metadata={
+                    "latency_ms": latency_ms,
+                    "top_k": settings.RAG_TOP_K,
+                    "retrieval_mode": settings.RETRIEVAL_MODE,
+                    "retrieval_granularity": settings.RETRIEVAL_GRANULARITY,
+                    "retrieval_backend": settings.RETRIEVAL_BACKEND,
+                    "retrieval_source": retrieval_source,
+                    "cache_bucket": lookup.bucket if lookup else None,
+                    "embedding_model": self.embeddings.model
+                }
             )
             
         except Exception as e:
@@ -0,0 +1,166 @@
+"""
+Admin API Endpoints
+
+Database maintenance: pgvector index management, recall tuning, policy
+partitions and the retrieval result cache.
+"""
+
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import Optional
+
+from app.core.config import settings
+from app.db import partitions, retrieval_cache, vector_indexes
+from app.schemas.schemas import JobAccepted, VectorIndexBuildRequest, VectorRecallRequest
+from app.services.job_queue import enqueue_job, job_worker_pool
+import structlog
+
+logger = structlog.get_logger()
+
+router = APIRouter()
+
+
+@router.get("/vector-indexes")
+async def list_vector_indexes():
+    """List ANN indexes on policies.embedding and the active search settings."""
+    return {
+        "indexes": await vector_indexes.list_indexes(),
+        "search_settings": {
+            "hnsw.ef_search": settings.VECTOR_HNSW_EF_SEARCH,
+            "ivfflat.probes": settings.VECTOR_IVFFLAT_PROBES,
+            "iterative_scan": settings.VECTOR_ITERATIVE_SCAN or None,
+            "precision": settings.VECTOR_SEARCH_PRECISION,
+            "rerank_multiplier": settings.VECTOR_RERANK_MULTIPLIER
+        }
+    }
+
+
+@router.get("/vector-indexes/recommendations")
+async def recommend_vector_index(payer_name: Optional[str] = None):
+    """Suggest index parameters from the number of embedded policies."""
+    rows = await vector_indexes.count_vectors(payer_name)
+    
+    return {
+        "payer_name": payer_name,
+        "rows": rows,
+        "hnsw": vector_indexes.recommended_params("hnsw", rows),
+        "ivfflat": vector_indexes.recommended_params("ivfflat", rows)
+    }
+
+
+@router.post("/vector-indexes", response_model=JobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def build_vector_index(request: VectorIndexBuildRequest):
+    """
+    Queue a (re)build of a global or per-payer ANN index.
+    
+    The index is built with CREATE INDEX CONCURRENTLY by a background
+    worker; poll the returned job for the outcome.
+    """
+    if request.kind not in vector_indexes.INDEX_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown index kind '{request.kind}'. Supported: {', '.join(vector_indexes.INDEX_KINDS)}"
+        )
+    
+    if request.precision not in vector_indexes.INDEX_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown precision '{request.precision}'. Supported: {', '.join(vector_indexes.INDEX_COLUMNS)}"
+        )
+    
+    job = await enqueue_job(
+        vector_indexes.BUILD_VECTOR_INDEX_JOB,
+        request.model_dump(exclude_none=True),
+        max_attempts=1
+    )
+    job_worker_pool.notify()
+    
+    logger.info("vector_index_build_queued", job_id=str(job.id), kind=request.kind, payer_name=request.payer_name)
+    
+    return JobAccepted(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/api/v1/jobs/{job.id}"
+    )
+
+
+@router.delete("/vector-indexes/{name}")
+async def drop_vector_index(name: str):
+    """Drop an ANN index on policies.embedding."""
+    try:
+        await vector_indexes.drop_index(name)
+    except vector_indexes.VectorIndexError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    
+    return {"message": f"Dropped {name}"}
+
+
+@router.post("/vector-indexes/recall")
+async def measure_vector_recall(request: VectorRecallRequest):
+    """Measure recall@k and latency of ANN search against exact search."""
+    try:
+        return await vector_indexes.recall_report(
+            payer_name=request.payer_name,
+            sample_size=request.sample_size,
+            top_k=request.top_k or settings.RAG_TOP_K,
+            ef_search=request.ef_search,
+            probes=request.probes,
+            precision=request.precision,
+            rerank_multiplier=request.rerank_multiplier or settings.VECTOR_RERANK_MULTIPLIER
+        )
+    except vector_indexes.VectorIndexError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/vector-indexes/storage")
+async def get_vector_storage():
+    """Report bytes per row and index size for each embedding precision."""
+    return await vector_indexes.storage_report()
+
+
+@router.get("/policy-partitions")
+async def list_policy_partitions():
+    """List the payer partitions of the policies table."""
+    return {"partitions": await partitions.list_partitions()}
+
+
+@router.post("/policy-partitions/rebalance")
+async def rebalance_policy_partitions(min_rows: int = Query(1, ge=1)):
+    """Move every payer with at least min_rows rows in policies_default to its own partition."""
+    return {"moved": await partitions.rebalance(min_rows)}
+
+
+@router.post("/policy-partitions/{payer_name}")
+async def ensure_policy_partition(payer_name: str):
+    """Give a payer its own partition, moving its rows out of the default."""
+    return {"payer_name": payer_name, "partition": await partitions.ensure_partition(payer_name)}
+
+
+@router.post("/retrieval-cache/prewarm", response_model=JobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def prewarm_retrieval_cache(payer_name: Optional[str] = None, queries_per_payer: Optional[int] = Query(None, ge=1)):
+    """
+    Queue a job that precomputes retrieval results for each payer's
+    most frequent claim descriptions (up to queries_per_payer).
+    
+    Payers without claims are skipped. Entries are persisted and loaded by each process on its first lookup
+    for the payer; any change to the payer's policies discards them.
+    """
+    payload = {"payer_name": payer_name, "queries_per_payer": queries_per_payer}
+    job = await enqueue_job(
+        retrieval_cache.PREWARM_RETRIEVAL_CACHE_JOB,
+        {key: value for key, value in payload.items() if value is not None}
+    )
+    job_worker_pool.notify()
+    
+    logger.info("retrieval_cache_prewarm_queued", job_id=str(job.id), payer_name=payer_name)
+    
+    return JobAccepted(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/api/v1/jobs/{job.id}"
+    )
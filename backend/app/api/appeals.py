@@ -3,12 +3,13 @@ Appeals API Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 from datetime import datetime
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.models import Appeal, Claim
 from app.schemas.schemas import AppealResponse, AppealApproval
 import structlog
@@ -23,25 +24,25 @@ async def list_appeals(
     skip: int = 0,
     limit: int = 100,
     status_filter: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all appeals with optional status filter."""
-    query = db.query(Appeal)
+    query = select(Appeal)
     
     if status_filter:
-        query = query.filter(Appeal.status == status_filter)
+        query = query.where(Appeal.status == status_filter)
     
-    appeals = query.offset(skip).limit(limit).all()
-    return appeals
+    result = await db.scalars(query.offset(skip).limit(limit))
+    return result.all()
 
 
 @router.get("/{appeal_id}", response_model=AppealResponse)
 async def get_appeal(
     appeal_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific appeal by ID."""
-    appeal = db.query(Appeal).filter(Appeal.id == appeal_id).first()
+    appeal = await db.get(Appeal, appeal_id)
     
     if not appeal:
         raise HTTPException(
@@ -56,14 +57,14 @@ async def get_appeal(
 async def approve_or_reject_appeal(
     appeal_id: UUID,
     approval: AppealApproval,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Approve or reject an appeal draft.
     
     This represents the Human-in-the-Loop approval step.
     """
-    appeal = db.query(Appeal).filter(Appeal.id == appeal_id).first()
+    appeal = await db.get(Appeal, appeal_id)
     
     if not appeal:
         raise HTTPException(
@@ -82,8 +83,7 @@ async def approve_or_reject_appeal(
         appeal.user_feedback = approval.feedback
         logger.info("appeal_rejected", appeal_id=str(appeal_id), feedback=approval.feedback)
     
-    db.commit()
-    db.refresh(appeal)
+    await db.commit()
     
     return appeal
 
@@ -91,10 +91,10 @@ async def approve_or_reject_appeal(
 @router.get("/claim/{claim_id}", response_model=List[AppealResponse])
 async def get_appeals_for_claim(
     claim_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all appeals for a specific claim."""
-    claim = db.query(Claim).filter(Claim.claim_id == claim_id).first()
+    claim = await db.scalar(select(Claim).where(Claim.claim_id == claim_id))
     
     if not claim:
         raise HTTPException(
@@ -102,5 +102,5 @@ async def get_appeals_for_claim(
             detail=f"Claim {claim_id} not found"
         )
     
-    appeals = db.query(Appeal).filter(Appeal.claim_id == claim.id).all()
-    return appeals
+    result = await db.scalars(select(Appeal).where(Appeal.claim_id == claim.id))
+    return result.all()
@@ -3,11 +3,12 @@ Audit Log API Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import distinct, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.models import AuditLog, Claim
 from app.schemas.schemas import AuditLogResponse
 import structlog
@@ -22,25 +23,25 @@ async def list_audit_logs(
     skip: int = 0,
     limit: int = 100,
     agent_name: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List audit logs with optional filtering."""
-    query = db.query(AuditLog).order_by(AuditLog.created_at.desc())
+    query = select(AuditLog).order_by(AuditLog.created_at.desc())
     
     if agent_name:
-        query = query.filter(AuditLog.agent_name == agent_name)
+        query = query.where(AuditLog.agent_name == agent_name)
     
-    logs = query.offset(skip).limit(limit).all()
-    return logs
+    result = await db.scalars(query.offset(skip).limit(limit))
+    return result.all()
 
 
 @router.get("/claim/{claim_id}", response_model=List[AuditLogResponse])
 async def get_audit_trail_for_claim(
     claim_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get complete audit trail for a specific claim."""
-    claim = db.query(Claim).filter(Claim.claim_id == claim_id).first()
+    claim = await db.scalar(select(Claim).where(Claim.claim_id == claim_id))
     
     if not claim:
         raise HTTPException(
@@ -48,21 +49,20 @@ async def get_audit_trail_for_claim(
             detail=f"Claim {claim_id} not found"
         )
     
-    logs = db.query(AuditLog)\
-        .filter(AuditLog.claim_id == claim.id)\
-        .order_by(AuditLog.created_at.asc())\
-        .all()
+    result = await db.scalars(
+        select(AuditLog)
+        .where(AuditLog.claim_id == claim.id)
+        .order_by(AuditLog.created_at.asc())
+    )
     
-    return logs
+    return result.all()
 
 
 @router.get("/agents")
-async def list_agent_names(db: Session = Depends(get_db)):
+async def list_agent_names(db: AsyncSession = Depends(get_async_db)):
     """Get list of unique agent names in audit logs."""
-    from sqlalchemy import distinct
-    
-    agents = db.query(distinct(AuditLog.agent_name)).all()
+    result = await db.execute(select(distinct(AuditLog.agent_name)))
     
     return {
-        "agents": [a[0] for a in agents if a[0]]
+        "agents": [a[0] for a in result.all() if a[0]]
     }
@@ -0,0 +1,61 @@
+"""
+Batch Processing API Endpoints
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from typing import List, Optional
+from uuid import UUID
+
+from app.schemas.schemas import BatchResponse, BatchItemResponse
+from app.services.batch_processing import get_batch, list_batch_items
+import structlog
+
+logger = structlog.get_logger()
+
+router = APIRouter()
+
+
+async def _get_batch_or_404(batch_id: UUID):
+    batch = await get_batch(batch_id)
+    
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch {batch_id} not found"
+        )
+    
+    return batch
+
+
+@router.get("/{batch_id}", response_model=BatchResponse)
+async def get_batch_progress(batch_id: UUID):
+    """Get progress counters for a batch run."""
+    batch = await _get_batch_or_404(batch_id)
+    
+    return BatchResponse(
+        id=batch.id,
+        job_id=batch.job_id,
+        status=batch.status,
+        selection=batch.selection,
+        concurrency=batch.concurrency,
+        total=batch.total,
+        succeeded=batch.succeeded,
+        failed=batch.failed,
+        pending=batch.total - batch.succeeded - batch.failed,
+        created_at=batch.created_at,
+        started_at=batch.started_at,
+        finished_at=batch.finished_at
+    )
+
+
+@router.get("/{batch_id}/items", response_model=List[BatchItemResponse])
+async def get_batch_items(
+    batch_id: UUID,
+    status_filter: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100
+):
+    """List per-claim outcomes for a batch, optionally filtered by status."""
+    await _get_batch_or_404(batch_id)
+    
+    return await list_batch_items(batch_id, status_filter, skip, limit)
@@ -3,14 +3,23 @@ Claims API Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from uuid import UUID
+import json
 
-from app.db.session import get_db
-from app.models.models import Claim, AuditLog
-from app.schemas.schemas import ClaimCreate, ClaimResponse, WorkflowRequest, WorkflowResponse
-from app.services.workflow_service import execute_workflow
+from app.db.session import get_async_db, AsyncSessionLocal
+from app.models.models import Claim
+from app.schemas.schemas import (
+    ClaimCreate, ClaimResponse, WorkflowRequest, JobAccepted,
+    BatchProcessRequest, BatchAccepted
+)
+from app.core.config import settings
+from app.services.workflow_service import stream_draft
+from app.services.claim_processing import PROCESS_CLAIM_JOB, claim_to_workflow_input
+from app.services.job_queue import enqueue_job, job_worker_pool
+from app.services.batch_processing import PROCESS_BATCH_JOB, attach_job, create_batch, select_claim_ids
 from app.models.models import Appeal
 import structlog
 
@@ -22,7 +31,7 @@ router = APIRouter()
 @router.post("/", response_model=ClaimResponse, status_code=status.HTTP_201_CREATED)
 async def create_claim(
     claim_data: ClaimCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new claim record.
@@ -31,7 +40,7 @@ async def create_claim(
     Use POST /claims/{claim_id}/process to trigger the appeal workflow.
     """
     # Check if claim_id already exists
-    existing = db.query(Claim).filter(Claim.claim_id == claim_data.claim_id).first()
+    existing = await db.scalar(select(Claim.id).where(Claim.claim_id == claim_data.claim_id))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -48,8 +57,7 @@ async def create_claim(
     )
     
     db.add(claim)
-    db.commit()
-    db.refresh(claim)
+    await db.commit()
     
     logger.info("claim_created", claim_id=claim_data.claim_id)
     
@@ -60,20 +68,20 @@ async def create_claim(
 async def list_claims(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all claims with pagination."""
-    claims = db.query(Claim).offset(skip).limit(limit).all()
-    return claims
+    result = await db.scalars(select(Claim).offset(skip).limit(limit))
+    return result.all()
 
 
 @router.get("/{claim_id}", response_model=ClaimResponse)
 async def get_claim(
     claim_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific claim by claim_id."""
-    claim = db.query(Claim).filter(Claim.claim_id == claim_id).first()
+    claim = await db.scalar(select(Claim).where(Claim.claim_id == claim_id))
     
     if not claim:
         raise HTTPException(
@@ -84,25 +92,27 @@ async def get_claim(
     return claim
 
 
-@router.post("/process", response_model=WorkflowResponse)
+@router.post("/process", response_model=JobAccepted, status_code=status.HTTP_202_ACCEPTED)
 async def process_claim(
     request: WorkflowRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Process a claim through the full agent workflow.
+    Queue a claim for processing through the full agent workflow.
     
-    This triggers:
+    The workflow runs on a background worker:
     1. IntentRouter
     2. DenialClassifier
     3. PolicyRetrieval (RAG)
     4. AppealDrafting
     5. ComplianceGuardrail
     
-    Returns the generated appeal draft for human approval.
+    Returns 202 with a job id; poll GET /api/v1/jobs/{job_id} until it
+    succeeds, at which point `result` holds the WorkflowResponse with the
+    generated appeal draft for human approval.
     """
-    # Fetch claim
-    claim = db.query(Claim).filter(Claim.claim_id == request.claim_id).first()
+    # Fail fast on unknown claims instead of queueing a doomed job
+    claim = await db.scalar(select(Claim.id).where(Claim.claim_id == request.claim_id))
     
     if not claim:
         raise HTTPException(
@@ -110,53 +120,158 @@ async def process_claim(
             detail=f"Claim {request.claim_id} not found"
         )
     
-    # Prepare claim data for workflow
-    claim_data = {
-        "claim_id": claim.claim_id,
-        "denial_code": claim.denial_code,
-        "denial_description": claim.denial_description,
-        "payer_name": claim.payer_name,
-        "policy_text": claim.policy_text
-    }
-    
-    # Execute workflow
-    logger.info("workflow_triggered", claim_id=request.claim_id)
-    
-    final_state = await execute_workflow(claim_data)
-    
-    # Update claim with category
-    if final_state.get("category"):
-        claim.category = final_state["category"]
-        db.commit()
-    
-    # Create appeal record if draft was generated
-    appeal_id = None
-    if final_state.get("draft_text"):
-        appeal = Appeal(
-            claim_id=claim.id,
-            draft_text=final_state["draft_text"],
-            policy_citations=final_state.get("policy_citations", []),
-            status="draft",
-            compliance_issues=final_state.get("compliance_issues", []),
-            retry_count=final_state.get("retry_count", 0)
+    job = await enqueue_job(PROCESS_CLAIM_JOB, {"claim_id": request.claim_id})
+    job_worker_pool.notify()
+    
+    logger.info("workflow_queued", claim_id=request.claim_id, job_id=str(job.id))
+    
+    return JobAccepted(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/api/v1/jobs/{job.id}"
+    )
+
+
+@router.post("/process-batch", response_model=BatchAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def process_claims_batch(request: BatchProcessRequest):
+    """
+    Queue many claims for processing as one batch.
+    
+    Select claims by explicit claim_ids, a filter (payer_name, category,
+    created_after/created_before), or both (ids narrowed by the filter).
+    Claims run with bounded concurrency on a background worker and each
+    result is persisted as soon as it completes.
+    
+    Returns 202 with the batch id; poll GET /api/v1/batches/{batch_id}
+    for progress and /api/v1/batches/{batch_id}/items for per-claim outcomes.
+    """
+    has_filter = any([
+        request.payer_name, request.category, request.created_after, request.created_before
+    ])
+    if request.claim_ids is None and not has_filter:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide claim_ids and/or at least one filter"
+        )
+    
+    if request.claim_ids is not None and len(set(request.claim_ids)) > settings.BATCH_MAX_CLAIMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch lists {len(set(request.claim_ids))} claim ids; the limit is {settings.BATCH_MAX_CLAIMS}"
         )
-        db.add(appeal)
-        db.commit()
-        db.refresh(appeal)
-        appeal_id = appeal.id
-        
-        logger.info("appeal_draft_created", claim_id=request.claim_id, appeal_id=str(appeal_id))
-    
-    # Determine success
-    success = final_state.get("routing_decision") == "proceed" and final_state.get("draft_text") is not None
-    
-    return WorkflowResponse(
-        success=success,
-        claim_id=request.claim_id,
-        appeal_id=appeal_id,
-        category=final_state.get("category"),
-        draft_text=final_state.get("draft_text"),
-        policy_citations=final_state.get("policy_citations"),
-        compliance_issues=final_state.get("compliance_issues"),
-        message="Appeal draft generated successfully" if success else final_state.get("validation_message", "Workflow failed")
+    
+    # One past the limit is enough to tell a filter selects too many
+    claim_ids = await select_claim_ids(
+        claim_ids=request.claim_ids,
+        payer_name=request.payer_name,
+        category=request.category,
+        created_after=request.created_after,
+        created_before=request.created_before,
+        limit=settings.BATCH_MAX_CLAIMS + 1
+    )
+    
+    if not claim_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No claims match the batch selection"
+        )
+    
+    if len(claim_ids) > settings.BATCH_MAX_CLAIMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch selects more than {settings.BATCH_MAX_CLAIMS} claims; narrow the filter"
+        )
+    
+    concurrency = min(
+        request.concurrency or settings.BATCH_DEFAULT_CONCURRENCY,
+        settings.BATCH_MAX_CONCURRENCY
+    )
+    
+    selection = request.model_dump(mode="json", exclude={"claim_ids", "concurrency"}, exclude_none=True)
+    if request.claim_ids is not None:
+        selection["claim_ids_requested"] = len(request.claim_ids)
+    
+    batch = await create_batch(claim_ids, concurrency, selection)
+    job = await enqueue_job(PROCESS_BATCH_JOB, {"batch_id": str(batch.id)})
+    await attach_job(batch.id, job.id)
+    job_worker_pool.notify()
+    
+    logger.info(
+        "batch_queued",
+        batch_id=str(batch.id),
+        job_id=str(job.id),
+        total=batch.total,
+        concurrency=concurrency
+    )
+    
+    return BatchAccepted(
+        batch_id=batch.id,
+        job_id=job.id,
+        total=batch.total,
+        status_url=f"/api/v1/batches/{batch.id}"
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a single server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/{claim_id}/draft/stream")
+async def stream_claim_draft(
+    claim_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Process a claim and stream the appeal draft as Server-Sent Events.
+    
+    Events:
+    - context: category and policy citations, sent before drafting starts
+    - token: {"text": ...} fragments of the draft as they are generated
+    - done: final draft, compliance result and the created appeal_id
+    - error: {"message": ...} if the workflow cannot produce a draft
+    """
+    claim = await db.scalar(select(Claim).where(Claim.claim_id == claim_id))
+    
+    if not claim:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Claim {claim_id} not found"
+        )
+    
+    claim_pk = claim.id
+    claim_data = claim_to_workflow_input(claim)
+    
+    logger.info("draft_stream_triggered", claim_id=claim_id)
+    
+    async def event_stream():
+        async for event, data in stream_draft(claim_data):
+            if event == "done":
+                # The request-scoped session is closed once streaming
+                # starts, so persist results with a dedicated session
+                async with AsyncSessionLocal() as session:
+                    stored_claim = await session.get(Claim, claim_pk)
+                    if data.get("category"):
+                        stored_claim.category = data["category"]
+                    
+                    appeal = Appeal(
+                        claim_id=claim_pk,
+                        draft_text=data["draft_text"],
+                        policy_citations=data.get("policy_citations", []),
+                        status="draft",
+                        compliance_issues=data.get("compliance_issues", []),
+                        retry_count=0
+                    )
+                    session.add(appeal)
+                    await session.commit()
+                    data["appeal_id"] = str(appeal.id)
+                
+                logger.info("appeal_draft_created", claim_id=claim_id, appeal_id=data["appeal_id"])
+            
+            yield _sse_event(event, data)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
@@ -0,0 +1,33 @@
+"""
+Background Job API Endpoints
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from uuid import UUID
+
+from app.schemas.schemas import JobResponse
+from app.services.job_queue import get_job
+import structlog
+
+logger = structlog.get_logger()
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: UUID):
+    """
+    Get the status of a background job.
+
+    Poll until status is "succeeded" (result holds the job output)
+    or "failed" (error holds the last failure).
+    """
+    job = await get_job(job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+
+    return job
@@ -0,0 +1,59 @@
+"""
+Performance Metrics API Endpoints
+"""
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.core.config import settings
+from app.core.provider_registry import provider_registry
+from app.core.embedding_factory import embedding_stats
+from app.db.policy_index import retrieval_stats
+from app.services.job_queue import job_worker_pool, queue_depth
+import structlog
+
+logger = structlog.get_logger()
+
+router = APIRouter()
+
+
+def _require_metrics_enabled() -> None:
+    if not settings.ENABLE_PERFORMANCE_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Performance metrics are disabled"
+        )
+
+
+@router.get("/llm")
+async def get_llm_metrics():
+    """Get pooled LLM provider and response cache statistics."""
+    _require_metrics_enabled()
+    
+    return provider_registry.stats()
+
+
+@router.get("/jobs")
+async def get_job_metrics():
+    """Get background job queue depth and in-process worker statistics."""
+    _require_metrics_enabled()
+    
+    return {
+        "queue": await queue_depth(),
+        "workers": job_worker_pool.stats()
+    }
+
+
+@router.get("/embeddings")
+async def get_embedding_metrics():
+    """Get query-embedding cache and micro-batching statistics."""
+    _require_metrics_enabled()
+    
+    return embedding_stats()
+
+
+@router.get("/retrieval")
+async def get_retrieval_metrics():
+    """Get policy retrieval backend, in-process index and result cache statistics."""
+    _require_metrics_enabled()
+    
+    return retrieval_stats()
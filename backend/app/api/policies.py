@@ -3,13 +3,19 @@ Policies API Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from langchain_openai import OpenAIEmbeddings
+from sqlalchemy import distinct, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.models import Policy
+from app.schemas.schemas import EmbeddingRunRequest, EmbeddingRunAccepted, EmbeddingRunResponse
 from app.core.config import settings
+from app.services.job_queue import enqueue_job, get_job, job_worker_pool
+from app.services.embedding_jobs import (
+    EMBED_POLICIES_JOB, attach_job, create_embedding_run, get_embedding_run
+)
 import structlog
 
 logger = structlog.get_logger()
@@ -22,15 +28,15 @@ async def list_policies(
     payer_name: str = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all policy excerpts with optional payer filter."""
-    query = db.query(Policy)
+    query = select(Policy)
     
     if payer_name:
-        query = query.filter(Policy.payer_name == payer_name)
+        query = query.where(Policy.payer_name == payer_name)
     
-    policies = query.offset(skip).limit(limit).all()
+    policies = (await db.scalars(query.offset(skip).limit(limit))).all()
     
     return [
         {
@@ -45,53 +51,135 @@ async def list_policies(
     ]
 
 
-@router.post("/generate-embeddings")
-async def generate_embeddings(
-    db: Session = Depends(get_db)
-):
+@router.post(
+    "/generate-embeddings",
+    response_model=EmbeddingRunAccepted,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def generate_embeddings(request: Optional[EmbeddingRunRequest] = None):
     """
-    Generate embeddings for all policies that don't have them.
+    Queue a background run that embeds policies.
     
     This is a maintenance endpoint for populating the vector database.
+    By default only policies without an embedding or chunks are
+    processed; set `reembed` to rebuild them (e.g. after changing the
+    embedding model or the chunk size).
+    
+    Returns 202 with the run id; poll GET /api/v1/policies/embedding-runs/{run_id}
+    for progress.
     """
-    embeddings_model = OpenAIEmbeddings(
-        model=settings.EMBEDDING_MODEL,
-        openai_api_key=settings.OPENAI_API_KEY
+    request = request or EmbeddingRunRequest()
+    
+    run = await create_embedding_run(
+        payer_name=request.payer_name,
+        reembed=request.reembed,
+        batch_size=request.batch_size or settings.EMBEDDING_JOB_BATCH_SIZE,
+        concurrency=request.concurrency or settings.EMBEDDING_JOB_CONCURRENCY
     )
+    job = await enqueue_job(EMBED_POLICIES_JOB, {"run_id": str(run.id)})
+    await attach_job(run.id, job.id)
+    job_worker_pool.notify()
     
-    # Find policies without embeddings
-    policies_without_embeddings = db.query(Policy).filter(Policy.embedding == None).all()
+    logger.info(
+        "embedding_run_queued",
+        run_id=str(run.id),
+        job_id=str(job.id),
+        total=run.total,
+        payer_name=run.payer_name,
+        reembed=run.reembed
+    )
     
-    if not policies_without_embeddings:
-        return {"message": "All policies already have embeddings"}
+    return EmbeddingRunAccepted(
+        run_id=run.id,
+        job_id=job.id,
+        total=run.total,
+        status_url=f"/api/v1/policies/embedding-runs/{run.id}"
+    )
+
+
+async def _get_run_or_404(run_id: UUID):
+    run = await get_embedding_run(run_id)
     
-    logger.info("generating_embeddings", count=len(policies_without_embeddings))
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Embedding run {run_id} not found"
+        )
     
-    for policy in policies_without_embeddings:
-        try:
-            # Generate embedding
-            embedding = await embeddings_model.aembed_query(policy.section_text)
-            
-            # Update policy
-            policy.embedding = embedding
-            
-        except Exception as e:
-            logger.error("embedding_generation_failed", policy_id=str(policy.id), error=str(e))
+    return run
+
+
+@router.get("/embedding-runs/{run_id}", response_model=EmbeddingRunResponse)
+async def get_embedding_run_progress(run_id: UUID):
+    """Get progress counters for a policy embedding run."""
+    run = await _get_run_or_404(run_id)
     
-    db.commit()
+    return EmbeddingRunResponse(
+        id=run.id,
+        job_id=run.job_id,
+        status=run.status,
+        payer_name=run.payer_name,
+        reembed=run.reembed,
+        model=run.model,
+        batch_size=run.batch_size,
+        concurrency=run.concurrency,
+        total=run.total,
+        embedded=run.embedded,
+        remaining=run.total - run.embedded,
+        resume_after=run.resume_after,
+        error=run.error,
+        created_at=run.created_at,
+        started_at=run.started_at,
+        finished_at=run.finished_at
+    )
+
+
+@router.post(
+    "/embedding-runs/{run_id}/resume",
+    response_model=EmbeddingRunAccepted,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def resume_embedding_run(run_id: UUID):
+    """
+    Re-queue a failed embedding run; it continues from its last checkpoint.
     
-    return {
-        "message": f"Generated embeddings for {len(policies_without_embeddings)} policies"
-    }
+    A run is only resumable once its job has failed permanently; while
+    the job still has retries left, the queue resumes it on its own.
+    """
+    run = await _get_run_or_404(run_id)
+    
+    if run.status != "failed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Embedding run {run_id} is {run.status}; only failed runs can be resumed"
+        )
+    
+    job = await get_job(run.job_id) if run.job_id else None
+    if job is not None and job.status not in ("succeeded", "failed"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Embedding run {run_id} will be retried by job {job.id} ({job.status})"
+        )
+    
+    job = await enqueue_job(EMBED_POLICIES_JOB, {"run_id": str(run.id)})
+    await attach_job(run.id, job.id)
+    job_worker_pool.notify()
+    
+    logger.info("embedding_run_resumed", run_id=str(run.id), job_id=str(job.id))
+    
+    return EmbeddingRunAccepted(
+        run_id=run.id,
+        job_id=job.id,
+        total=run.total,
+        status_url=f"/api/v1/policies/embedding-runs/{run.id}"
+    )
 
 
 @router.get("/payers")
-async def list_payers(db: Session = Depends(get_db)):
+async def list_payers(db: AsyncSession = Depends(get_async_db)):
     """Get list of unique payer names in the database."""
-    from sqlalchemy import distinct
-    
-    payers = db.query(distinct(Policy.payer_name)).all()
+    result = await db.execute(select(distinct(Policy.payer_name)))
     
     return {
-        "payers": [p[0] for p in payers]
+        "payers": [p[0] for p in result.all()]
     }
@@ -4,7 +4,8 @@ Anthropic LLM Provider
 Wrapper for Claude models via Anthropic API.
 """
 
-from typing import Optional
+from typing import AsyncIterator, Optional
+import httpx
 from anthropic import AsyncAnthropic
 import structlog
 
@@ -35,16 +36,39 @@ class AnthropicLLMProvider(BaseLLMProvider):
         model: str = "claude-3-5-sonnet-20241022",
         temperature: float = 0.3,
         max_tokens: int = 1000,
-        api_key: str = None
+        api_key: str = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_retries: int = 2
     ):
         super().__init__(model, temperature, max_tokens)
         
         if not api_key:
             raise ValueError("Anthropic API key is required")
         
-        self.client = AsyncAnthropic(api_key=api_key)
+        # An injected http_client is shared across providers and owned
+        # by the caller; only close the SDK client if we created it.
+        self._owns_client = http_client is None
+        self.client = AsyncAnthropic(
+            api_key=api_key,
+            http_client=http_client,
+            max_retries=max_retries
+        )
         self.logger.info("anthropic_provider_initialized", model=model)
     
+    def _build_request(self, prompt: str, system_prompt: Optional[str]) -> dict:
+        """Build keyword arguments for messages.create()."""
+        kwargs = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        
+        if system_prompt:
+            kwargs["system"] = system_prompt
+        
+        return kwargs
+    
     async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """
         Generate text using Claude API.
@@ -57,17 +81,7 @@ class AnthropicLLMProvider(BaseLLMProvider):
             Generated text
         """
         try:
-            messages = [{"role": "user", "content": prompt}]
-            
-            kwargs = {
-                "model": self.model,
-                "max_tokens": self.max_tokens,
-                "temperature": self.temperature,
-                "messages": messages
-            }
-            
-            if system_prompt:
-                kwargs["system"] = system_prompt
+            kwargs = self._build_request(prompt, system_prompt)
             
             response = await self.client.messages.create(**kwargs)
             
@@ -77,7 +91,7 @@ class AnthropicLLMProvider(BaseLLMProvider):
                 "anthropic_generation_success",
                 prompt_length=len(prompt),
                 response_length=len(generated_text),
-                usage_tokens=response.usage.total_tokens
+                usage_tokens=response.usage.input_tokens + response.usage.output_tokens
             )
             
             return generated_text
@@ -86,5 +100,46 @@ class AnthropicLLMProvider(BaseLLMProvider):
             self.logger.error("anthropic_generation_failed", error=str(e))
             raise
     
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream text using Claude's server-sent message events.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system context
+            
+        Yields:
+            Text deltas as they are generated
+        """
+        try:
+            kwargs = self._build_request(prompt, system_prompt)
+            
+            stream = await self.client.messages.create(**kwargs, stream=True)
+            
+            response_length = 0
+            async for event in stream:
+                if event.type == "content_block_delta" and event.delta.text:
+                    response_length += len(event.delta.text)
+                    yield event.delta.text
+            
+            self.logger.info(
+                "anthropic_stream_success",
+                prompt_length=len(prompt),
+                response_length=response_length
+            )
+            
+        except Exception as e:
+            self.logger.error("anthropic_stream_failed", error=str(e))
+            raise
+    
+    async def aclose(self) -> None:
+        """Close the SDK client if this provider created it."""
+        if self._owns_client:
+            await self.client.close()
+    
     def get_provider_name(self) -> str:
         return "anthropic"
@@ -0,0 +1,85 @@
+"""
+Policy Chunking
+
+Splits policy sections into overlapping, token-bounded chunks for
+chunk-level retrieval (RETRIEVAL_GRANULARITY=chunk).
+
+Tokens are approximated with a word/punctuation split, which tracks
+BPE token counts closely enough for English policy text without
+depending on a particular model's tokenizer. Chunks end on a sentence
+boundary when one falls in the second half of the window, and each
+chunk repeats the last `overlap` tokens of the previous one so a
+sentence cut at a boundary is still retrievable as a whole.
+"""
+
+from dataclasses import dataclass
+from typing import List
+import re
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"[.!?;:]")
+
+
+@dataclass
+class Chunk:
+    """One chunk of a policy section."""
+    index: int
+    text: str
+    token_count: int
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return len(_TOKEN.findall(text))
+
+
+def chunk_text(text: str, max_tokens: int = 200, overlap: int = 40) -> List[Chunk]:
+    """
+    Split text into chunks of at most max_tokens tokens.
+
+    Args:
+        text: Section text
+        max_tokens: Upper bound on tokens per chunk
+        overlap: Tokens repeated at the start of each following chunk
+            (clamped below max_tokens / 2 so chunks always advance)
+
+    Returns:
+        Chunks in document order; a section that fits is one chunk
+        holding the whole (stripped) text
+    """
+    max_tokens = max(1, max_tokens)
+    overlap = max(0, min(overlap, (max_tokens - 1) // 2))
+
+    spans = [match.span() for match in _TOKEN.finditer(text)]
+    if len(spans) <= max_tokens:
+        stripped = text.strip()
+        return [Chunk(index=0, text=stripped, token_count=len(spans))] if stripped else []
+
+    chunks = []
+    start = 0
+    while start < len(spans):
+        end = min(start + max_tokens, len(spans))
+        if end < len(spans):
+            # Prefer ending after punctuation in the second half of the window
+            for candidate in range(end, start + max_tokens // 2, -1):
+                token_start, token_end = spans[candidate - 1]
+                if _SENTENCE_END.fullmatch(text[token_start:token_end]):
+                    end = candidate
+                    break
+
+        chunks.append(Chunk(
+            index=len(chunks),
+            text=text[spans[start][0]:spans[end - 1][1]],
+            token_count=end - start
+        ))
+        if end == len(spans):
+            break
+        # Start the overlap at a sentence boundary inside it, if any
+        start = end - overlap
+        for candidate in range(start, end):
+            token_start, token_end = spans[candidate - 1]
+            if _SENTENCE_END.fullmatch(text[token_start:token_end]):
+                start = candidate
+                break
+
+    return chunks
@@ -5,7 +5,7 @@ Manages all application settings using Pydantic Settings.
 Environment variables are loaded from .env file.
 """
 
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import Field, validator
 
@@ -29,6 +29,16 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 20
     DB_POOL_TIMEOUT: int = 30
     
+    # Vector search pool (asyncpg, pgvector binary codec)
+    VECTOR_POOL_MIN_SIZE: int = 2
+    VECTOR_POOL_MAX_SIZE: int = 10
+    VECTOR_STATEMENT_CACHE_SIZE: int = 100  # 0 when behind PgBouncer transaction pooling
+    VECTOR_HNSW_EF_SEARCH: int = 40  # HNSW candidate list per search (higher = better recall, slower)
+    VECTOR_IVFFLAT_PROBES: int = 10  # IVFFlat lists scanned per search
+    VECTOR_ITERATIVE_SCAN: str = ""  # "relaxed_order"/"strict_order" (pgvector >= 0.8); empty = off
+    VECTOR_SEARCH_PRECISION: str = "full"  # ANN first pass on "full", "halfvec" or "binary" vectors
+    VECTOR_RERANK_MULTIPLIER: int = 4  # Quantized first pass fetches top_k x this, re-ranked at full precision
+    
     # Security
     JWT_SECRET: str = Field(..., description="Secret key for JWT tokens")
     CORS_ORIGINS: str = "http://localhost:2400,http://localhost:3000"
@@ -50,6 +60,26 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "claude-3-5-sonnet-20241022"  # Used when provider=anthropic
     EMBEDDING_MODEL: str = "text-embedding-3-small"  # OpenAI embeddings
     
+    # Embeddings
+    # Options: 'openai', 'local' (Ollama /api/embed), 'hashing' (deterministic, tests/offline)
+    EMBEDDING_PROVIDER: str = "openai"
+    OLLAMA_EMBEDDING_MODEL: str = "nomic-embed-text"  # Used when EMBEDDING_PROVIDER=local
+    EMBEDDING_DIMENSION: int = 0  # 0 = the model's native dimension; must match policies.embedding
+    
+    # Embedding Cache (normalized text -> vector)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 4096  # ~6 KB each at 1536 dimensions
+    EMBEDDING_CACHE_PERSISTENT: bool = False  # Also store vectors in Postgres (shared across workers)
+    
+    # Embedding Micro-Batching (concurrent queries -> one backend call)
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0  # Upper bound on the delay added to a query
+    
+    # Policy Embedding Jobs (embed_policies)
+    EMBEDDING_JOB_BATCH_SIZE: int = 64  # Policies per provider call and per commit
+    EMBEDDING_JOB_CONCURRENCY: int = 4  # Batches embedded at once
+    
     # LLM Temperature Settings
     CLASSIFIER_TEMPERATURE: float = 0.0
     DRAFTER_TEMPERATURE: float = 0.3
@@ -60,12 +90,79 @@ class Settings(BaseSettings):
     MAX_TOKENS_DRAFTER: int = 1500
     MAX_TOKENS_GUARDRAIL: int = 500
     
+    # Denial Classifier Rule Table (CARC/RARC fast path before the LLM)
+    CLASSIFIER_RULES_ENABLED: bool = True
+    CLASSIFIER_RULES_PATH: str = ""  # Empty = bundled app/agents/rules/denial_code_rules.json
+    CLASSIFIER_RULES_MIN_CONFIDENCE: str = "high"  # low | medium | high
+    CLASSIFIER_RULES_RELOAD_SECONDS: float = 30.0
+    
+    # Compliance Pre-checks (deterministic stage before the guardrail LLM)
+    COMPLIANCE_PRECHECK_ENABLED: bool = True  # Reject drafts failing deterministic checks before the LLM
+    COMPLIANCE_MIN_WORDS: int = 200
+    COMPLIANCE_MAX_WORDS: int = 500
+    
+    # LLM Connection Pooling (shared keep-alive clients per provider)
+    LLM_POOL_MAX_CONNECTIONS: int = 100
+    LLM_POOL_MAX_KEEPALIVE: int = 20
+    LLM_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_CONNECT_TIMEOUT: float = 10.0
+    LLM_REQUEST_TIMEOUT: float = 120.0
+    
+    # LLM Response Cache (deterministic calls only)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_PERSISTENT: bool = False  # Also store responses in Postgres
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.0  # Calls above this bypass the cache
+    
     # Performance
     RAG_TOP_K: int = 3
+    RETRIEVAL_MODE: str = "hybrid"  # "hybrid" (vector + full-text, RRF-fused) or "vector"
+    RRF_K: int = 60  # Reciprocal rank fusion damping constant
+    HYBRID_CANDIDATES: int = 20  # Candidates taken from each leg before fusion
+    RETRIEVAL_GRANULARITY: str = "chunk"  # "chunk" (policy_chunks) or "section" (whole policies)
+    POLICY_CHUNK_TOKENS: int = 200  # Max (approximate) tokens per chunk
+    POLICY_CHUNK_OVERLAP: int = 40  # Tokens repeated from the previous chunk
+    RETRIEVAL_BACKEND: str = "pgvector"  # "pgvector" or "local" (in-process index, vector-only)
+    LOCAL_INDEX_DIR: str = "/tmp/claimpilot-policy-index"  # Snapshot files, shared by workers on a host
+    LOCAL_INDEX_HNSW_THRESHOLD: int = 5000  # Payers with at least this many policies use HNSW (needs hnswlib)
+    LOCAL_INDEX_REFRESH_SECONDS: float = 30.0  # How often a payer's snapshot is checked for changes
+    RETRIEVAL_BATCH_ENABLED: bool = True  # Coalesce concurrent pgvector searches into one statement
+    RETRIEVAL_BATCH_MAX_SIZE: int = 32  # Searches per statement
+    RETRIEVAL_BATCH_MAX_INFLIGHT: int = 2  # Batched statements running at once
+    RETRIEVAL_CACHE_ENABLED: bool = True  # Reuse results per (payer, category, query bucket)
+    RETRIEVAL_CACHE_HASH_BITS: int = 16  # SimHash bits of the query embedding; more = finer buckets
+    RETRIEVAL_CACHE_MAX_ENTRIES_PER_PAYER: int = 10000
+    RETRIEVAL_CACHE_PREWARM_QUERIES: int = 20  # Most frequent claim descriptions per payer to prewarm
     MAX_LLM_RETRIES: int = 3
-    LLM_RETRY_DELAY: int = 1
+    LLM_RETRY_DELAY: int = 1  # Base backoff delay (seconds), doubled per retry
+    LLM_RETRY_MAX_DELAY: float = 30.0  # Backoff cap; longer Retry-After fails fast
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive transient failures to open
+    LLM_CIRCUIT_RESET_TIMEOUT: float = 30.0  # Seconds before a half-open trial call
     MAX_COMPLIANCE_RETRIES: int = 2
     
+    # LLM Rate Limiting (per provider; active when ENABLE_RATE_LIMITING)
+    LLM_REQUESTS_PER_MINUTE: float = 50  # 0 disables the request bucket
+    LLM_TOKENS_PER_MINUTE: float = 40000  # 0 disables the token bucket
+    LLM_INITIAL_CONCURRENCY: int = 4
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_MAX_CONCURRENCY: int = 32
+    LLM_LATENCY_TARGET_MS_PER_TOKEN: float = 0.0  # 0 = only 429/overloads shrink concurrency
+    # Per-provider overrides, e.g. {"local": {"requests_per_minute": 0, "max_concurrency": 2}}
+    LLM_RATE_LIMIT_OVERRIDES: Dict[str, Dict[str, float]] = {}
+    
+    # Background Job Queue
+    JOB_WORKERS: int = 4  # Worker tasks inside the API process; 0 = standalone workers only
+    JOB_POLL_INTERVAL: float = 1.0  # Seconds between polls when the queue is empty
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 5.0  # Base delay (seconds) before a failed job is retried
+    JOB_LOCK_TIMEOUT: int = 900  # Jobs whose lock is not refreshed for this long are requeued (crashed worker)
+    
+    # Batch Processing
+    BATCH_DEFAULT_CONCURRENCY: int = 8  # Claims processed at once within one batch
+    BATCH_MAX_CONCURRENCY: int = 64
+    BATCH_MAX_CLAIMS: int = 50000
+    
     # Feature Flags
     ENABLE_AUDIT_LOGGING: bool = True
     ENABLE_PERFORMANCE_METRICS: bool = True
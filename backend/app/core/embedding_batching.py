@@ -0,0 +1,149 @@
+"""
+Embedding Micro-Batching
+
+Coalesces concurrent query embeddings into batched backend calls.
+
+Each PolicyRetrievalAgent embeds a single denial description; with many
+workflows in flight that is one embedding request per claim. The
+BatchingEmbeddingProvider holds incoming queries for at most
+EMBEDDING_BATCH_WINDOW_MS (or until EMBEDDING_BATCH_MAX_SIZE texts are
+waiting), sends them as one aembed() call and resolves each caller's
+future with its own vector.
+
+The window bounds the delay added to any query; the observed p50/p99
+added delay is reported in stats() so the window can be tuned against
+the request-count savings.
+
+It sits inside CachedEmbeddingProvider, so cache hits never wait.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import time
+import structlog
+
+from app.core.embedding_providers import BaseEmbeddingProvider
+
+logger = structlog.get_logger()
+
+# Number of recent added-delay samples used for percentiles
+DELAY_SAMPLE_SIZE = 1024
+
+
+class BatchingEmbeddingProvider(BaseEmbeddingProvider):
+    """
+    Embedding provider wrapper that micro-batches concurrent queries.
+
+    Document batches (aembed) are already batched by the caller and
+    pass straight through.
+    """
+
+    def __init__(
+        self,
+        inner: BaseEmbeddingProvider,
+        max_batch_size: int = 64,
+        window_ms: float = 5.0
+    ):
+        self.inner = inner
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000.0
+        super().__init__(inner.model, inner.dimension)
+
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._delays: Deque[float] = deque(maxlen=DELAY_SAMPLE_SIZE)
+        self._counters = {"queries": 0, "batches": 0, "largest_batch": 0, "errors": 0}
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        return await self.inner.aembed(texts)
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Queue texts for the next batch and wait for their vectors."""
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future, now))
+            futures.append(future)
+        self._counters["queries"] += len(texts)
+
+        if len(self._pending) >= self.max_batch_size or self.window == 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        """Dispatch everything pending, in batches of at most max_batch_size."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        # Callers cancelled while queued don't need a vector
+        batch = [item for item in batch if not item[1].done()]
+        if not batch:
+            return
+
+        started = time.monotonic()
+        self._delays.extend(started - enqueued for _, _, enqueued in batch)
+        self._counters["batches"] += 1
+        self._counters["largest_batch"] = max(self._counters["largest_batch"], len(batch))
+
+        try:
+            vectors = await self.inner.aembed([text for text, _, _ in batch])
+        except Exception as e:
+            self._counters["errors"] += 1
+            self.logger.warning("embedding_batch_failed", size=len(batch), error=str(e))
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def aclose(self) -> None:
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self.inner.aclose()
+
+    def get_provider_name(self) -> str:
+        return self.inner.get_provider_name()
+
+    def _percentile_ms(self, fraction: float) -> float:
+        if not self._delays:
+            return 0.0
+        ordered = sorted(self._delays)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return round(ordered[index] * 1000.0, 3)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters and recent added-delay percentiles."""
+        batches = self._counters["batches"]
+        return {
+            **self._counters,
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window * 1000.0,
+            "mean_batch_size": round(self._counters["queries"] / batches, 2) if batches else 0.0,
+            "pending": len(self._pending),
+            "added_delay_p50_ms": self._percentile_ms(0.50),
+            "added_delay_p99_ms": self._percentile_ms(0.99)
+        }
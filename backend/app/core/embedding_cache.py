@@ -0,0 +1,223 @@
+"""
+Embedding Cache
+
+Content-addressed cache for query embeddings.
+
+Denial descriptions repeat heavily (payers reuse standard CARC wording),
+so CachedEmbeddingProvider normalizes each text (Unicode NFKC, case-fold,
+collapsed whitespace) and serves repeats from:
+
+1. An in-memory LRU of float32 arrays (bounded, per process)
+2. An optional persistent Postgres tier (shared across workers)
+
+Keys include the provider, model and dimension, so switching models never
+returns stale vectors. Embeddings are deterministic per model, so entries
+do not expire. On a miss the normalized text is embedded, keeping cached
+and freshly computed vectors identical.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List
+import hashlib
+import re
+import unicodedata
+import structlog
+
+import numpy as np
+
+from app.core.embedding_providers import BaseEmbeddingProvider
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys and embedding on a miss."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip().casefold()
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory LRU + optional Postgres) embedding store.
+
+    Vectors are held as float32 arrays: 6 KB per 1536-d embedding
+    instead of ~50 KB as a list of Python floats.
+    """
+
+    def __init__(self, max_entries: int = 4096, persistent: bool = False):
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._counters = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "persistent_errors": 0
+        }
+        self.logger = logger.bind(component="embedding_cache")
+
+    @staticmethod
+    def make_key(provider: str, model: str, dimension: int, normalized_text: str) -> str:
+        """Build the content address for a normalized text."""
+        payload = "\x1f".join([provider, model, str(dimension), normalized_text])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up keys, checking memory then the persistent tier."""
+        found: Dict[str, np.ndarray] = {}
+        remaining = []
+
+        for key in keys:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                found[key] = vector
+            else:
+                remaining.append(key)
+
+        if remaining and self.persistent:
+            stored = await self._read_rows(remaining)
+            for key, vector in stored.items():
+                self._put_memory(key, vector)
+                self._counters["persistent_hits"] += 1
+            found.update(stored)
+
+        self._counters["misses"] += sum(1 for key in keys if key not in found)
+        return found
+
+    async def set_many(self, entries: Dict[str, np.ndarray], provider: str, model: str) -> None:
+        """Store vectors in every enabled tier."""
+        for key, vector in entries.items():
+            self._put_memory(key, vector)
+        self._counters["stores"] += len(entries)
+
+        if entries and self.persistent:
+            await self._write_rows(entries, provider, model)
+
+    def _put_memory(self, key: str, vector: np.ndarray) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    async def _read_rows(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        from sqlalchemy import select
+        from app.db.session import AsyncSessionLocal
+        from app.models.models import EmbeddingCacheEntry
+
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(EmbeddingCacheEntry.cache_key, EmbeddingCacheEntry.embedding)
+                    .where(EmbeddingCacheEntry.cache_key.in_(keys))
+                )
+                return {
+                    key: np.frombuffer(blob, dtype=np.float32)
+                    for key, blob in result.all()
+                }
+        except Exception as e:
+            self._counters["persistent_errors"] += 1
+            self.logger.warning("embedding_cache_read_failed", error=str(e))
+            return {}
+
+    async def _write_rows(self, entries: Dict[str, np.ndarray], provider: str, model: str) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+        from app.db.session import AsyncSessionLocal
+        from app.models.models import EmbeddingCacheEntry
+
+        statement = insert(EmbeddingCacheEntry).values([
+            {
+                "cache_key": key,
+                "provider": provider,
+                "model": model,
+                "dimension": int(vector.shape[0]),
+                "embedding": vector.tobytes()
+            }
+            for key, vector in entries.items()
+        ]).on_conflict_do_nothing(index_elements=[EmbeddingCacheEntry.cache_key])
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(statement)
+                await db.commit()
+        except Exception as e:
+            self._counters["persistent_errors"] += 1
+            self.logger.warning("embedding_cache_write_failed", error=str(e))
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the persistent tier is kept)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier configuration."""
+        hits = self._counters["memory_hits"] + self._counters["persistent_hits"]
+        lookups = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_bytes": sum(vector.nbytes for vector in self._entries.values()),
+            "persistent": self.persistent,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class CachedEmbeddingProvider(BaseEmbeddingProvider):
+    """
+    Embedding provider wrapper that serves repeated queries from the cache.
+
+    Only queries are cached; document batches (policy sections) pass
+    straight through so they don't flush the LRU. Exposes the wrapped
+    provider's name, model and dimension.
+    """
+
+    def __init__(self, inner: BaseEmbeddingProvider, cache: EmbeddingCache):
+        self.inner = inner
+        self.cache = cache
+        super().__init__(inner.model, inner.dimension)
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        return await self.inner.aembed(texts)
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed queries, calling the backend only for uncached ones."""
+        normalized = [normalize_text(text) for text in texts]
+        keys = [
+            self.cache.make_key(self.get_provider_name(), self.model, self.dimension, text)
+            for text in normalized
+        ]
+
+        found = await self.cache.get_many(list(dict.fromkeys(keys)))
+
+        # Embed each distinct missing text once
+        missing = {key: text for key, text in zip(keys, normalized) if key not in found}
+        if missing:
+            vectors = await self.inner.aembed(list(missing.values()))
+            fresh = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(missing, vectors)
+            }
+            await self.cache.set_many(fresh, self.get_provider_name(), self.model)
+            found.update(fresh)
+
+        return [found[key].tolist() for key in keys]
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def get_provider_name(self) -> str:
+        return self.inner.get_provider_name()
+
+
+# Global cache instance
+embedding_cache = EmbeddingCache(
+    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+    persistent=settings.EMBEDDING_CACHE_PERSISTENT
+)
@@ -0,0 +1,172 @@
+"""
+Embedding Provider Factory
+
+Creates the embedding provider selected by EMBEDDING_PROVIDER and
+resolves the vector dimension used by the policies table.
+"""
+
+from typing import Any, Dict, Optional
+import httpx
+import structlog
+
+from app.core.embedding_providers import BaseEmbeddingProvider, KNOWN_EMBEDDING_DIMENSIONS
+from app.core.local_embeddings import LocalEmbeddingProvider
+from app.core.openai_embeddings import OpenAIEmbeddingProvider
+from app.core.hashing_embeddings import HashingEmbeddingProvider
+from app.core.embedding_batching import BatchingEmbeddingProvider
+from app.core.embedding_cache import CachedEmbeddingProvider, embedding_cache
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Default vector size for the hashing embedder when none is configured
+HASHING_DEFAULT_DIMENSION = 1536
+
+
+class EmbeddingFactory:
+    """
+    Factory for creating embedding providers.
+
+    Centralizes provider/model selection so retrieval, the maintenance
+    endpoints and the ORM schema agree on one model and dimension.
+    """
+
+    @staticmethod
+    def default_model(provider_type: str) -> str:
+        """Return the configured embedding model for a provider type."""
+        if provider_type == "local":
+            return settings.OLLAMA_EMBEDDING_MODEL
+        if provider_type == "hashing":
+            return "hashing-v1"
+        return settings.EMBEDDING_MODEL
+
+    @staticmethod
+    def dimension(provider_type: Optional[str] = None, model: Optional[str] = None) -> int:
+        """
+        Resolve the embedding dimension.
+
+        EMBEDDING_DIMENSION wins when set; otherwise the model's native
+        dimension is used.
+
+        Raises:
+            ValueError: If the model is unknown and no dimension is configured
+        """
+        if settings.EMBEDDING_DIMENSION:
+            return settings.EMBEDDING_DIMENSION
+
+        provider_type = provider_type or settings.EMBEDDING_PROVIDER
+        if provider_type == "hashing":
+            return HASHING_DEFAULT_DIMENSION
+
+        model = model or EmbeddingFactory.default_model(provider_type)
+        if model not in KNOWN_EMBEDDING_DIMENSIONS:
+            raise ValueError(
+                f"Unknown dimension for embedding model '{model}'. "
+                "Set EMBEDDING_DIMENSION explicitly."
+            )
+        return KNOWN_EMBEDDING_DIMENSIONS[model]
+
+    @staticmethod
+    def create_provider(
+        provider_type: Optional[str] = None,
+        model: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ) -> BaseEmbeddingProvider:
+        """
+        Create an embedding provider based on configuration.
+
+        Args:
+            provider_type: Override provider (local/openai/hashing)
+            model: Override model name
+            http_client: Optional shared HTTP client (connection pool)
+
+        Returns:
+            Configured embedding provider instance
+
+        Raises:
+            ValueError: If provider type is unknown or configuration is invalid
+        """
+        provider_type = provider_type or settings.EMBEDDING_PROVIDER
+        model = model or EmbeddingFactory.default_model(provider_type)
+        dimension = EmbeddingFactory.dimension(provider_type, model)
+
+        logger.info("creating_embedding_provider", provider=provider_type, model=model, dimension=dimension)
+
+        if provider_type == "local":
+            return LocalEmbeddingProvider(
+                model=model,
+                dimension=dimension,
+                ollama_url=settings.OLLAMA_URL,
+                http_client=http_client
+            )
+
+        elif provider_type == "openai":
+            if not settings.OPENAI_API_KEY:
+                raise ValueError(
+                    "OPENAI_API_KEY is required when using 'openai' embeddings. "
+                    "Either set the environment variable or use EMBEDDING_PROVIDER=local."
+                )
+
+            return OpenAIEmbeddingProvider(
+                model=model,
+                dimension=dimension,
+                api_key=settings.OPENAI_API_KEY,
+                http_client=http_client
+            )
+
+        elif provider_type == "hashing":
+            return HashingEmbeddingProvider(model=model, dimension=dimension)
+
+        else:
+            raise ValueError(
+                f"Unknown embedding provider: {provider_type}. "
+                f"Supported: local, openai, hashing"
+            )
+
+
+_embedding_provider: Optional[BaseEmbeddingProvider] = None
+
+
+def get_embedding_provider() -> BaseEmbeddingProvider:
+    """
+    Return the process-wide embedding provider, creating it on first use.
+
+    Wrapper stack (outermost first): cache -> micro-batcher -> backend.
+    """
+    global _embedding_provider
+    if _embedding_provider is None:
+        provider = EmbeddingFactory.create_provider()
+        if settings.EMBEDDING_BATCH_ENABLED:
+            provider = BatchingEmbeddingProvider(
+                provider,
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                window_ms=settings.EMBEDDING_BATCH_WINDOW_MS
+            )
+        if settings.EMBEDDING_CACHE_ENABLED:
+            provider = CachedEmbeddingProvider(provider, embedding_cache)
+        _embedding_provider = provider
+    return _embedding_provider
+
+
+def embedding_stats() -> Dict[str, Any]:
+    """Return model, cache and micro-batching statistics."""
+    batching = None
+    provider = _embedding_provider
+    while provider is not None:
+        if isinstance(provider, BatchingEmbeddingProvider):
+            batching = provider.stats()
+        provider = getattr(provider, "inner", None)
+
+    return {
+        "model": _embedding_provider.get_model_info() if _embedding_provider else None,
+        "cache": embedding_cache.stats(),
+        "batching": batching
+    }
+
+
+async def close_embedding_provider() -> None:
+    """Release the process-wide embedding provider."""
+    global _embedding_provider
+    provider, _embedding_provider = _embedding_provider, None
+    if provider is not None:
+        await provider.aclose()
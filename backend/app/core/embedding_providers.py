@@ -0,0 +1,101 @@
+"""
+Embedding Provider Abstraction
+
+Provides a unified interface for text embedding backends, parallel to
+BaseLLMProvider:
+- Local (Ollama /api/embed, e.g. nomic-embed-text)
+- OpenAI (text-embedding-3-small/large)
+- Hashing (deterministic, dependency-free; for tests and offline demos)
+
+Retrieval and the embedding maintenance endpoints depend only on this
+interface, so the backend is chosen by EMBEDDING_PROVIDER.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+import structlog
+
+logger = structlog.get_logger()
+
+# Native output dimension of known embedding models
+KNOWN_EMBEDDING_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+    "nomic-embed-text": 768,
+    "mxbai-embed-large": 1024,
+    "all-minilm": 384,
+    "bge-m3": 1024,
+}
+
+
+class BaseEmbeddingProvider(ABC):
+    """
+    Abstract base class for embedding providers.
+
+    All providers must implement:
+    - aembed(): Embed a batch of texts
+    - get_provider_name(): Identifier for logging
+
+    Providers that hold network resources (HTTP connection pools)
+    should override aclose() to release them on shutdown.
+    """
+
+    def __init__(self, model: str, dimension: int):
+        self.model = model
+        self.dimension = dimension
+        self.logger = logger.bind(embedding_provider=self.get_provider_name())
+
+    @abstractmethod
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector of length `dimension` per input text, in order
+        """
+        pass
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed search queries.
+
+        Separate from aembed() so wrappers can treat short, repetitive
+        queries (cacheable) differently from policy documents.
+        """
+        return await self.aembed(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Embed a single search query."""
+        vectors = await self.aembed_queries([text])
+        return vectors[0]
+
+    @abstractmethod
+    def get_provider_name(self) -> str:
+        """Return provider identifier (e.g., 'local', 'openai', 'hashing')"""
+        pass
+
+    async def aclose(self) -> None:
+        """Release any network resources held by the provider."""
+        pass
+
+    def _check_dimensions(self, vectors: List[List[float]]) -> List[List[float]]:
+        """Fail loudly if the backend returned vectors of the wrong size."""
+        for vector in vectors:
+            if len(vector) != self.dimension:
+                raise ValueError(
+                    f"Embedding model '{self.model}' returned {len(vector)} dimensions, "
+                    f"expected {self.dimension}. Check EMBEDDING_DIMENSION."
+                )
+        return vectors
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """Return model configuration for logging."""
+        return {
+            "provider": self.get_provider_name(),
+            "model": self.model,
+            "dimension": self.dimension
+        }
@@ -0,0 +1,54 @@
+"""
+Hashing Embedding Provider
+
+Deterministic feature-hashing embedder with no model or network access.
+
+Each lowercase word and adjacent word pair is hashed (BLAKE2b) to a
+signed bucket of a fixed-size vector, which is then L2-normalized.
+Texts that share vocabulary get a positive cosine similarity, which is
+enough for tests, CI and offline demos; it is not a semantic model.
+"""
+
+from typing import List
+import hashlib
+import re
+
+import numpy as np
+
+from app.core.embedding_providers import BaseEmbeddingProvider
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbeddingProvider(BaseEmbeddingProvider):
+    """Deterministic, dependency-free embedding provider."""
+
+    def __init__(self, model: str = "hashing-v1", dimension: int = 1536):
+        super().__init__(model, dimension)
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed_one(self, text: str) -> List[float]:
+        """Embed a single text synchronously."""
+        vector = np.zeros(self.dimension, dtype=np.float32)
+
+        for feature in self._features(text):
+            digest = int.from_bytes(
+                hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(),
+                "little"
+            )
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dimension] += sign
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_one(text) for text in texts]
+
+    def get_provider_name(self) -> str:
+        return "hashing"
@@ -0,0 +1,291 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for deterministic LLM calls.
+
+The classifier and guardrail agents run at temperature 0.0, so an
+identical (provider, model, temperature, max_tokens, system_prompt,
+prompt) tuple always yields the same answer. CachedLLMProvider wraps any
+BaseLLMProvider and serves repeats from:
+
+1. An in-memory LRU tier (bounded, per process)
+2. An optional persistent Postgres tier (shared across workers)
+
+Both tiers honour a TTL. Calls above LLM_CACHE_MAX_TEMPERATURE bypass
+the cache entirely, and callers can opt out explicitly with bypass_cache().
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Any, Iterator, Optional, Tuple
+import hashlib
+import json
+import time
+import structlog
+
+from app.core.llm_providers import BaseLLMProvider
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Set to True inside bypass_cache() to force a live LLM call
+_cache_bypassed: ContextVar[bool] = ContextVar("llm_cache_bypassed", default=False)
+
+
+@contextmanager
+def bypass_cache() -> Iterator[None]:
+    """
+    Disable the LLM response cache for calls made inside this block.
+
+    Usage:
+        with bypass_cache():
+            text = await llm.agenerate(prompt)
+    """
+    token = _cache_bypassed.set(True)
+    try:
+        yield
+    finally:
+        _cache_bypassed.reset(token)
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory LRU + optional Postgres) response store.
+
+    Keys are SHA-256 digests of the full request, so prompts of any size
+    map to fixed-width keys.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: int = 86400,
+        persistent: bool = False
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._counters = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "evictions": 0,
+            "persistent_errors": 0
+        }
+        self.logger = logger.bind(component="llm_cache")
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        system_prompt: Optional[str],
+        prompt: str
+    ) -> str:
+        """Build the content address for a request."""
+        payload = json.dumps(
+            [provider, model, temperature, max_tokens, system_prompt or "", prompt],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def record_bypass(self) -> None:
+        """Count a call that skipped the cache."""
+        self._counters["bypassed"] += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a response, checking memory then the persistent tier."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return value
+            del self._entries[key]
+
+        if self.persistent:
+            value = await self._get_persistent(key)
+            if value is not None:
+                self._put_memory(key, value)
+                self._counters["persistent_hits"] += 1
+                return value
+
+        self._counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str, provider: str, model: str) -> None:
+        """Store a response in every enabled tier."""
+        self._put_memory(key, value)
+        self._counters["stores"] += 1
+
+        if self.persistent:
+            await self._set_persistent(key, value, provider, model)
+
+    def _put_memory(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    async def _get_persistent(self, key: str) -> Optional[str]:
+        try:
+            return await self._read_row(key)
+        except Exception as e:
+            self._counters["persistent_errors"] += 1
+            self.logger.warning("llm_cache_read_failed", error=str(e))
+            return None
+
+    async def _set_persistent(self, key: str, value: str, provider: str, model: str) -> None:
+        try:
+            await self._write_row(key, value, provider, model)
+        except Exception as e:
+            self._counters["persistent_errors"] += 1
+            self.logger.warning("llm_cache_write_failed", error=str(e))
+
+    async def _read_row(self, key: str) -> Optional[str]:
+        from sqlalchemy import select
+        from app.db.session import AsyncSessionLocal
+        from app.models.models import LLMCacheEntry
+
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(
+                select(LLMCacheEntry.response).where(
+                    LLMCacheEntry.cache_key == key,
+                    LLMCacheEntry.expires_at > datetime.utcnow()
+                )
+            )
+
+    async def _write_row(self, key: str, value: str, provider: str, model: str) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+        from app.db.session import AsyncSessionLocal
+        from app.models.models import LLMCacheEntry
+
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        statement = insert(LLMCacheEntry).values(
+            cache_key=key,
+            provider=provider,
+            model=model,
+            response=value,
+            expires_at=expires_at
+        ).on_conflict_do_update(
+            index_elements=[LLMCacheEntry.cache_key],
+            set_={"response": value, "expires_at": expires_at}
+        )
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(statement)
+            await db.commit()
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the persistent tier is kept)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier configuration."""
+        hits = self._counters["memory_hits"] + self._counters["persistent_hits"]
+        lookups = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self.persistent,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class CachedLLMProvider(BaseLLMProvider):
+    """
+    Provider wrapper that serves deterministic calls from the cache.
+
+    Exposes the wrapped provider's name, model and sampling settings so
+    agents and audit logs see the real backend.
+    """
+
+    def __init__(
+        self,
+        inner: BaseLLMProvider,
+        cache: LLMResponseCache,
+        max_temperature: float = 0.0
+    ):
+        self.inner = inner
+        self.cache = cache
+        self.max_temperature = max_temperature
+        super().__init__(inner.model, inner.temperature, inner.max_tokens)
+
+    def _cache_key(self, prompt: str, system_prompt: Optional[str]) -> Optional[str]:
+        """Return the cache key, or None when this call must not be cached."""
+        if _cache_bypassed.get() or self.temperature > self.max_temperature:
+            self.cache.record_bypass()
+            return None
+
+        return self.cache.make_key(
+            self.get_provider_name(),
+            self.model,
+            self.temperature,
+            self.max_tokens,
+            system_prompt,
+            prompt
+        )
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Return a cached response or generate and store a new one."""
+        key = self._cache_key(prompt, system_prompt)
+        if key is None:
+            return await self.inner.agenerate(prompt, system_prompt)
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            self.logger.debug("llm_cache_hit", model=self.model)
+            return cached
+
+        generated_text = await self.inner.agenerate(prompt, system_prompt)
+        await self.cache.set(key, generated_text, self.get_provider_name(), self.model)
+        return generated_text
+
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Replay a cached response or stream and store a new one."""
+        key = self._cache_key(prompt, system_prompt)
+        if key is None:
+            async for token in self.inner.astream(prompt, system_prompt):
+                yield token
+            return
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        fragments = []
+        async for token in self.inner.astream(prompt, system_prompt):
+            fragments.append(token)
+            yield token
+
+        await self.cache.set(key, "".join(fragments), self.get_provider_name(), self.model)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def get_provider_name(self) -> str:
+        return self.inner.get_provider_name()
+
+
+# Global cache instance shared by all pooled providers
+llm_response_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    persistent=settings.LLM_CACHE_PERSISTENT
+)
@@ -5,6 +5,7 @@ Creates appropriate LLM provider based on configuration.
 """
 
 from typing import Optional
+import httpx
 import structlog
 
 from app.core.llm_providers import BaseLLMProvider
@@ -28,7 +29,9 @@ class LLMFactory:
         provider_type: Optional[str] = None,
         model: Optional[str] = None,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        sdk_max_retries: int = 2
     ) -> BaseLLMProvider:
         """
         Create an LLM provider based on configuration.
@@ -38,6 +41,9 @@ class LLMFactory:
             model: Override model name
             temperature: Override temperature
             max_tokens: Override max tokens
+            http_client: Optional shared HTTP client (connection pool)
+            sdk_max_retries: Built-in SDK retries for cloud providers
+                (set to 0 when ResilientLLMProvider handles retries)
             
         Returns:
             Configured LLM provider instance
@@ -46,15 +52,20 @@ class LLMFactory:
             ValueError: If provider type is unknown or configuration is invalid
         """
         provider_type = provider_type or settings.LLM_PROVIDER
+        model = model or LLMFactory.default_model(provider_type)
+        # 0.0 is a meaningful temperature, so only fall back on None
+        temperature = 0.3 if temperature is None else temperature
+        max_tokens = max_tokens or 1000
         
         logger.info("creating_llm_provider", provider=provider_type)
         
         if provider_type == "local":
             return LocalLLMProvider(
-                model=model or "llama3.1:8b",
-                temperature=temperature or 0.3,
-                max_tokens=max_tokens or 1000,
-                ollama_url=getattr(settings, 'OLLAMA_URL', 'http://localhost:11434')
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                ollama_url=getattr(settings, 'OLLAMA_URL', 'http://localhost:11434'),
+                http_client=http_client
             )
         
         elif provider_type == "anthropic":
@@ -66,10 +77,12 @@ class LLMFactory:
                 )
             
             return AnthropicLLMProvider(
-                model=model or settings.LLM_MODEL,
-                temperature=temperature or 0.3,
-                max_tokens=max_tokens or 1000,
-                api_key=api_key
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                api_key=api_key,
+                http_client=http_client,
+                max_retries=sdk_max_retries
             )
         
         elif provider_type == "openai":
@@ -81,10 +94,12 @@ class LLMFactory:
                 )
             
             return OpenAILLMProvider(
-                model=model or "gpt-4",
-                temperature=temperature or 0.3,
-                max_tokens=max_tokens or 1000,
-                api_key=api_key
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                api_key=api_key,
+                http_client=http_client,
+                max_retries=sdk_max_retries
             )
         
         else:
@@ -93,10 +108,36 @@ class LLMFactory:
                 f"Supported: local, anthropic, openai"
             )
     
+    @staticmethod
+    def default_model(provider_type: str) -> str:
+        """Return the configured default model for a provider type."""
+        if provider_type == "local":
+            return settings.OLLAMA_MODEL
+        if provider_type == "anthropic":
+            return settings.LLM_MODEL
+        return "gpt-4"
+    
+    @staticmethod
+    def create_http_client() -> httpx.AsyncClient:
+        """Create a keep-alive HTTP client sized from pool settings."""
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(
+                settings.LLM_REQUEST_TIMEOUT,
+                connect=settings.LLM_CONNECT_TIMEOUT
+            )
+        )
+    
     @staticmethod
     def get_classifier_llm() -> BaseLLMProvider:
         """Get LLM configured for classification (temperature=0.0)."""
-        return LLMFactory.create_provider(
+        from app.core.provider_registry import provider_registry
+        
+        return provider_registry.get(
             temperature=settings.CLASSIFIER_TEMPERATURE,
             max_tokens=settings.MAX_TOKENS_CLASSIFIER
         )
@@ -104,7 +145,9 @@ class LLMFactory:
     @staticmethod
     def get_drafter_llm() -> BaseLLMProvider:
         """Get LLM configured for drafting (temperature=0.3)."""
-        return LLMFactory.create_provider(
+        from app.core.provider_registry import provider_registry
+        
+        return provider_registry.get(
             temperature=settings.DRAFTER_TEMPERATURE,
             max_tokens=settings.MAX_TOKENS_DRAFTER
         )
@@ -112,7 +155,9 @@ class LLMFactory:
     @staticmethod
     def get_guardrail_llm() -> BaseLLMProvider:
         """Get LLM configured for compliance checks (temperature=0.0)."""
-        return LLMFactory.create_provider(
+        from app.core.provider_registry import provider_registry
+        
+        return provider_registry.get(
             temperature=settings.GUARDRAIL_TEMPERATURE,
             max_tokens=settings.MAX_TOKENS_GUARDRAIL
         )
@@ -11,12 +11,35 @@ changing agent code, enabling cost optimization and local development.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Optional
 import structlog
 
 logger = structlog.get_logger()
 
 
+class LLMProviderError(Exception):
+    """
+    Provider failure carrying the details needed to decide on a retry.
+    
+    Attributes:
+        status_code: HTTP status returned by the backend, if any
+        retry_after: Server-requested wait in seconds (Retry-After), if any
+        retryable: Whether the failure is transient (connection, 429, 5xx)
+    """
+    
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        retryable: bool = False
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
 class BaseLLMProvider(ABC):
     """
     Abstract base class for LLM providers.
@@ -25,6 +48,12 @@ class BaseLLMProvider(ABC):
     - generate(): Synchronous text generation
     - agenerate(): Async text generation
     - get_provider_name(): Identifier for logging
+    
+    Providers with a native streaming API should override astream();
+    the default yields the full agenerate() result as a single chunk.
+    
+    Providers that hold network resources (HTTP connection pools)
+    should override aclose() to release them on shutdown.
     """
     
     def __init__(self, model: str, temperature: float = 0.3, max_tokens: int = 1000):
@@ -47,11 +76,32 @@ class BaseLLMProvider(ABC):
         """
         pass
     
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text as it is produced.
+        
+        Args:
+            prompt: User prompt/question
+            system_prompt: Optional system context
+            
+        Yields:
+            Text fragments in generation order
+        """
+        yield await self.agenerate(prompt, system_prompt)
+    
     @abstractmethod
     def get_provider_name(self) -> str:
         """Return provider identifier (e.g., 'local', 'anthropic', 'openai')"""
         pass
     
+    async def aclose(self) -> None:
+        """Release any network resources held by the provider."""
+        pass
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Return model configuration for logging."""
         return {
@@ -0,0 +1,327 @@
+"""
+LLM Rate Limiting
+
+Per-provider request/token quotas and an adaptive concurrency governor,
+enabled by ENABLE_RATE_LIMITING.
+
+Each provider type gets one ProviderRateLimiter shared by all of its
+pooled instances:
+- A token bucket for requests per minute
+- A token bucket for (estimated) tokens per minute
+- An AIMD concurrency limit: grows by ~1 slot per round of successful
+  calls, halves on 429/overload responses or when per-token latency
+  exceeds its target (a saturated backend decodes more slowly), so
+  throughput settles at the quota ceiling instead of collapsing into
+  retries. Only successful calls feed the latency signal; other
+  failures leave the limit unchanged
+
+RateLimitedLLMProvider sits innermost in the wrapper stack, so every
+retry attempt made by ResilientLLMProvider is also metered.
+"""
+
+from typing import AsyncIterator, Dict, Any, Optional
+import asyncio
+import math
+import time
+import structlog
+
+from app.core.llm_providers import BaseLLMProvider
+from app.core.llm_resilience import classify_error
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Rough prompt-size estimate used for token-per-minute accounting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Approximate the token count of a text."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at capacity per minute.
+
+    A capacity of 0 disables the bucket.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.refill_rate = self.capacity / 60.0
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Wait until `amount` tokens are available and take them.
+
+        Returns:
+            Seconds spent waiting
+        """
+        if self.capacity <= 0:
+            return 0.0
+
+        # A single oversized request can never exceed one full bucket
+        amount = min(amount, self.capacity)
+        waited = 0.0
+
+        # Lock keeps waiters FIFO so large requests are not starved
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.refill_rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens (e.g. when a reservation was overestimated)."""
+        if self.capacity <= 0 or amount <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit.
+
+    Additive increase: +1/limit per fast success (about +1 per round).
+    Multiplicative decrease: limit *= backoff_ratio on overload or slow calls.
+    Latency is measured per generated token so short classifier calls and
+    long drafts can share one target; a target of 0 disables it.
+    """
+
+    # Minimum spacing between decreases, so a burst of failures from the
+    # same round of calls doesn't collapse the limit to the floor
+    DECREASE_WINDOW_SECONDS = 1.0
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target_ms_per_token: float = 0.0,
+        backoff_ratio: float = 0.5
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_ms_per_token = latency_target_ms_per_token
+        self.backoff_ratio = backoff_ratio
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+        self._last_decrease = 0.0
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, ms_per_token: Optional[float], overloaded: bool = False) -> None:
+        """
+        Free a slot and adjust the limit.
+
+        Args:
+            ms_per_token: Latency of a successful call, or None for a
+                failed/abandoned one (which neither grows nor shrinks
+                the limit unless it was an overload)
+            overloaded: The provider answered 429/503/529
+        """
+        async with self._condition:
+            self.in_flight -= 1
+
+            target = self.latency_target_ms_per_token
+            if overloaded or (target and ms_per_token is not None and ms_per_token > target):
+                self._decrease()
+            elif ms_per_token is not None:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+            self._condition.notify_all()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.DECREASE_WINDOW_SECONDS:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+
+
+class ProviderRateLimiter:
+    """Request, token and concurrency governors for one provider type."""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        initial_concurrency: int,
+        min_concurrency: int,
+        max_concurrency: int,
+        latency_target_ms_per_token: float
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial_limit=initial_concurrency,
+            min_limit=min_concurrency,
+            max_limit=max_concurrency,
+            latency_target_ms_per_token=latency_target_ms_per_token
+        )
+        self._counters = {
+            "requests": 0,
+            "throttled": 0,
+            "queued_seconds": 0.0
+        }
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        """Wait for quota and a concurrency slot."""
+        started = time.monotonic()
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+        await self.concurrency.acquire()
+        self._counters["requests"] += 1
+        self._counters["queued_seconds"] += time.monotonic() - started
+
+    async def release(self, ms_per_token: Optional[float], overloaded: bool = False) -> None:
+        if overloaded:
+            self._counters["throttled"] += 1
+        await self.concurrency.release(ms_per_token, overloaded)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "queued_seconds": round(self._counters["queued_seconds"], 3),
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "request_tokens_available": round(self.requests.tokens, 1),
+            "llm_tokens_available": round(self.tokens.tokens, 1)
+        }
+
+
+_rate_limiters: Dict[str, ProviderRateLimiter] = {}
+
+
+def get_rate_limiter(provider_name: str) -> ProviderRateLimiter:
+    """Return the process-wide limiter for a provider type."""
+    limiter = _rate_limiters.get(provider_name)
+    if limiter is None:
+        config = {
+            "requests_per_minute": settings.LLM_REQUESTS_PER_MINUTE,
+            "tokens_per_minute": settings.LLM_TOKENS_PER_MINUTE,
+            "initial_concurrency": settings.LLM_INITIAL_CONCURRENCY,
+            "min_concurrency": settings.LLM_MIN_CONCURRENCY,
+            "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+            "latency_target_ms_per_token": settings.LLM_LATENCY_TARGET_MS_PER_TOKEN
+        }
+        config.update(settings.LLM_RATE_LIMIT_OVERRIDES.get(provider_name, {}))
+
+        limiter = ProviderRateLimiter(
+            provider_name,
+            requests_per_minute=config["requests_per_minute"],
+            tokens_per_minute=config["tokens_per_minute"],
+            initial_concurrency=int(config["initial_concurrency"]),
+            min_concurrency=int(config["min_concurrency"]),
+            max_concurrency=int(config["max_concurrency"]),
+            latency_target_ms_per_token=config["latency_target_ms_per_token"]
+        )
+        _rate_limiters[provider_name] = limiter
+    return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Any]:
+    """Snapshot every provider's limiter state."""
+    return {name: limiter.snapshot() for name, limiter in _rate_limiters.items()}
+
+
+class RateLimitedLLMProvider(BaseLLMProvider):
+    """
+    Provider wrapper that meters calls through the provider's limiter.
+
+    Token reservations assume the full max_tokens completion; the unused
+    part is refunded once the actual response length is known, and the
+    whole reservation is refunded when the call fails before producing
+    output.
+    """
+
+    def __init__(self, inner: BaseLLMProvider):
+        self.inner = inner
+        super().__init__(inner.model, inner.temperature, inner.max_tokens)
+        self.limiter = get_rate_limiter(self.get_provider_name())
+
+    def _reserve(self, prompt: str, system_prompt: Optional[str]) -> int:
+        return estimate_tokens(prompt) + estimate_tokens(system_prompt) + self.max_tokens
+
+    def _settle(self, reserved: int, prompt: str, system_prompt: Optional[str], output: str) -> None:
+        used = estimate_tokens(prompt) + estimate_tokens(system_prompt) + estimate_tokens(output)
+        self.limiter.tokens.refund(reserved - used)
+
+    @staticmethod
+    def _ms_per_token(started: float, output: str) -> float:
+        return (time.monotonic() - started) * 1000 / max(1, estimate_tokens(output))
+
+    @staticmethod
+    def _is_overload(error: Exception) -> bool:
+        return classify_error(error).status_code in (429, 503, 529)
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        reserved = self._reserve(prompt, system_prompt)
+        await self.limiter.acquire(reserved)
+        started = time.monotonic()
+
+        try:
+            generated_text = await self.inner.agenerate(prompt, system_prompt)
+        except BaseException as e:
+            # Includes cancellation: nothing was generated, give the quota back
+            self.limiter.tokens.refund(reserved)
+            await self.limiter.release(None, isinstance(e, Exception) and self._is_overload(e))
+            raise
+
+        await self.limiter.release(self._ms_per_token(started, generated_text))
+        self._settle(reserved, prompt, system_prompt, generated_text)
+        return generated_text
+
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        reserved = self._reserve(prompt, system_prompt)
+        await self.limiter.acquire(reserved)
+        started = time.monotonic()
+        fragments = []
+
+        try:
+            async for token in self.inner.astream(prompt, system_prompt):
+                fragments.append(token)
+                yield token
+        except BaseException as e:
+            # Failed, cancelled or closed early: charge only what was
+            # streamed, and keep the partial call out of the latency signal
+            partial = "".join(fragments)
+            if partial:
+                self._settle(reserved, prompt, system_prompt, partial)
+            else:
+                self.limiter.tokens.refund(reserved)
+            await self.limiter.release(None, isinstance(e, Exception) and self._is_overload(e))
+            raise
+
+        await self.limiter.release(self._ms_per_token(started, "".join(fragments)))
+        self._settle(reserved, prompt, system_prompt, "".join(fragments))
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def get_provider_name(self) -> str:
+        return self.inner.get_provider_name()
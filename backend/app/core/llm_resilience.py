@@ -0,0 +1,333 @@
+"""
+LLM Resilience Layer
+
+Retries, exponential backoff and circuit breaking for LLM providers.
+
+ResilientLLMProvider wraps any BaseLLMProvider and:
+- Retries transient failures (connection errors, timeouts, 429, 5xx)
+  up to MAX_LLM_RETRIES times with exponential backoff and full jitter,
+  starting at LLM_RETRY_DELAY seconds and capped at LLM_RETRY_MAX_DELAY
+- Waits at least as long as a server-sent Retry-After header
+- Shares one circuit breaker per provider type, so once a backend is
+  failing consistently, calls fail fast instead of burning the full
+  request timeout on every claim
+"""
+
+from typing import AsyncIterator, Dict, Any, Optional
+import asyncio
+import random
+import time
+import httpx
+import structlog
+
+from app.core.llm_providers import BaseLLMProvider, LLMProviderError
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+
+class CircuitOpenError(LLMProviderError):
+    """Raised when a call is rejected because the provider's circuit is open."""
+
+
+def classify_error(error: Exception) -> LLMProviderError:
+    """
+    Normalize provider exceptions into LLMProviderError.
+
+    Understands httpx errors and the Anthropic/OpenAI SDK status errors,
+    which expose status_code and the raw response (for Retry-After).
+    """
+    if isinstance(error, LLMProviderError):
+        return error
+
+    status_code = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+
+    retry_after = None
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        retry_after = parse_retry_after(headers.get("retry-after"))
+
+    if status_code is not None:
+        retryable = status_code in RETRYABLE_STATUS_CODES
+    else:
+        # No HTTP status: connection resets, timeouts and SDK
+        # APIConnectionError/APITimeoutError are all transient
+        retryable = isinstance(error, (httpx.TransportError, asyncio.TimeoutError)) or (
+            type(error).__name__ in {"APIConnectionError", "APITimeoutError"}
+        )
+
+    return LLMProviderError(
+        str(error),
+        status_code=status_code,
+        retry_after=retry_after,
+        retryable=retryable
+    )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds; HTTP dates are ignored."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after failure_threshold transient failures in a row;
+    open -> half_open once reset_timeout has elapsed, letting a single
+    trial call through; a success closes the circuit, a failure reopens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self.logger = logger.bind(component="circuit_breaker", provider=name)
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if calls are currently being rejected."""
+        if self.state == "closed":
+            return
+
+        if self.state == "open":
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"Circuit open for provider '{self.name}'",
+                    retry_after=remaining
+                )
+            self.state = "half_open"
+            self.logger.info("circuit_half_open")
+
+        if self._trial_in_flight:
+            raise CircuitOpenError(
+                f"Circuit half-open for provider '{self.name}', trial call in flight"
+            )
+        self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            self.logger.info("circuit_closed")
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Record a transient failure; return True if this opened the circuit."""
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            was_open = self.state == "open"
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            if not was_open:
+                self.logger.warning("circuit_opened", failures=self.consecutive_failures)
+                return True
+        return False
+
+    def record_neutral(self) -> None:
+        """Release a half-open trial slot after a non-transient error."""
+        self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures
+        }
+
+
+class ResilienceMetrics:
+    """Per-provider counters for retries and circuit activity."""
+
+    FIELDS = ("calls", "retries", "failures", "circuit_opened", "short_circuited")
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def incr(self, provider: str, field: str) -> None:
+        counters = self._counters.setdefault(provider, dict.fromkeys(self.FIELDS, 0))
+        counters[field] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            provider: {
+                **counters,
+                "circuit": _circuit_breakers[provider].snapshot()
+                if provider in _circuit_breakers else None
+            }
+            for provider, counters in self._counters.items()
+        }
+
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+resilience_metrics = ResilienceMetrics()
+
+
+def get_circuit_breaker(provider_name: str) -> CircuitBreaker:
+    """Return the process-wide breaker shared by all instances of a provider."""
+    breaker = _circuit_breakers.get(provider_name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            provider_name,
+            failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.LLM_CIRCUIT_RESET_TIMEOUT
+        )
+        _circuit_breakers[provider_name] = breaker
+    return breaker
+
+
+class ResilientLLMProvider(BaseLLMProvider):
+    """
+    Provider wrapper adding retries with backoff and a circuit breaker.
+
+    Exposes the wrapped provider's name, model and sampling settings.
+    """
+
+    def __init__(
+        self,
+        inner: BaseLLMProvider,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0
+    ):
+        self.inner = inner
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        super().__init__(inner.model, inner.temperature, inner.max_tokens)
+        self.breaker = get_circuit_breaker(self.get_provider_name())
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _on_failure(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Record a failed attempt and decide whether to retry.
+
+        Returns:
+            Seconds to sleep before the next attempt, or None to give up
+        """
+        provider = self.get_provider_name()
+        failure = classify_error(error)
+
+        if not failure.retryable:
+            self.breaker.record_neutral()
+            resilience_metrics.incr(provider, "failures")
+            return None
+
+        if self.breaker.record_failure():
+            resilience_metrics.incr(provider, "circuit_opened")
+
+        if attempt >= self.max_retries or self.breaker.state == "open":
+            resilience_metrics.incr(provider, "failures")
+            return None
+
+        if failure.retry_after is not None and failure.retry_after > self.max_delay:
+            # Server asked us to back off longer than we are willing to wait
+            resilience_metrics.incr(provider, "failures")
+            return None
+
+        delay = self.backoff_delay(attempt, failure.retry_after)
+        resilience_metrics.incr(provider, "retries")
+        self.logger.warning(
+            "llm_call_retrying",
+            attempt=attempt + 1,
+            max_retries=self.max_retries,
+            delay_s=round(delay, 3),
+            status_code=failure.status_code,
+            error=str(error)
+        )
+        return delay
+
+    def _before_attempt(self) -> None:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            resilience_metrics.incr(self.get_provider_name(), "short_circuited")
+            raise
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Generate text, retrying transient failures."""
+        resilience_metrics.incr(self.get_provider_name(), "calls")
+        attempt = 0
+
+        while True:
+            self._before_attempt()
+            try:
+                generated_text = await self.inner.agenerate(prompt, system_prompt)
+            except asyncio.CancelledError:
+                self.breaker.record_neutral()
+                raise
+            except Exception as e:
+                delay = self._on_failure(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return generated_text
+
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream text, retrying only failures that occur before the first token.
+
+        Once text has reached the caller a retry would duplicate output,
+        so mid-stream failures are raised as-is.
+        """
+        resilience_metrics.incr(self.get_provider_name(), "calls")
+        attempt = 0
+
+        while True:
+            self._before_attempt()
+            started = False
+            try:
+                async for token in self.inner.astream(prompt, system_prompt):
+                    started = True
+                    yield token
+            except (asyncio.CancelledError, GeneratorExit):
+                # Caller went away; free a half-open trial slot
+                self.breaker.record_neutral()
+                raise
+            except Exception as e:
+                delay = None if started else self._on_failure(e, attempt)
+                if delay is None:
+                    if started:
+                        self.breaker.record_neutral()
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def get_provider_name(self) -> str:
+        return self.inner.get_provider_name()
@@ -0,0 +1,94 @@
+"""
+Local Embedding Provider using Ollama
+
+Embeds text with a locally-hosted model via Ollama's /api/embed.
+Default: nomic-embed-text (768 dimensions)
+
+Requirements:
+- Ollama installed and running (ollama.ai)
+- Model pulled: ollama pull nomic-embed-text
+"""
+
+from typing import List, Optional
+import httpx
+import structlog
+
+from app.core.embedding_providers import BaseEmbeddingProvider
+from app.core.llm_providers import LLMProviderError
+
+logger = structlog.get_logger()
+
+
+class LocalEmbeddingProvider(BaseEmbeddingProvider):
+    """
+    Local embedding provider using Ollama.
+
+    Keeps the retrieval step on the same host/network as the database,
+    with no API key or internet round trip per claim.
+    """
+
+    def __init__(
+        self,
+        model: str = "nomic-embed-text",
+        dimension: int = 768,
+        ollama_url: str = "http://localhost:11434",
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        super().__init__(model, dimension)
+        self.ollama_url = ollama_url
+
+        self._owns_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(timeout=60.0)
+
+        self.logger.info("local_embeddings_initialized", model=model, url=ollama_url)
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts with a single Ollama /api/embed call.
+
+        Raises:
+            LLMProviderError: If Ollama is not running or the model is missing
+        """
+        if not texts:
+            return []
+
+        try:
+            response = await self.http_client.post(
+                f"{self.ollama_url}/api/embed",
+                json={"model": self.model, "input": texts}
+            )
+            response.raise_for_status()
+
+        except httpx.ConnectError:
+            self.logger.error("ollama_connection_failed", url=self.ollama_url)
+            raise LLMProviderError(
+                f"Cannot connect to Ollama at {self.ollama_url}. "
+                "Please ensure Ollama is running: 'ollama serve'",
+                retryable=True
+            )
+
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            if status_code == 404:
+                error_msg = (
+                    f"Embedding model '{self.model}' not found. "
+                    f"Please pull it: 'ollama pull {self.model}'"
+                )
+            else:
+                error_msg = f"Ollama API error: {e.response.text}"
+
+            self.logger.error("ollama_embed_error", status=status_code)
+            raise LLMProviderError(
+                error_msg,
+                status_code=status_code,
+                retryable=status_code == 429 or status_code >= 500
+            )
+
+        return self._check_dimensions(response.json()["embeddings"])
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self.http_client.aclose()
+
+    def get_provider_name(self) -> str:
+        return "local"
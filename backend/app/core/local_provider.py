@@ -9,12 +9,13 @@ Requirements:
 - Model pulled: ollama pull llama3.1:8b
 """
 
-from typing import Optional
+from typing import AsyncIterator, Optional
 import httpx
 import json
 import structlog
 
-from app.core.llm_providers import BaseLLMProvider
+from app.core.llm_providers import BaseLLMProvider, LLMProviderError
+from app.core.llm_resilience import RETRYABLE_STATUS_CODES, parse_retry_after
 
 logger = structlog.get_logger()
 
@@ -40,26 +41,26 @@ class LocalLLMProvider(BaseLLMProvider):
         model: str = "llama3.1:8b",
         temperature: float = 0.3,
         max_tokens: int = 1000,
-        ollama_url: str = "http://localhost:11434"
+        ollama_url: str = "http://localhost:11434",
+        http_client: Optional[httpx.AsyncClient] = None
     ):
         super().__init__(model, temperature, max_tokens)
         self.ollama_url = ollama_url
+        
+        # Reuse a shared keep-alive client when one is injected (see
+        # ProviderRegistry); otherwise own a private one for this instance.
+        self._owns_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(timeout=120.0)
+        
         self.logger.info("local_llm_initialized", model=model, url=ollama_url)
     
-    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """
-        Generate text using Ollama API.
-        
-        Args:
-            prompt: User prompt
-            system_prompt: Optional system context
-            
-        Returns:
-            Generated text
-            
-        Raises:
-            Exception: If Ollama is not running or model not found
-        """
+    def _build_payload(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        stream: bool
+    ) -> dict:
+        """Build an Ollama /api/chat request body."""
         messages = []
         
         if system_prompt:
@@ -73,58 +74,152 @@ class LocalLLMProvider(BaseLLMProvider):
             "content": prompt
         })
         
-        payload = {
+        return {
             "model": self.model,
             "messages": messages,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": self.temperature,
                 "num_predict": self.max_tokens
             }
         }
-        
-        try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/chat",
-                    json=payload
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                generated_text = result.get("message", {}).get("content", "")
-                
-                self.logger.info(
-                    "local_generation_success",
-                    prompt_length=len(prompt),
-                    response_length=len(generated_text)
-                )
-                
-                return generated_text
-                
-        except httpx.ConnectError:
-            error_msg = (
+    
+    def _translate_error(self, error: Exception) -> Exception:
+        """Map httpx failures onto actionable Ollama error messages."""
+        if isinstance(error, httpx.ConnectError):
+            self.logger.error("ollama_connection_failed", url=self.ollama_url)
+            return LLMProviderError(
                 f"Cannot connect to Ollama at {self.ollama_url}. "
-                "Please ensure Ollama is running: 'ollama serve'"
+                "Please ensure Ollama is running: 'ollama serve'",
+                retryable=True
             )
-            self.logger.error("ollama_connection_failed", url=self.ollama_url)
-            raise Exception(error_msg)
         
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+            if status_code == 404:
                 error_msg = (
                     f"Model '{self.model}' not found. "
                     f"Please pull it: 'ollama pull {self.model}'"
                 )
             else:
-                error_msg = f"Ollama API error: {e.response.text}"
+                error_msg = f"Ollama API error: {error.response.text}"
             
-            self.logger.error("ollama_api_error", status=e.response.status_code)
-            raise Exception(error_msg)
+            self.logger.error("ollama_api_error", status=status_code)
+            return LLMProviderError(
+                error_msg,
+                status_code=status_code,
+                retry_after=parse_retry_after(error.response.headers.get("retry-after")),
+                retryable=status_code in RETRYABLE_STATUS_CODES
+            )
+        
+        return error
+    
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Generate text using Ollama API.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system context
+            
+        Returns:
+            Generated text
+            
+        Raises:
+            Exception: If Ollama is not running or model not found
+        """
+        payload = self._build_payload(prompt, system_prompt, stream=False)
+        
+        try:
+            response = await self.http_client.post(
+                f"{self.ollama_url}/api/chat",
+                json=payload
+            )
+            response.raise_for_status()
+            
+            result = response.json()
+            generated_text = result.get("message", {}).get("content", "")
+            
+            self.logger.info(
+                "local_generation_success",
+                prompt_length=len(prompt),
+                response_length=len(generated_text)
+            )
+            
+            return generated_text
+        
+        except (httpx.ConnectError, httpx.HTTPStatusError) as e:
+            raise self._translate_error(e)
         
         except Exception as e:
             self.logger.error("local_generation_failed", error=str(e))
             raise
     
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream text from Ollama's NDJSON chat endpoint.
+        
+        Each line of the response body is a JSON object carrying the
+        next message fragment; the final line has "done": true.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system context
+            
+        Yields:
+            Text fragments as they are generated
+        """
+        payload = self._build_payload(prompt, system_prompt, stream=True)
+        response_length = 0
+        
+        try:
+            async with self.http_client.stream(
+                "POST",
+                f"{self.ollama_url}/api/chat",
+                json=payload
+            ) as response:
+                if response.is_error:
+                    # Body must be read before it can be used in the error
+                    await response.aread()
+                response.raise_for_status()
+                
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise Exception(f"Ollama API error: {chunk['error']}")
+                    
+                    token = chunk.get("message", {}).get("content", "")
+                    if token:
+                        response_length += len(token)
+                        yield token
+                    
+                    if chunk.get("done"):
+                        break
+            
+            self.logger.info(
+                "local_stream_success",
+                prompt_length=len(prompt),
+                response_length=response_length
+            )
+        
+        except (httpx.ConnectError, httpx.HTTPStatusError) as e:
+            raise self._translate_error(e)
+        
+        except Exception as e:
+            self.logger.error("local_stream_failed", error=str(e))
+            raise
+    
+    async def aclose(self) -> None:
+        """Close the HTTP client if this provider created it."""
+        if self._owns_client:
+            await self.http_client.aclose()
+    
     def get_provider_name(self) -> str:
         return "local"
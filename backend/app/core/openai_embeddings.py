@@ -0,0 +1,70 @@
+"""
+OpenAI Embedding Provider
+
+Wrapper for OpenAI embedding models via the OpenAI API.
+"""
+
+from typing import List, Optional
+import httpx
+from openai import AsyncOpenAI
+import structlog
+
+from app.core.embedding_providers import BaseEmbeddingProvider, KNOWN_EMBEDDING_DIMENSIONS
+
+logger = structlog.get_logger()
+
+
+class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
+    """
+    OpenAI embedding provider.
+
+    text-embedding-3 models can return shortened vectors; when the
+    configured dimension differs from the model's native size it is
+    requested via the `dimensions` parameter.
+    """
+
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        dimension: int = 1536,
+        api_key: str = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_retries: int = 2
+    ):
+        super().__init__(model, dimension)
+
+        if not api_key:
+            raise ValueError("OpenAI API key is required")
+
+        self._owns_client = http_client is None
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=http_client,
+            max_retries=max_retries
+        )
+        self.logger.info("openai_embeddings_initialized", model=model)
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with a single embeddings API call."""
+        if not texts:
+            return []
+
+        request = {"model": self.model, "input": texts}
+        if (
+            self.model.startswith("text-embedding-3")
+            and self.dimension != KNOWN_EMBEDDING_DIMENSIONS.get(self.model)
+        ):
+            request["dimensions"] = self.dimension
+
+        response = await self.client.embeddings.create(**request)
+
+        # Results carry their input index; don't rely on response order
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return self._check_dimensions([item.embedding for item in ordered])
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self.client.close()
+
+    def get_provider_name(self) -> str:
+        return "openai"
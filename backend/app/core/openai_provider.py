@@ -4,7 +4,8 @@ OpenAI LLM Provider
 Wrapper for GPT models via OpenAI API.
 """
 
-from typing import Optional
+from typing import AsyncIterator, Optional
+import httpx
 from openai import AsyncOpenAI
 import structlog
 
@@ -35,16 +36,36 @@ class OpenAILLMProvider(BaseLLMProvider):
         model: str = "gpt-4",
         temperature: float = 0.3,
         max_tokens: int = 1000,
-        api_key: str = None
+        api_key: str = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_retries: int = 2
     ):
         super().__init__(model, temperature, max_tokens)
         
         if not api_key:
             raise ValueError("OpenAI API key is required")
         
-        self.client = AsyncOpenAI(api_key=api_key)
+        # An injected http_client is shared across providers and owned
+        # by the caller; only close the SDK client if we created it.
+        self._owns_client = http_client is None
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=http_client,
+            max_retries=max_retries
+        )
         self.logger.info("openai_provider_initialized", model=model)
     
+    def _build_messages(self, prompt: str, system_prompt: Optional[str]) -> list:
+        """Build the chat message list."""
+        messages = []
+        
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        
+        messages.append({"role": "user", "content": prompt})
+        
+        return messages
+    
     async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """
         Generate text using OpenAI API.
@@ -57,16 +78,9 @@ class OpenAILLMProvider(BaseLLMProvider):
             Generated text
         """
         try:
-            messages = []
-            
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            
-            messages.append({"role": "user", "content": prompt})
-            
             response = await self.client.chat.completions.create(
                 model=self.model,
-                messages=messages,
+                messages=self._build_messages(prompt, system_prompt),
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
             )
@@ -86,5 +100,54 @@ class OpenAILLMProvider(BaseLLMProvider):
             self.logger.error("openai_generation_failed", error=str(e))
             raise
     
+    async def astream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream text using OpenAI chat completion chunks.
+        
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system context
+            
+        Yields:
+            Content deltas as they are generated
+        """
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(prompt, system_prompt),
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+            
+            response_length = 0
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                
+                token = chunk.choices[0].delta.content
+                if token:
+                    response_length += len(token)
+                    yield token
+            
+            self.logger.info(
+                "openai_stream_success",
+                prompt_length=len(prompt),
+                response_length=response_length
+            )
+            
+        except Exception as e:
+            self.logger.error("openai_stream_failed", error=str(e))
+            raise
+    
+    async def aclose(self) -> None:
+        """Close the SDK client if this provider created it."""
+        if self._owns_client:
+            await self.client.close()
+    
     def get_provider_name(self) -> str:
         return "openai"
@@ -0,0 +1,182 @@
+"""
+LLM Provider Registry
+
+Process-wide pool of long-lived LLM provider instances.
+
+Agents used to build a fresh provider (and a fresh SDK/HTTP client) on
+every workflow node, paying TCP/TLS setup on each LLM hop. The registry
+hands out one provider per (provider, model, temperature, max_tokens)
+and shares a single keep-alive connection pool per provider type.
+Its lifetime is owned by the FastAPI lifespan in app/main.py.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+import httpx
+import structlog
+
+from app.core.llm_providers import BaseLLMProvider
+from app.core.llm_factory import LLMFactory
+from app.core.llm_cache import CachedLLMProvider, llm_response_cache
+from app.core.llm_resilience import ResilientLLMProvider, resilience_metrics
+from app.core.llm_rate_limiter import RateLimitedLLMProvider, rate_limiter_stats
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+ProviderKey = Tuple[str, str, float, int]
+
+
+class ProviderRegistry:
+    """
+    Caches configured providers and their shared HTTP connection pools.
+
+    Providers are created lazily on first use and reused afterwards.
+    aclose() releases every pool; the registry can be reused after
+    closing (new providers are built on demand).
+    """
+
+    def __init__(self):
+        self._providers: Dict[ProviderKey, BaseLLMProvider] = {}
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self.logger = logger.bind(component="provider_registry")
+
+    def make_key(
+        self,
+        provider_type: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> ProviderKey:
+        """Resolve defaults so equivalent requests share one key."""
+        provider_type = provider_type or settings.LLM_PROVIDER
+        return (
+            provider_type,
+            model or LLMFactory.default_model(provider_type),
+            0.3 if temperature is None else float(temperature),
+            max_tokens or 1000
+        )
+
+    def get(
+        self,
+        provider_type: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> BaseLLMProvider:
+        """
+        Return the pooled provider for this configuration.
+
+        Args:
+            provider_type: Override provider (local/anthropic/openai)
+            model: Override model name
+            temperature: Override temperature
+            max_tokens: Override max tokens
+
+        Returns:
+            Shared provider instance
+        """
+        key = self.make_key(provider_type, model, temperature, max_tokens)
+
+        provider = self._providers.get(key)
+        if provider is None:
+            provider = self._build(key)
+            self._providers[key] = provider
+            self.logger.info(
+                "provider_registered",
+                provider=key[0],
+                model=key[1],
+                temperature=key[2],
+                max_tokens=key[3]
+            )
+
+        return provider
+
+    def _build(self, key: ProviderKey) -> BaseLLMProvider:
+        """Create a provider bound to the shared pool, plus wrappers."""
+        provider_type, model, temperature, max_tokens = key
+
+        http_client = self._http_clients.get(provider_type)
+        if http_client is None:
+            http_client = LLMFactory.create_http_client()
+            self._http_clients[provider_type] = http_client
+
+        provider = LLMFactory.create_provider(
+            provider_type=provider_type,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            http_client=http_client,
+            # Retries are owned by the resilience wrapper below
+            sdk_max_retries=0
+        )
+
+        # Innermost so each retry attempt is metered against the quota
+        if settings.ENABLE_RATE_LIMITING:
+            provider = RateLimitedLLMProvider(provider)
+
+        provider = ResilientLLMProvider(
+            provider,
+            max_retries=settings.MAX_LLM_RETRIES,
+            base_delay=settings.LLM_RETRY_DELAY,
+            max_delay=settings.LLM_RETRY_MAX_DELAY
+        )
+
+        # Cache sits outermost so hits skip retries entirely
+        if settings.LLM_CACHE_ENABLED and temperature <= settings.LLM_CACHE_MAX_TEMPERATURE:
+            provider = CachedLLMProvider(
+                provider,
+                llm_response_cache,
+                max_temperature=settings.LLM_CACHE_MAX_TEMPERATURE
+            )
+
+        return provider
+
+    def warm_up(self) -> None:
+        """Pre-build the providers used by the workflow agents."""
+        LLMFactory.get_classifier_llm()
+        LLMFactory.get_drafter_llm()
+        LLMFactory.get_guardrail_llm()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of registered providers and pools."""
+        return {
+            "providers": [
+                {
+                    "provider": key[0],
+                    "model": key[1],
+                    "temperature": key[2],
+                    "max_tokens": key[3]
+                }
+                for key in self._providers
+            ],
+            "connection_pools": list(self._http_clients),
+            "response_cache": llm_response_cache.stats(),
+            "resilience": resilience_metrics.snapshot(),
+            "rate_limits": rate_limiter_stats()
+        }
+
+    async def aclose(self) -> None:
+        """Close all providers and their shared connection pools."""
+        providers = list(self._providers.values())
+        http_clients = list(self._http_clients.values())
+        self._providers.clear()
+        self._http_clients.clear()
+
+        for provider in providers:
+            try:
+                await provider.aclose()
+            except Exception as e:
+                self.logger.warning("provider_close_failed", error=str(e))
+
+        for http_client in http_clients:
+            await http_client.aclose()
+
+        self.logger.info(
+            "provider_registry_closed",
+            providers=len(providers),
+            pools=len(http_clients)
+        )
+
+
+# Global registry instance
+provider_registry = ProviderRegistry()
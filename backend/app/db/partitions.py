@@ -0,0 +1,72 @@
+"""
+Policy Partitions
+
+Helpers around the payer LIST partitioning of the policies table.
+
+Partitions are created by the ensure_policy_partition() SQL function
+(database/init.sql). ensure_partition() runs it in its own short
+transaction, so call it before inserting a new payer's policies rather
+than inside the inserting transaction, which would hold the partition
+locks until it commits. Rows inserted for an unknown payer land in
+policies_default; rebalance() moves them into dedicated partitions.
+"""
+
+from typing import Any, Dict, List, Optional
+import structlog
+
+from app.db.vector_store import policy_vector_store
+
+logger = structlog.get_logger()
+
+DEFAULT_PARTITION = "policies_default"
+
+_LIST_PARTITIONS_SQL = """
+    SELECT c.relname AS name,
+           pg_get_expr(c.relpartbound, c.oid) AS bound,
+           c.reltuples::bigint AS estimated_rows,
+           pg_total_relation_size(c.oid) AS total_bytes
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'policies'::regclass
+    ORDER BY c.relname
+"""
+
+
+async def list_partitions() -> List[Dict[str, Any]]:
+    """List policies partitions with their bounds, row estimates and sizes."""
+    pool = await policy_vector_store.get_pool()
+    rows = await pool.fetch(_LIST_PARTITIONS_SQL)
+    return [dict(row) for row in rows]
+
+
+async def partition_for_payer(payer_name: str) -> Optional[str]:
+    """Return the payer's dedicated partition, or None if it uses the default."""
+    pool = await policy_vector_store.get_pool()
+    return await pool.fetchval(
+        "SELECT c.relname FROM pg_class c JOIN pg_inherits i ON i.inhrelid = c.oid "
+        "WHERE i.inhparent = 'policies'::regclass AND c.relname = policy_partition_name($1)",
+        payer_name
+    )
+
+
+async def ensure_partition(payer_name: str) -> str:
+    """Create the payer's partition if needed; returns its name."""
+    pool = await policy_vector_store.get_pool()
+    async with pool.acquire() as connection:
+        async with connection.transaction():
+            name = await connection.fetchval("SELECT ensure_policy_partition($1)", payer_name)
+
+    logger.info("policy_partition_ensured", payer_name=payer_name, partition=name)
+    return name
+
+
+async def rebalance(min_rows: int = 1) -> List[Dict[str, Any]]:
+    """Move payers with at least min_rows rows out of the default partition."""
+    pool = await policy_vector_store.get_pool()
+    async with pool.acquire() as connection:
+        async with connection.transaction():
+            rows = await connection.fetch("SELECT * FROM rebalance_policy_partitions($1)", min_rows)
+
+    moved = [dict(row) for row in rows]
+    logger.info("policy_partitions_rebalanced", payers=len(moved), rows=sum(row["moved_rows"] for row in moved))
+    return moved
@@ -0,0 +1,337 @@
+"""
+In-Process Policy Index
+
+Optional retrieval backend (RETRIEVAL_BACKEND=local) that answers the
+top-k vector search from memory instead of a Postgres round trip.
+
+Each payer's embedded policies are snapshotted to
+LOCAL_INDEX_DIR/<model>-<dimension>/<payer>/<fingerprint>/:
+- vectors.npy: L2-normalized float32 matrix, opened with mmap so all
+  uvicorn workers on a host share the same page-cache pages
+- policies.json: ids, titles and texts (plus chunk ids at
+  RETRIEVAL_GRANULARITY=chunk) in matrix row order
+- hnsw.bin: HNSW graph (only with hnswlib installed and at least
+  LOCAL_INDEX_HNSW_THRESHOLD policies; smaller payers use exact
+  NumPy dot products, which are faster at that size anyway)
+
+The fingerprint is a hash of the payer's policy ids, indexed_at
+timestamps and text, computed in Postgres. Each payer is re-checked at most every
+LOCAL_INDEX_REFRESH_SECONDS in the background while the current
+snapshot keeps serving, and only payers whose fingerprint changed are
+rebuilt. A process that finds a snapshot for the current fingerprint
+on disk maps it instead of rebuilding.
+
+Full-text (hybrid) retrieval needs Postgres; this backend is vector-only.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import structlog
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # Optional; exact search is used without it
+    hnswlib = None
+
+from app.core.config import settings
+from app.db.retrieval_cache import retrieval_cache
+from app.db.search_batching import BatchingPolicyRetriever
+from app.db.vector_store import PolicyVectorStore, policy_vector_store
+
+logger = structlog.get_logger()
+
+_UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@dataclass
+class PayerSnapshot:
+    """Loaded index for one payer."""
+    fingerprint: str
+    vectors: np.ndarray  # mmap'd, normalized rows
+    policies: List[Dict[str, str]]
+    hnsw: Any = None
+    checked_at: float = 0.0
+
+
+class LocalPolicyIndex:
+    """
+    Per-payer in-memory vector index backed by memory-mapped snapshots.
+
+    Exposes the same search() signature as PolicyVectorStore so the
+    retrieval agent can use either.
+    """
+
+    def __init__(
+        self,
+        store: PolicyVectorStore,
+        index_dir: str,
+        model: str,
+        dimension: int,
+        hnsw_threshold: int = 5000,
+        refresh_seconds: float = 30.0,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 64
+    ):
+        self.store = store
+        self.root = os.path.join(index_dir, _UNSAFE_PATH_CHARS.sub("_", f"{model}-{dimension}"))
+        self.dimension = dimension
+        self.hnsw_threshold = hnsw_threshold
+        self.refresh_seconds = refresh_seconds
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+
+        self._snapshots: Dict[str, PayerSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refreshing: set = set()
+        self._counters = {"searches": 0, "builds": 0, "loads": 0, "refresh_errors": 0}
+        self.logger = logger.bind(component="local_policy_index")
+
+    def _payer_dir(self, payer_name: str) -> str:
+        # Hash suffix keeps distinct payers apart after sanitizing
+        digest = hashlib.sha1(payer_name.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.root, f"{_UNSAFE_PATH_CHARS.sub('_', payer_name)}-{digest}")
+
+    async def search(
+        self,
+        embedding: Sequence[float],
+        payer_name: str,
+        top_k: int,
+        query_text: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the policy sections closest to an embedding for one payer.
+
+        `query_text` is accepted for interface parity and ignored.
+
+        Returns:
+            Excerpts ordered by cosine similarity (highest first)
+        """
+        snapshot = await self._get_snapshot(payer_name)
+        self._counters["searches"] += 1
+        if snapshot is None:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        count = len(snapshot.policies)
+        k = min(top_k, count)
+        if k == 0:
+            return []
+
+        if snapshot.hnsw is not None:
+            labels, distances = snapshot.hnsw.knn_query(query, k=k)
+            rows = labels[0].tolist()
+            similarities = (1.0 - distances[0]).tolist()
+        else:
+            scores = snapshot.vectors @ query
+            if k < count:
+                candidates = np.argpartition(-scores, k - 1)[:k]
+            else:
+                candidates = np.arange(count)
+            rows = candidates[np.argsort(-scores[candidates])].tolist()
+            similarities = scores[rows].tolist()
+
+        return [
+            {**snapshot.policies[row], "payer_name": payer_name, "similarity_score": float(similarity)}
+            for row, similarity in zip(rows, similarities)
+        ]
+
+    async def _get_snapshot(self, payer_name: str) -> Optional[PayerSnapshot]:
+        snapshot = self._snapshots.get(payer_name)
+
+        if snapshot is None:
+            # First use for this payer: wait for the load
+            lock = self._locks.setdefault(payer_name, asyncio.Lock())
+            async with lock:
+                if payer_name not in self._snapshots:
+                    await self.refresh(payer_name)
+            return self._snapshots.get(payer_name)
+
+        if time.monotonic() - snapshot.checked_at >= self.refresh_seconds and payer_name not in self._refreshing:
+            # Serve the current snapshot while checking for changes
+            self._refreshing.add(payer_name)
+            asyncio.create_task(self._background_refresh(payer_name))
+
+        return snapshot
+
+    async def _background_refresh(self, payer_name: str) -> None:
+        try:
+            async with self._locks.setdefault(payer_name, asyncio.Lock()):
+                await self.refresh(payer_name)
+        except Exception as e:
+            self._counters["refresh_errors"] += 1
+            self.logger.warning("local_index_refresh_failed", payer_name=payer_name, error=str(e))
+            # Keep serving the old snapshot; retry after the next interval
+            snapshot = self._snapshots.get(payer_name)
+            if snapshot is not None:
+                snapshot.checked_at = time.monotonic()
+        finally:
+            self._refreshing.discard(payer_name)
+
+    async def refresh(self, payer_name: str) -> None:
+        """Load (building if needed) the snapshot for the payer's current policies."""
+        fingerprint = await self.store.payer_fingerprint(payer_name)
+        current = self._snapshots.get(payer_name)
+
+        if current is not None and current.fingerprint == fingerprint:
+            current.checked_at = time.monotonic()
+            return
+
+        path = os.path.join(self._payer_dir(payer_name), fingerprint)
+        if not os.path.isdir(path):
+            rows = await self.store.fetch_payer_embeddings(payer_name)
+            await asyncio.to_thread(self._build_snapshot, path, rows)
+            self._counters["builds"] += 1
+
+        snapshot = await asyncio.to_thread(self._load_snapshot, path, fingerprint)
+        snapshot.checked_at = time.monotonic()
+        self._snapshots[payer_name] = snapshot
+        self._counters["loads"] += 1
+
+        self.logger.info(
+            "local_index_loaded",
+            payer_name=payer_name,
+            policies=len(snapshot.policies),
+            hnsw=snapshot.hnsw is not None
+        )
+        await asyncio.to_thread(self._prune, payer_name, fingerprint)
+
+    def _build_snapshot(self, path: str, rows: List[Dict[str, Any]]) -> None:
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent, prefix=".building-")
+
+        try:
+            vectors = np.zeros((len(rows), self.dimension), dtype=np.float32)
+            for i, row in enumerate(rows):
+                vectors[i] = row["embedding"]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms > 0, norms, 1.0)
+
+            np.save(os.path.join(staging, "vectors.npy"), vectors)
+            with open(os.path.join(staging, "policies.json"), "w") as f:
+                json.dump([{key: value for key, value in row.items() if key != "embedding"} for row in rows], f)
+
+            if hnswlib is not None and len(rows) >= self.hnsw_threshold:
+                index = hnswlib.Index(space="cosine", dim=self.dimension)
+                index.init_index(max_elements=len(rows), ef_construction=self.hnsw_ef_construction, M=self.hnsw_m)
+                index.add_items(vectors, np.arange(len(rows)))
+                index.save_index(os.path.join(staging, "hnsw.bin"))
+
+            # Atomic publish; another process may have won the race
+            os.rename(staging, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _load_snapshot(self, path: str, fingerprint: str) -> PayerSnapshot:
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        with open(os.path.join(path, "policies.json")) as f:
+            policies = json.load(f)
+
+        hnsw = None
+        hnsw_path = os.path.join(path, "hnsw.bin")
+        if hnswlib is not None and os.path.exists(hnsw_path):
+            hnsw = hnswlib.Index(space="cosine", dim=self.dimension)
+            hnsw.load_index(hnsw_path, max_elements=len(policies))
+            hnsw.set_ef(self.hnsw_ef_search)
+
+        return PayerSnapshot(fingerprint=fingerprint, vectors=vectors, policies=policies, hnsw=hnsw)
+
+    def _prune(self, payer_name: str, keep: str) -> None:
+        # Other processes may still map an older snapshot; unlinking is
+        # safe on POSIX since open mappings keep the data alive
+        payer_dir = self._payer_dir(payer_name)
+        for name in os.listdir(payer_dir):
+            if name != keep and not name.startswith("."):
+                shutil.rmtree(os.path.join(payer_dir, name), ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters and per-payer snapshot sizes."""
+        return {
+            **self._counters,
+            "hnswlib_available": hnswlib is not None,
+            "payers": {
+                payer_name: {
+                    "policies": len(snapshot.policies),
+                    "fingerprint": snapshot.fingerprint,
+                    "hnsw": snapshot.hnsw is not None
+                }
+                for payer_name, snapshot in self._snapshots.items()
+            }
+        }
+
+
+_local_policy_index: Optional[LocalPolicyIndex] = None
+
+
+def get_local_policy_index() -> LocalPolicyIndex:
+    """Return the process-wide local index, creating it on first use."""
+    global _local_policy_index
+    if _local_policy_index is None:
+        from app.core.embedding_factory import get_embedding_provider
+
+        provider = get_embedding_provider()
+        _local_policy_index = LocalPolicyIndex(
+            policy_vector_store,
+            settings.LOCAL_INDEX_DIR,
+            model=provider.model,
+            dimension=provider.dimension,
+            hnsw_threshold=settings.LOCAL_INDEX_HNSW_THRESHOLD,
+            refresh_seconds=settings.LOCAL_INDEX_REFRESH_SECONDS
+        )
+    return _local_policy_index
+
+
+_batching_retriever: Optional[BatchingPolicyRetriever] = None
+
+
+def retrieval_stats() -> Dict[str, Any]:
+    """Return the configured retrieval backend, local index, batching and result cache statistics."""
+    return {
+        "backend": settings.RETRIEVAL_BACKEND,
+        "mode": settings.RETRIEVAL_MODE,
+        "granularity": settings.RETRIEVAL_GRANULARITY,
+        "local_index": _local_policy_index.stats() if _local_policy_index else None,
+        "batching": _batching_retriever.stats() if _batching_retriever else None,
+        "result_cache": retrieval_cache.stats() if settings.RETRIEVAL_CACHE_ENABLED else None
+    }
+
+
+def get_policy_retriever():
+    """
+    Return the retrieval backend selected by RETRIEVAL_BACKEND.
+
+    pgvector searches go through the search batcher when
+    RETRIEVAL_BATCH_ENABLED; the local index is in-process and has no
+    round trips to save.
+    """
+    global _batching_retriever
+    if settings.RETRIEVAL_BACKEND == "local":
+        return get_local_policy_index()
+    if not settings.RETRIEVAL_BATCH_ENABLED:
+        return policy_vector_store
+    if _batching_retriever is None:
+        _batching_retriever = BatchingPolicyRetriever(
+            policy_vector_store,
+            max_batch_size=settings.RETRIEVAL_BATCH_MAX_SIZE,
+            max_inflight=settings.RETRIEVAL_BATCH_MAX_INFLIGHT
+        )
+    return _batching_retriever
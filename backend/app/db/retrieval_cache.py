@@ -0,0 +1,360 @@
+"""
+Retrieval Result Cache
+
+Serves PolicyRetrievalAgent results for recurring (payer, category,
+query) combinations from process memory.
+
+Entries are keyed on:
+- payer_name
+- the provisional category from the CARC rule table (retrieval runs
+  alongside the LLM classifier, so its answer isn't known yet)
+- a SimHash bucket of the query embedding: its sign pattern against
+  RETRIEVAL_CACHE_HASH_BITS fixed random hyperplanes, so near-identical
+  denial descriptions share an entry
+and scoped by a namespace hashed from the embedding model and the
+retrieval settings that shape the results.
+
+Invalidation is driven by Postgres. Statement triggers on policies bump
+policy_versions.version for every payer a statement touched (insert,
+edit, re-embed, delete), delete that payer's persisted entries and
+NOTIFY policy_changes. Each process LISTENs on a dedicated connection
+and drops the payer's in-memory entries. Entries also carry the policy
+version they were computed against, so a search that raced an update is
+never stored. While the listener is down, or a payer's entries cannot be
+loaded, the cache is bypassed and the caller searches as usual. LISTEN
+needs a session-mode connection (not PgBouncer transaction pooling).
+
+prewarm() (the `prewarm_retrieval_cache` job) computes entries from each
+payer's most frequent claim descriptions and stores them in
+retrieval_cache_entries; a process loads a payer's persisted entries on
+its first lookup for that payer.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import json
+import time
+import structlog
+
+import asyncpg
+import numpy as np
+
+from app.agents.classification_rules import provisional_category
+from app.core.config import settings
+from app.db.vector_store import policy_vector_store, to_asyncpg_dsn
+from app.services.job_queue import register_job_handler
+
+logger = structlog.get_logger()
+
+PREWARM_RETRIEVAL_CACHE_JOB = "prewarm_retrieval_cache"
+
+POLICY_CHANGES_CHANNEL = "policy_changes"
+
+# Fixed so every process derives the same hyperplanes (and buckets)
+SIMHASH_SEED = 20240917
+
+_LOAD_PAYER_SQL = """
+    SELECT category, bucket, results
+    FROM retrieval_cache_entries
+    WHERE payer_name = $1 AND namespace = $2 AND policy_version = $3
+"""
+
+_POLICY_VERSION_SQL = "SELECT coalesce((SELECT version FROM policy_versions WHERE payer_name = $1), 0)"
+
+_STORE_ENTRIES_SQL = """
+    INSERT INTO retrieval_cache_entries (payer_name, namespace, category, bucket, policy_version, results)
+    SELECT $1, $2, e.category, e.bucket, $3, e.results
+    FROM unnest($4::text[], $5::bigint[], $6::jsonb[]) AS e(category, bucket, results)
+    ON CONFLICT (payer_name, namespace, category, bucket) DO UPDATE
+    SET policy_version = EXCLUDED.policy_version, results = EXCLUDED.results, created_at = now()
+"""
+
+# Most frequent recent denial descriptions per payer; the prewarm queries
+_PREWARM_QUERIES_SQL = """
+    SELECT denial_code, denial_description
+    FROM claims
+    WHERE payer_name = $1
+    GROUP BY denial_code, denial_description
+    ORDER BY count(*) DESC, max(created_at) DESC
+    LIMIT $2
+"""
+
+
+@dataclass
+class CacheLookup:
+    """Outcome of a cache lookup; pass it back to put() after a miss."""
+    payer_name: str
+    category: str
+    bucket: int
+    version: Optional[int]  # None when the cache was bypassed
+    results: Optional[List[Dict[str, Any]]] = None
+
+
+@dataclass
+class PayerEntries:
+    version: int
+    entries: Dict[Tuple[str, int], List[Dict[str, Any]]] = field(default_factory=dict)
+
+
+def retrieval_namespace(model: str, hash_bits: int) -> str:
+    """Hash of everything besides the key that shapes cached results."""
+    signature = json.dumps([
+        model,
+        settings.RETRIEVAL_BACKEND,
+        settings.RETRIEVAL_GRANULARITY,
+        settings.RETRIEVAL_MODE,
+        settings.VECTOR_SEARCH_PRECISION,
+        settings.RAG_TOP_K,
+        hash_bits
+    ])
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+
+
+class RetrievalCache:
+    """
+    In-process retrieval result cache with Postgres-driven invalidation.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        hash_bits: int = 16,
+        max_entries_per_payer: int = 10000,
+        reconnect_seconds: float = 5.0
+    ):
+        self.dsn = dsn
+        self.hash_bits = max(1, min(hash_bits, 62))
+        self.max_entries_per_payer = max_entries_per_payer
+        self.reconnect_seconds = reconnect_seconds
+
+        self._namespace: Optional[str] = None
+        self._planes: Optional[np.ndarray] = None
+        self._weights = np.left_shift(np.int64(1), np.arange(self.hash_bits, dtype=np.int64))
+        self._payers: Dict[str, PayerEntries] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Bumped on every invalidation; a payer load that overlapped one is discarded
+        self._generation = 0
+        self._listener: Optional[asyncpg.Connection] = None
+        self._listener_lock = asyncio.Lock()
+        self._next_connect_at = 0.0
+        self._counters = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "invalidations": 0, "loads": 0}
+        self.logger = logger.bind(component="retrieval_cache")
+
+    @property
+    def namespace(self) -> str:
+        if self._namespace is None:
+            from app.core.embedding_factory import get_embedding_provider
+
+            self._namespace = retrieval_namespace(get_embedding_provider().model, self.hash_bits)
+        return self._namespace
+
+    def bucket(self, embedding: Sequence[float]) -> int:
+        """SimHash of an embedding: one bit per hyperplane side."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self._planes is None or self._planes.shape[1] != vector.shape[0]:
+            rng = np.random.default_rng(SIMHASH_SEED)
+            self._planes = rng.standard_normal((self.hash_bits, vector.shape[0])).astype(np.float32)
+        return int(((self._planes @ vector) > 0).astype(np.int64) @ self._weights)
+
+    async def get(self, payer_name: str, category: str, embedding: Sequence[float]) -> CacheLookup:
+        """
+        Look up cached results; `results` is None on a miss.
+
+        Never raises for database errors: the lookup is then returned as
+        bypassed (version None) and put() ignores it.
+        """
+        lookup = CacheLookup(payer_name, category, self.bucket(embedding), version=None)
+
+        if not await self._ensure_listener():
+            self._counters["bypassed"] += 1
+            return lookup
+
+        entries = self._payers.get(payer_name) or await self._load_payer(payer_name)
+        if entries is None:
+            self._counters["bypassed"] += 1
+            return lookup
+
+        lookup.version = entries.version
+        lookup.results = entries.entries.get((category, lookup.bucket))
+        self._counters["hits" if lookup.results is not None else "misses"] += 1
+        return lookup
+
+    def put(self, lookup: CacheLookup, results: List[Dict[str, Any]]) -> None:
+        """Store results computed after a miss, unless the payer changed meanwhile."""
+        entries = self._payers.get(lookup.payer_name)
+        if entries is None or lookup.version is None or entries.version != lookup.version:
+            return
+        if len(entries.entries) >= self.max_entries_per_payer:
+            return
+        entries.entries[(lookup.category, lookup.bucket)] = results
+        self._counters["stores"] += 1
+
+    async def _load_payer(self, payer_name: str) -> Optional[PayerEntries]:
+        """Load a payer's version and persisted entries; None if that fails."""
+        async with self._locks.setdefault(payer_name, asyncio.Lock()):
+            if payer_name in self._payers:
+                return self._payers[payer_name]
+
+            generation = self._generation
+            try:
+                pool = await policy_vector_store.get_pool()
+                async with pool.acquire() as connection:
+                    async with connection.transaction(isolation="repeatable_read", readonly=True):
+                        version = await connection.fetchval(_POLICY_VERSION_SQL, payer_name)
+                        rows = await connection.fetch(_LOAD_PAYER_SQL, payer_name, self.namespace, version)
+            except Exception as e:
+                self.logger.warning("retrieval_cache_load_failed", payer_name=payer_name, error=str(e))
+                return None
+
+            entries = PayerEntries(
+                version=version,
+                entries={(row["category"], row["bucket"]): json.loads(row["results"]) for row in rows}
+            )
+            if generation == self._generation:
+                self._payers[payer_name] = entries
+            self._counters["loads"] += 1
+            return entries
+
+    async def _ensure_listener(self) -> bool:
+        if self._listener is not None and not self._listener.is_closed():
+            return True
+        if time.monotonic() < self._next_connect_at:
+            return False
+
+        async with self._listener_lock:
+            if self._listener is not None and not self._listener.is_closed():
+                return True
+            self._next_connect_at = time.monotonic() + self.reconnect_seconds
+
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(POLICY_CHANGES_CHANNEL, self._on_policy_change)
+                connection.add_termination_listener(self._on_listener_lost)
+            except Exception as e:
+                self.logger.warning("retrieval_cache_listen_failed", error=str(e))
+                return False
+
+            # Notifications may have been missed while disconnected
+            self._invalidate_all()
+            self._listener = connection
+            self.logger.info("retrieval_cache_listening", channel=POLICY_CHANGES_CHANNEL)
+            return True
+
+    def _on_policy_change(self, connection, pid, channel, payload: str) -> None:
+        payer_name = json.loads(payload)["payer"]
+        self._generation += 1
+        self._payers.pop(payer_name, None)
+        self._counters["invalidations"] += 1
+
+    def _on_listener_lost(self, connection) -> None:
+        self.logger.warning("retrieval_cache_listener_lost")
+        self._listener = None
+        self._invalidate_all()
+
+    def _invalidate_all(self) -> None:
+        self._generation += 1
+        self._payers.clear()
+
+    async def close(self) -> None:
+        """Stop listening and drop all entries."""
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            await listener.close()
+        self._invalidate_all()
+
+    async def prewarm(self, payer_name: Optional[str] = None, queries_per_payer: int = 20) -> Dict[str, Any]:
+        """
+        Compute and persist entries for each payer's frequent queries.
+
+        Queries are each payer's most frequent claim descriptions, keyed
+        like live lookups (provisional category, embedding bucket), so
+        recurring claims hit on their first run in a process.
+
+        Returns:
+            Payer, query and entry counts
+        """
+        from app.core.embedding_factory import get_embedding_provider
+        from app.db.policy_index import get_policy_retriever
+
+        provider = get_embedding_provider()
+        retriever = get_policy_retriever()
+        pool = await policy_vector_store.get_pool()
+
+        if payer_name:
+            payers = [payer_name]
+        else:
+            payers = [row["payer_name"] for row in await pool.fetch("SELECT DISTINCT payer_name FROM policies")]
+
+        summary = {"payers": len(payers), "queries": 0, "entries": 0}
+        for payer in payers:
+            version = await pool.fetchval(_POLICY_VERSION_SQL, payer)
+
+            queries = [
+                (provisional_category(row["denial_code"], row["denial_description"]), row["denial_code"], row["denial_description"])
+                for row in await pool.fetch(_PREWARM_QUERIES_SQL, payer, queries_per_payer)
+            ]
+            if not queries:
+                continue
+
+            embeddings = await provider.aembed_queries([description for _, _, description in queries])
+            computed: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+            for (category, denial_code, description), embedding in zip(queries, embeddings):
+                key = (category, self.bucket(embedding))
+                if key in computed:
+                    continue
+                computed[key] = await retriever.search(
+                    embedding,
+                    payer,
+                    settings.RAG_TOP_K,
+                    query_text=f"{denial_code} {description}"
+                )
+
+            await pool.execute(
+                _STORE_ENTRIES_SQL,
+                payer,
+                self.namespace,
+                version,
+                [category for category, _ in computed],
+                [bucket for _, bucket in computed],
+                [json.dumps(results) for results in computed.values()]
+            )
+            # A payer already loaded here picks the entries up directly
+            entries = self._payers.get(payer)
+            if entries is not None and entries.version == version:
+                entries.entries.update(computed)
+
+            summary["queries"] += len(queries)
+            summary["entries"] += len(computed)
+            self.logger.info("retrieval_cache_prewarmed", payer_name=payer, entries=len(computed), version=version)
+
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters, hit rate and cached entries per payer."""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            "listening": self._listener is not None and not self._listener.is_closed(),
+            "hash_bits": self.hash_bits,
+            "payers": {payer: len(entries.entries) for payer, entries in self._payers.items()}
+        }
+
+
+# Global retrieval cache instance
+retrieval_cache = RetrievalCache(
+    to_asyncpg_dsn(settings.DATABASE_URL),
+    hash_bits=settings.RETRIEVAL_CACHE_HASH_BITS,
+    max_entries_per_payer=settings.RETRIEVAL_CACHE_MAX_ENTRIES_PER_PAYER
+)
+
+
+@register_job_handler(PREWARM_RETRIEVAL_CACHE_JOB)
+async def handle_prewarm_retrieval_cache(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler for `prewarm_retrieval_cache` jobs ({"payer_name": ...?})."""
+    return await retrieval_cache.prewarm(
+        payer_name=payload.get("payer_name"),
+        queries_per_payer=payload.get("queries_per_payer", settings.RETRIEVAL_CACHE_PREWARM_QUERIES)
+    )
@@ -0,0 +1,134 @@
+"""
+Policy Search Batching
+
+Coalesces concurrent policy searches into PolicyVectorStore.search_many()
+calls, so N claims retrieving at once cost one SQL round trip instead
+of N.
+
+Batch runs and the job worker pool keep many workflows in flight, and
+their retrieval steps overlap. Searches arriving in the same event loop
+iteration, or while RETRIEVAL_BATCH_MAX_INFLIGHT statements are already
+running, are queued and sent together (up to RETRIEVAL_BATCH_MAX_SIZE
+per statement) as soon as a slot frees up. Unlike the embedding
+micro-batcher there is no wait window: a search that finds an idle slot
+is dispatched on the next loop iteration, so a lone interactive claim
+pays no added latency.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set
+import asyncio
+import structlog
+
+from app.db.vector_store import PolicyVectorStore
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class _PendingSearch:
+    embedding: Sequence[float]
+    payer_name: str
+    top_k: int
+    query_text: Optional[str]
+    future: asyncio.Future
+
+
+class BatchingPolicyRetriever:
+    """
+    Retriever wrapper that batches concurrent search() calls.
+
+    Exposes the same search() signature as PolicyVectorStore.
+    """
+
+    def __init__(self, store: PolicyVectorStore, max_batch_size: int = 32, max_inflight: int = 2):
+        self.store = store
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_inflight = max(1, max_inflight)
+
+        self._pending: List[_PendingSearch] = []
+        self._inflight = 0
+        self._scheduled = False
+        self._tasks: Set[asyncio.Task] = set()
+        self._counters = {"searches": 0, "statements": 0, "largest_batch": 0, "errors": 0}
+        self.logger = logger.bind(component="policy_search_batching")
+
+    async def search(
+        self,
+        embedding: Sequence[float],
+        payer_name: str,
+        top_k: int,
+        query_text: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Queue a search for the next batch and wait for its excerpts."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_PendingSearch(embedding, payer_name, top_k, query_text, future))
+        self._counters["searches"] += 1
+
+        # Let searches issued in this loop iteration join the same batch
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._dispatch_ready)
+
+        return await future
+
+    def _dispatch_ready(self) -> None:
+        self._scheduled = False
+        while self._pending and self._inflight < self.max_inflight:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+
+            self._inflight += 1
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[_PendingSearch]) -> None:
+        try:
+            # Callers cancelled while queued don't need results
+            batch = [item for item in batch if not item.future.done()]
+            if not batch:
+                return
+
+            self._counters["largest_batch"] = max(self._counters["largest_batch"], len(batch))
+
+            # One statement per top_k (normally there is only RAG_TOP_K)
+            by_top_k: Dict[int, List[_PendingSearch]] = {}
+            for item in batch:
+                by_top_k.setdefault(item.top_k, []).append(item)
+
+            for top_k, items in by_top_k.items():
+                self._counters["statements"] += 1
+                try:
+                    results = await self.store.search_many(
+                        [(item.embedding, item.payer_name, item.query_text) for item in items],
+                        top_k
+                    )
+                except Exception as e:
+                    self._counters["errors"] += 1
+                    self.logger.warning("policy_search_batch_failed", size=len(items), error=str(e))
+                    for item in items:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+                    continue
+
+                for item, excerpts in zip(items, results):
+                    if not item.future.done():
+                        item.future.set_result(excerpts)
+        finally:
+            self._inflight -= 1
+            if self._pending:
+                self._dispatch_ready()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters."""
+        statements = self._counters["statements"]
+        return {
+            **self._counters,
+            "max_batch_size": self.max_batch_size,
+            "max_inflight": self.max_inflight,
+            "mean_batch_size": round(self._counters["searches"] / statements, 2) if statements else 0.0,
+            "pending": len(self._pending),
+            "inflight": self._inflight
+        }
@@ -1,23 +1,56 @@
 """
 Database Session Management
 
-Provides SQLAlchemy engine and session management.
+Provides SQLAlchemy engines and session management.
+
+Application code (API routers, agents, job workers) uses the asyncpg-backed
+AsyncEngine through AsyncSessionLocal/get_async_db, so queries never block
+the event loop. The synchronous psycopg2 engine is kept for scripts and
+migrations only.
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.core.config import settings
 
-# Create SQLAlchemy engine
+
+def to_async_url(url: str) -> str:
+    """Rewrite a postgresql:// (or +psycopg2) URL to use the asyncpg driver."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+# Create async SQLAlchemy engine (asyncpg)
+async_engine = create_async_engine(
+    to_async_url(settings.DATABASE_URL),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=True,  # Verify connections before using
+)
+
+# Create AsyncSessionLocal class; objects stay usable after commit
+# because async sessions cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Synchronous engine for scripts and migrations
 engine = create_engine(
     settings.DATABASE_URL,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
     pool_timeout=settings.DB_POOL_TIMEOUT,
-    pool_pre_ping=True,  # Verify connections before using
+    pool_pre_ping=True,
 )
 
 # Create SessionLocal class
@@ -27,14 +60,27 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency function to get database session.
-    
+    Dependency function to get an async database session.
+
     Usage:
         @app.get("/items")
-        def get_items(db: Session = Depends(get_db)):
-            return db.query(Item).all()
+        async def get_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            return result.scalars().all()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_db() -> Generator[Session, None, None]:
+    """
+    Synchronous session for scripts and migrations.
+
+    Usage:
+        db = next(get_db())
+        db.query(Item).all()
     """
     db = SessionLocal()
     try:
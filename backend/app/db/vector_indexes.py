@@ -0,0 +1,427 @@
+"""
+Vector Index Management
+
+Builds, lists and evaluates the ANN indexes on policies.embedding.
+
+Retrieval always filters by payer_name. A global ANN index applies that
+filter after the scan, so a payer with a small share of the corpus can
+get fewer than top_k rows back. Two remedies are supported:
+- A global HNSW index (no training step, good recall on a growing table)
+- Per-payer indexes, which search only that payer's vectors: on the
+  payer's own partition, or a partial index (`WHERE payer_name = ...`)
+  for payers still in the default partition
+
+On the partitioned policies table a global index is an index per
+partition attached to a parent index, since CREATE INDEX CONCURRENTLY
+cannot target a partitioned table directly.
+
+Index parameters are sized from row counts following pgvector's
+guidance (IVFFlat lists = rows / 1000, or sqrt(rows) above 1M rows).
+recall_report() compares ANN results against exact search so
+ef_search/probes (and the quantized search precision) can be chosen
+from measured latency and recall; storage_report() gives the bytes per
+row and index size of each precision.
+
+DDL runs over the vector store's asyncpg pool with CREATE INDEX
+CONCURRENTLY, so searches keep working during a build. A rebuild
+creates the new index under a staging name and renames it over the old
+one in a short transaction, so the old index serves queries until the
+swap and is dropped afterwards.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import math
+import re
+import time
+import structlog
+
+import numpy as np
+
+from app.db.partitions import DEFAULT_PARTITION, list_partitions, partition_for_payer
+from app.db.vector_store import PRECISIONS, policy_vector_store, search_policies_sql
+from app.services.job_queue import NonRetryableJobError, register_job_handler
+
+logger = structlog.get_logger()
+
+BUILD_VECTOR_INDEX_JOB = "build_vector_index"
+
+INDEX_PREFIX = "idx_policies_embedding"
+INDEX_KINDS = ("hnsw", "ivfflat")
+
+# Indexed column and operator class per search precision
+INDEX_COLUMNS = {
+    "full": ("embedding", "vector_cosine_ops"),
+    "halfvec": ("embedding_half", "halfvec_cosine_ops"),
+    "binary": ("embedding_bits", "bit_hamming_ops"),
+}
+
+_UNSAFE_NAME_CHARS = re.compile(r"[^a-z0-9]+")
+
+# Indexes on policies and on each of its payer partitions
+_LIST_INDEXES_SQL = """
+    SELECT c.relname AS name,
+           t.relname AS table_name,
+           am.amname AS kind,
+           pg_get_indexdef(c.oid) AS definition,
+           pg_relation_size(c.oid) AS size_bytes,
+           i.indisvalid AS valid,
+           c.relkind = 'I' AS partitioned,
+           parent.relname AS parent_index
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_am am ON am.oid = c.relam
+    LEFT JOIN pg_inherits ih ON ih.inhrelid = c.oid
+    LEFT JOIN pg_class parent ON parent.oid = ih.inhparent
+    WHERE am.amname IN ('hnsw', 'ivfflat')
+      AND (i.indrelid = 'policies'::regclass
+           OR i.indrelid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'policies'::regclass))
+    ORDER BY t.relname, c.relname
+"""
+
+_SAMPLE_QUERIES_SQL = """
+    SELECT embedding, payer_name
+    FROM policies
+    WHERE embedding IS NOT NULL AND ($1::text IS NULL OR payer_name = $1)
+    ORDER BY random()
+    LIMIT $2
+"""
+
+
+_STORAGE_SQL = """
+    SELECT count(*) AS rows,
+           avg(pg_column_size(embedding)) AS embedding,
+           avg(pg_column_size(embedding_half)) AS embedding_half,
+           avg(pg_column_size(embedding_bits)) AS embedding_bits
+    FROM policies
+    WHERE embedding IS NOT NULL
+"""
+
+
+class VectorIndexError(NonRetryableJobError):
+    """Raised for invalid index build or drop requests."""
+
+
+def recommended_params(kind: str, row_count: int) -> Dict[str, int]:
+    """Size index parameters for a table (or partition) of row_count vectors."""
+    if kind == "ivfflat":
+        lists = row_count // 1000 if row_count <= 1_000_000 else int(math.sqrt(row_count))
+        lists = max(lists, 1)
+        return {"lists": lists, "probes": max(1, int(math.sqrt(lists)))}
+
+    if row_count < 100_000:
+        return {"m": 16, "ef_construction": 64}
+    if row_count < 1_000_000:
+        return {"m": 16, "ef_construction": 128}
+    return {"m": 24, "ef_construction": 200}
+
+
+def index_name(kind: str, payer_name: Optional[str] = None, precision: str = "full") -> str:
+    """Deterministic index name (per precision, and per payer for partial indexes)."""
+    name = f"{INDEX_PREFIX}_{kind}" if precision == "full" else f"{INDEX_PREFIX}_{kind}_{precision}"
+    if payer_name is None:
+        return name
+
+    slug = _UNSAFE_NAME_CHARS.sub("_", payer_name.lower()).strip("_")[:24]
+    digest = hashlib.sha1(payer_name.encode("utf-8")).hexdigest()[:8]
+    return f"{name}_{slug}_{digest}"
+
+
+def _child_index_name(name: str, partition: str) -> str:
+    # Partition names can be long; keep within the 63-byte identifier limit
+    return f"{name[:50]}_{hashlib.sha1(partition.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _swap_name(name: str, suffix: str) -> str:
+    # Staging ("new") and retired ("old") names used while swapping an index
+    return f"{name[:58]}_{suffix}"
+
+
+async def _drop_if_exists(connection, name: str) -> None:
+    relkind = await connection.fetchval("SELECT relkind FROM pg_class WHERE oid = to_regclass($1)", name)
+    if relkind == "I":
+        # Drops every partition's index; CONCURRENTLY isn't supported here
+        await connection.execute(f"DROP INDEX IF EXISTS {name}")
+    elif relkind == "i":
+        await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+async def _swap_indexes(connection, names: List[Tuple[str, str]]) -> None:
+    """Rename each (final, staging) pair into place in one transaction, retiring the old indexes."""
+    async with connection.transaction():
+        for final, _ in names:
+            await connection.execute(f"ALTER INDEX IF EXISTS {final} RENAME TO {_swap_name(final, 'old')}")
+        for final, staging in names:
+            await connection.execute(f"ALTER INDEX {staging} RENAME TO {final}")
+
+
+def _quote_literal(value: str) -> str:
+    # DDL predicates can't take bind parameters
+    return "'" + value.replace("'", "''") + "'"
+
+
+async def list_indexes() -> List[Dict[str, Any]]:
+    """List ANN indexes on policies with their definitions and sizes."""
+    pool = await policy_vector_store.get_pool()
+    rows = await pool.fetch(_LIST_INDEXES_SQL)
+    return [dict(row) for row in rows]
+
+
+async def count_vectors(payer_name: Optional[str] = None) -> int:
+    pool = await policy_vector_store.get_pool()
+    return await pool.fetchval(
+        "SELECT count(*) FROM policies WHERE embedding IS NOT NULL AND ($1::text IS NULL OR payer_name = $1)",
+        payer_name
+    )
+
+
+async def build_index(
+    kind: str = "hnsw",
+    payer_name: Optional[str] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    lists: Optional[int] = None,
+    precision: str = "full"
+) -> Dict[str, Any]:
+    """
+    (Re)build a global or per-payer ANN index.
+
+    Unset parameters are sized from the number of embedded rows the
+    index will cover. `precision` selects the full, halfvec or binary
+    embedding column. An existing index keeps serving queries until the
+    new one is built and renamed into its place.
+
+    Raises:
+        VectorIndexError: If the index kind or precision is unknown
+    """
+    if kind not in INDEX_KINDS:
+        raise VectorIndexError(f"Unknown index kind '{kind}'. Supported: {', '.join(INDEX_KINDS)}")
+    if precision not in INDEX_COLUMNS:
+        raise VectorIndexError(f"Unknown precision '{precision}'. Supported: {', '.join(INDEX_COLUMNS)}")
+
+    row_count = await count_vectors(payer_name)
+    params = recommended_params(kind, row_count)
+
+    if kind == "hnsw":
+        with_clause = f"m = {int(m or params['m'])}, ef_construction = {int(ef_construction or params['ef_construction'])}"
+    else:
+        with_clause = f"lists = {int(lists or params['lists'])}"
+
+    name = index_name(kind, payer_name, precision)
+    column, operator_class = INDEX_COLUMNS[precision]
+    method = f"USING {kind} ({column} {operator_class}) WITH ({with_clause})"
+
+    log = logger.bind(index=name, rows=row_count)
+    log.info("vector_index_build_started", method=method, payer_name=payer_name)
+    started = time.monotonic()
+
+    pool = await policy_vector_store.get_pool()
+    partitioned = await pool.fetchval("SELECT relkind = 'p' FROM pg_class WHERE oid = 'policies'::regclass")
+
+    async with pool.acquire() as connection:
+        if partitioned and not payer_name:
+            children = [
+                (_child_index_name(name, partition["name"]), partition["name"])
+                for partition in await list_partitions()
+            ]
+        else:
+            children = []
+        names = [(name, _swap_name(name, "new"))]
+        names += [(child, _swap_name(child, "new")) for child, _ in children]
+
+        # Leftovers of an interrupted build; a partitioned parent goes
+        # first since it takes its attached children with it
+        for final, leftover in names:
+            await _drop_if_exists(connection, leftover)
+            await _drop_if_exists(connection, _swap_name(final, "old"))
+
+        staging = names[0][1]
+        # CONCURRENTLY can't run inside a transaction block
+        if payer_name and partitioned:
+            # A payer with its own partition gets a plain index on it;
+            # one still in the default partition gets a partial index there
+            partition = await partition_for_payer(payer_name)
+            where_clause = "" if partition else f" WHERE payer_name = {_quote_literal(payer_name)}"
+            await connection.execute(
+                f"CREATE INDEX CONCURRENTLY {staging} ON {partition or DEFAULT_PARTITION} {method}{where_clause}"
+            )
+        elif partitioned:
+            # CONCURRENTLY isn't supported on a partitioned table: create
+            # the parent index ONLY (invalid until complete), build each
+            # partition's index concurrently and attach it
+            await connection.execute(f"CREATE INDEX {staging} ON ONLY policies {method}")
+            for (_, child_staging), (_, partition) in zip(names[1:], children):
+                await connection.execute(f"CREATE INDEX CONCURRENTLY {child_staging} ON {partition} {method}")
+                await connection.execute(f"ALTER INDEX {staging} ATTACH PARTITION {child_staging}")
+        else:
+            where_clause = f" WHERE payer_name = {_quote_literal(payer_name)}" if payer_name else ""
+            await connection.execute(f"CREATE INDEX CONCURRENTLY {staging} ON policies {method}{where_clause}")
+
+        await _swap_indexes(connection, names)
+        # The retired parent takes its children with it
+        await _drop_if_exists(connection, _swap_name(name, "old"))
+
+        await connection.execute("ANALYZE policies")
+
+    duration_s = round(time.monotonic() - started, 2)
+    log.info("vector_index_build_completed", duration_s=duration_s)
+
+    return {
+        "name": name,
+        "kind": kind,
+        "precision": precision,
+        "payer_name": payer_name,
+        "rows": row_count,
+        "method": method,
+        "recommended": params,
+        "duration_s": duration_s
+    }
+
+
+async def drop_index(name: str) -> None:
+    """
+    Drop an ANN index on policies or one of its partitions.
+
+    Raises:
+        VectorIndexError: If the name isn't a policies vector index, or is
+            a partition's piece of a partitioned index
+    """
+    index = next((index for index in await list_indexes() if index["name"] == name), None)
+    if index is None or not name.startswith(INDEX_PREFIX):
+        raise VectorIndexError(f"{name} is not a vector index on policies")
+    if index["parent_index"]:
+        raise VectorIndexError(f"{name} belongs to {index['parent_index']}; drop that index instead")
+
+    pool = await policy_vector_store.get_pool()
+    async with pool.acquire() as connection:
+        if index["partitioned"]:
+            # Drops every partition's index; CONCURRENTLY isn't supported here
+            await connection.execute(f"DROP INDEX IF EXISTS {name}")
+        else:
+            await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    logger.info("vector_index_dropped", index=name)
+
+
+async def storage_report() -> Dict[str, Any]:
+    """Average stored bytes per embedding and total index bytes, per precision."""
+    pool = await policy_vector_store.get_pool()
+    row = await pool.fetchrow(_STORAGE_SQL)
+    indexes = await list_indexes()
+
+    report = {"rows": row["rows"], "precisions": {}}
+    for precision, (column, _) in INDEX_COLUMNS.items():
+        report["precisions"][precision] = {
+            "column": column,
+            "avg_bytes_per_row": round(float(row[column] or 0), 1),
+            "index_bytes": sum(
+                index["size_bytes"] for index in indexes
+                if f"({column} " in index["definition"]
+            )
+        }
+    return report
+
+
+async def _timed_search(connection, tuning: Dict[str, str], sql: str, args: List[Any]):
+    async with connection.transaction():
+        for setting, value in tuning.items():
+            await connection.execute("SELECT set_config($1, $2, true)", setting, value)
+        started = time.perf_counter()
+        rows = await connection.fetch(sql, *args)
+        return [row["id"] for row in rows], (time.perf_counter() - started) * 1000.0
+
+
+async def recall_report(
+    payer_name: Optional[str] = None,
+    sample_size: int = 50,
+    top_k: int = 3,
+    ef_search: Optional[List[int]] = None,
+    probes: Optional[List[int]] = None,
+    precision: str = "full",
+    rerank_multiplier: int = 4
+) -> Dict[str, Any]:
+    """
+    Measure ANN recall@k and latency against exact search.
+
+    Stored policy embeddings are sampled as queries. The ground truth is
+    an exact full-precision scan (index scans disabled); each
+    ef_search/probes value is then run with SET LOCAL, using the
+    `precision` first pass re-ranked from top_k x rerank_multiplier
+    candidates.
+
+    Returns:
+        Exact-search latency and one recall/latency point per setting
+
+    Raises:
+        VectorIndexError: If the precision is unknown
+    """
+    if precision not in PRECISIONS:
+        raise VectorIndexError(f"Unknown precision '{precision}'. Supported: {', '.join(PRECISIONS)}")
+
+    if ef_search is None:
+        ef_search = [10, 20, 40, 80, 160]
+    if probes is None:
+        probes = [1, 5, 10, 20]
+    grid = [{"hnsw.ef_search": str(value)} for value in ef_search]
+    grid += [{"ivfflat.probes": str(value)} for value in probes]
+
+    exact_sql = search_policies_sql("full")
+    ann_sql = search_policies_sql(precision)
+    extra_args = [] if precision == "full" else [top_k * max(1, rerank_multiplier)]
+
+    pool = await policy_vector_store.get_pool()
+    async with pool.acquire() as connection:
+        samples = await connection.fetch(_SAMPLE_QUERIES_SQL, payer_name, sample_size)
+        if not samples:
+            return {"samples": 0, "top_k": top_k, "precision": precision, "exact_latency_ms": None, "points": []}
+
+        queries = [
+            [np.asarray(sample["embedding"], dtype=np.float32), sample["payer_name"], top_k]
+            for sample in samples
+        ]
+
+        truths = []
+        exact_latencies = []
+        for args in queries:
+            ids, latency = await _timed_search(
+                connection,
+                {"enable_indexscan": "off", "enable_bitmapscan": "off"},
+                exact_sql,
+                args
+            )
+            truths.append(set(ids))
+            exact_latencies.append(latency)
+
+        points = []
+        for tuning in grid:
+            recalls = []
+            latencies = []
+            for args, truth in zip(queries, truths):
+                ids, latency = await _timed_search(connection, tuning, ann_sql, args + extra_args)
+                recalls.append(len(truth.intersection(ids)) / len(truth) if truth else 1.0)
+                latencies.append(latency)
+
+            points.append({
+                "setting": tuning,
+                "recall": round(float(np.mean(recalls)), 4),
+                "mean_latency_ms": round(float(np.mean(latencies)), 3),
+                "p95_latency_ms": round(float(np.percentile(latencies, 95)), 3)
+            })
+
+    return {
+        "samples": len(samples),
+        "top_k": top_k,
+        "payer_name": payer_name,
+        "precision": precision,
+        "rerank_multiplier": rerank_multiplier if precision != "full" else None,
+        "indexes": [index["name"] for index in await list_indexes()],
+        "exact_latency_ms": round(float(np.mean(exact_latencies)), 3),
+        "points": points
+    }
+
+
+@register_job_handler(BUILD_VECTOR_INDEX_JOB)
+async def handle_build_vector_index(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler for `build_vector_index` jobs (build_index() kwargs)."""
+    return await build_index(**payload)
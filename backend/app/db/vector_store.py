@@ -0,0 +1,553 @@
+"""
+Policy Vector Store
+
+Dedicated asyncpg connection pool for pgvector similarity search, the
+hottest query in the workflow.
+
+Compared to going through SQLAlchemy with a text-formatted vector:
+- Embeddings are sent as float32 numpy arrays through pgvector's binary
+  codec (registered on every pooled connection) instead of a decimal
+  string of 1536 numbers
+- The query references the embedding parameter once
+- asyncpg prepares the statement server-side on first use per connection
+  and reuses it from its statement cache afterwards
+
+With RETRIEVAL_MODE=hybrid the vector query runs alongside a full-text
+query on the generated `search_vector` column (GIN-indexed) in the same
+statement, and the two rankings are merged with reciprocal rank fusion:
+score = sum(1 / (RRF_K + rank)). Exact tokens such as CPT/denial codes
+and section numbers, which embeddings blur, are then still found.
+
+RETRIEVAL_GRANULARITY=chunk searches policy_chunks (token-bounded
+pieces of each section) instead of whole sections; excerpts keep the
+parent section's id and title.
+
+VECTOR_SEARCH_PRECISION=halfvec|binary runs the ANN first pass on the
+generated half-precision or binary-quantized copy of the embedding
+(with its own, much smaller index), takes VECTOR_RERANK_MULTIPLIER x
+the requested rows, and re-ranks them with full-precision distance.
+
+search_many() runs N searches in one statement: the per-query
+embeddings, payers and query texts are passed as arrays, unnested, and
+the single-query search runs once per element as a LATERAL subquery.
+
+open() checks that the embedding columns have the dimension the
+configured embedding model produces (EmbeddingFactory.dimension()) and
+raises EmbeddingDimensionError otherwise, instead of letting every
+write and search fail with a pgvector dimension error.
+
+Set VECTOR_STATEMENT_CACHE_SIZE=0 when connecting through PgBouncer in
+transaction pooling mode, which cannot hold prepared statements.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import structlog
+
+import asyncpg
+import numpy as np
+from pgvector.asyncpg import register_vector
+
+from app.core.config import settings
+from app.core.embedding_factory import EmbeddingFactory
+
+logger = structlog.get_logger()
+
+# First-pass ordering on the compact copies of policies.embedding; the
+# candidates are re-ranked with full-precision cosine distance.
+# {vector} is the query embedding expression ($1, or a LATERAL column).
+FIRST_PASS_ORDER = {
+    "halfvec": "embedding_half <=> CAST(CAST({vector} AS vector) AS halfvec)",
+    "binary": "embedding_bits <~> binary_quantize(CAST({vector} AS vector))",
+}
+
+PRECISIONS = ("full", *FIRST_PASS_ORDER)
+
+# Searched table and excerpt columns per RETRIEVAL_GRANULARITY. Chunk
+# excerpts carry the parent policy id and section title, so citations
+# and callers work the same at either granularity.
+RETRIEVAL_SOURCES = {
+    "section": ("policies", "p.id, p.section_title, p.section_text, p.payer_name"),
+    "chunk": (
+        "policy_chunks",
+        "p.policy_id AS id, p.section_title, p.chunk_text AS section_text, p.payer_name, "
+        "p.id AS chunk_id, p.chunk_index"
+    ),
+}
+
+GRANULARITIES = tuple(RETRIEVAL_SOURCES)
+
+
+def nearest_policies_sql(
+    precision: str,
+    limit: str,
+    candidates: str,
+    table: str = "policies",
+    vector: str = "$1",
+    payer: str = "$2"
+) -> str:
+    """
+    Subquery yielding (id, distance) of a payer's nearest policies.
+
+    Args:
+        precision: "full", "halfvec" or "binary" first pass
+        limit: Placeholder for the number of rows to return
+        candidates: Placeholder for the first-pass candidate count
+            (ignored for full precision)
+        table: policies or policy_chunks
+        vector: Query embedding expression
+        payer: Payer name expression
+    """
+    if precision == "full":
+        return f"""
+            SELECT id, embedding <=> {vector} AS distance
+            FROM {table}
+            WHERE payer_name = {payer} AND embedding IS NOT NULL
+            ORDER BY distance
+            LIMIT {limit}
+        """
+
+    return f"""
+            SELECT id, embedding <=> {vector} AS distance
+            FROM (
+                SELECT id, embedding
+                FROM {table}
+                WHERE payer_name = {payer} AND embedding IS NOT NULL
+                ORDER BY {FIRST_PASS_ORDER[precision].format(vector=vector)}
+                LIMIT {candidates}
+            ) candidates
+            ORDER BY distance
+            LIMIT {limit}
+        """
+
+
+def _vector_search_body(
+    precision: str,
+    granularity: str,
+    vector: str,
+    payer: str,
+    top_k: str,
+    first_pass: str
+) -> str:
+    table, columns = RETRIEVAL_SOURCES[granularity]
+    return f"""
+    SELECT {columns}, 1 - nearest.distance AS similarity
+    FROM ({nearest_policies_sql(precision, top_k, first_pass, table, vector, payer)}) nearest
+    JOIN {table} p ON p.id = nearest.id AND p.payer_name = {payer}
+    ORDER BY nearest.distance
+"""
+
+
+# Lexical leg: any query term may match (plainto_tsquery ANDs them, so
+# '&' is swapped for '|'); title hits outweigh body hits via setweight.
+# Written with derived tables rather than CTEs so the same body can run
+# as a LATERAL subquery per element in search_many.
+def _hybrid_search_body(
+    precision: str,
+    granularity: str,
+    vector: str,
+    payer: str,
+    query: str,
+    candidates: str,
+    rrf_k: str,
+    top_k: str,
+    first_pass: str
+) -> str:
+    table, columns = RETRIEVAL_SOURCES[granularity]
+    return f"""
+    SELECT {columns},
+           COALESCE(1 - s.distance, 1 - (p.embedding <=> {vector}), 0) AS similarity,
+           COALESCE(1.0 / ({rrf_k} + s.rank), 0) + COALESCE(1.0 / ({rrf_k} + l.rank), 0) AS rrf_score
+    FROM (
+        SELECT id, distance, row_number() OVER (ORDER BY distance) AS rank
+        FROM ({nearest_policies_sql(precision, candidates, first_pass, table, vector, payer)}) nearest
+    ) s
+    FULL OUTER JOIN (
+        SELECT id, row_number() OVER (ORDER BY score DESC) AS rank
+        FROM (
+            SELECT id, ts_rank_cd(search_vector, tsq) AS score
+            FROM {table},
+                 CAST(replace(CAST(plainto_tsquery('english', {query}) AS text), '&', '|') AS tsquery) AS tsq
+            WHERE payer_name = {payer} AND search_vector @@ tsq
+            ORDER BY score DESC
+            LIMIT {candidates}
+        ) matched
+    ) l ON l.id = s.id
+    JOIN {table} p ON p.id = COALESCE(s.id, l.id) AND p.payer_name = {payer}
+    ORDER BY rrf_score DESC
+    LIMIT {top_k}
+"""
+
+
+def search_policies_sql(precision: str = "full", granularity: str = "section") -> str:
+    """Vector search: $1 embedding, $2 payer, $3 top_k, $4 first-pass candidates."""
+    return _vector_search_body(precision, granularity, "$1", "$2", "$3", "$4")
+
+
+def hybrid_search_policies_sql(precision: str = "full", granularity: str = "section") -> str:
+    """
+    Hybrid search: $1 embedding, $2 payer, $3 query text, $4 candidates
+    per leg, $5 RRF k, $6 top_k, $7 first-pass candidates.
+    """
+    return _hybrid_search_body(precision, granularity, "$1", "$2", "$3", "$4", "$5", "$6", "$7")
+
+
+def search_many_policies_sql(precision: str = "full", granularity: str = "section") -> str:
+    """
+    Batched vector search: $1 embeddings, $2 payers, $3 top_k, $4
+    first-pass candidates. Rows carry `ord`, the 1-based query position.
+    """
+    body = _vector_search_body(precision, granularity, "q.query_embedding", "q.query_payer", "$3", "$4")
+    return f"""
+    SELECT q.ord, r.*
+    FROM unnest($1::vector[], $2::text[]) WITH ORDINALITY AS q(query_embedding, query_payer, ord)
+    CROSS JOIN LATERAL ({body}) r
+    ORDER BY q.ord
+"""
+
+
+def hybrid_search_many_policies_sql(precision: str = "full", granularity: str = "section") -> str:
+    """
+    Batched hybrid search: $1 embeddings, $2 payers, $3 query texts, $4
+    candidates per leg, $5 RRF k, $6 top_k, $7 first-pass candidates.
+    Rows carry `ord`, the 1-based query position.
+    """
+    body = _hybrid_search_body(
+        precision, granularity, "q.query_embedding", "q.query_payer", "q.query_text", "$4", "$5", "$6", "$7"
+    )
+    return f"""
+    SELECT q.ord, r.*
+    FROM unnest($1::vector[], $2::text[], $3::text[]) WITH ORDINALITY AS q(query_embedding, query_payer, query_text, ord)
+    CROSS JOIN LATERAL ({body}) r
+    ORDER BY q.ord
+"""
+
+
+SEARCH_POLICIES_SQL = search_policies_sql("full")
+
+
+# Changes whenever a payer's embedded policies (or chunks) are added,
+# removed, re-embedded (indexed_at) or edited
+PAYER_FINGERPRINT_SQL = {
+    "section": """
+        SELECT md5(coalesce(string_agg(
+            id::text || ':' || coalesce(extract(epoch FROM indexed_at)::text, '') || ':' || md5(section_title || section_text),
+            ',' ORDER BY id
+        ), ''))
+        FROM policies
+        WHERE payer_name = $1 AND embedding IS NOT NULL
+    """,
+    "chunk": """
+        SELECT md5(coalesce(string_agg(
+            id::text || ':' || coalesce(extract(epoch FROM indexed_at)::text, '') || ':' || md5(section_title || chunk_text),
+            ',' ORDER BY id
+        ), ''))
+        FROM policy_chunks
+        WHERE payer_name = $1 AND embedding IS NOT NULL
+    """,
+}
+
+PAYER_EMBEDDINGS_SQL = {
+    "section": """
+        SELECT id, section_title, section_text, embedding
+        FROM policies
+        WHERE payer_name = $1 AND embedding IS NOT NULL
+        ORDER BY id
+    """,
+    "chunk": """
+        SELECT policy_id AS id, section_title, chunk_text AS section_text, id AS chunk_id, chunk_index, embedding
+        FROM policy_chunks
+        WHERE payer_name = $1 AND embedding IS NOT NULL
+        ORDER BY policy_id, chunk_index
+    """,
+}
+
+
+# Declared dimension (typmod) of each table's embedding column; tables
+# that don't exist yet are skipped
+_EMBEDDING_COLUMN_DIMENSIONS_SQL = """
+    SELECT c.relname AS table_name, a.atttypmod AS dimension
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    WHERE a.attrelid IN (to_regclass('policies'), to_regclass('policy_chunks'))
+      AND a.attname = 'embedding'
+      AND NOT a.attisdropped
+"""
+
+
+class EmbeddingDimensionError(RuntimeError):
+    """The embedding columns don't match the configured embedding model."""
+
+
+def vector_search_settings() -> Dict[str, str]:
+    """Session-level pgvector settings for search connections."""
+    search_settings = {
+        "hnsw.ef_search": str(settings.VECTOR_HNSW_EF_SEARCH),
+        "ivfflat.probes": str(settings.VECTOR_IVFFLAT_PROBES)
+    }
+    # pgvector >= 0.8 only; keeps scanning until filtered rows fill LIMIT
+    if settings.VECTOR_ITERATIVE_SCAN:
+        search_settings["hnsw.iterative_scan"] = settings.VECTOR_ITERATIVE_SCAN
+        search_settings["ivfflat.iterative_scan"] = "relaxed_order"  # The only IVFFlat mode
+    return search_settings
+
+
+def to_asyncpg_dsn(url: str) -> str:
+    """Strip the SQLAlchemy driver suffix (postgresql+asyncpg:// -> postgresql://)."""
+    scheme, sep, rest = url.partition("://")
+    return f"{scheme.split('+')[0]}{sep}{rest}"
+
+
+class PolicyVectorStore:
+    """
+    Pooled asyncpg access to the policies table for vector search.
+
+    The pool is opened by the FastAPI lifespan (or lazily on first use,
+    e.g. in standalone workers) and closed on shutdown.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 2,
+        max_size: int = 10,
+        statement_cache_size: int = 100,
+        mode: str = "hybrid",
+        rrf_k: int = 60,
+        hybrid_candidates: int = 20,
+        search_settings: Optional[Dict[str, str]] = None,
+        precision: str = "full",
+        rerank_multiplier: int = 4,
+        granularity: str = "section",
+        dimension: Optional[int] = None
+    ):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.mode = mode
+        self.rrf_k = rrf_k
+        self.hybrid_candidates = hybrid_candidates
+        self.search_settings = search_settings or {}
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown vector search precision '{precision}'. Supported: {', '.join(PRECISIONS)}")
+        self.precision = precision
+        self.rerank_multiplier = max(1, rerank_multiplier)
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown retrieval granularity '{granularity}'. Supported: {', '.join(GRANULARITIES)}")
+        self.granularity = granularity
+        self.dimension = dimension
+        self._search_sql = search_policies_sql(precision, granularity)
+        self._hybrid_search_sql = hybrid_search_policies_sql(precision, granularity)
+        self._search_many_sql = search_many_policies_sql(precision, granularity)
+        self._hybrid_search_many_sql = hybrid_search_many_policies_sql(precision, granularity)
+        self._pool: Optional[asyncpg.Pool] = None
+        self._open_lock = asyncio.Lock()
+        self.logger = logger.bind(component="policy_vector_store")
+
+    async def _init_connection(self, connection: asyncpg.Connection) -> None:
+        await register_vector(connection)
+
+        # ANN tuning (hnsw.ef_search, ivfflat.probes, ...) applies to every
+        # search on this connection without a per-query SET round trip
+        for name, value in self.search_settings.items():
+            await connection.execute("SELECT set_config($1, $2, false)", name, value)
+
+    async def open(self) -> None:
+        """Create the connection pool (idempotent)."""
+        async with self._open_lock:
+            if self._pool is not None:
+                return
+            self._pool = await asyncpg.create_pool(
+                self.dsn,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                statement_cache_size=self.statement_cache_size,
+                init=self._init_connection,
+                # Per-payer partial indexes only match a plan that knows
+                # the payer_name value, never a generic prepared plan
+                server_settings={"plan_cache_mode": "force_custom_plan"}
+            )
+            try:
+                await self._check_dimension()
+            except BaseException:
+                pool, self._pool = self._pool, None
+                await pool.close()
+                raise
+            self.logger.info("vector_store_opened", min_size=self.min_size, max_size=self.max_size)
+
+    async def _check_dimension(self) -> None:
+        """Raise EmbeddingDimensionError if a column's dimension differs from self.dimension."""
+        if not self.dimension:
+            return
+
+        rows = await self._pool.fetch(_EMBEDDING_COLUMN_DIMENSIONS_SQL)
+        mismatched = [row for row in rows if row["dimension"] != self.dimension]
+        if mismatched:
+            columns = ", ".join(f"{row['table_name']}.embedding is vector({row['dimension']})" for row in mismatched)
+            raise EmbeddingDimensionError(
+                f"{columns}, but the embedding model ({settings.EMBEDDING_PROVIDER}) produces "
+                f"{self.dimension} dimensions. Choose an embedding model (or EMBEDDING_DIMENSION) that "
+                f"matches the columns, or recreate them as vector({self.dimension}) (with their halfvec/bit copies) "
+                "and re-embed the policies."
+            )
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+            self.logger.info("vector_store_closed")
+
+    async def get_pool(self) -> asyncpg.Pool:
+        """Return the pool, opening it on first use."""
+        if self._pool is None:
+            await self.open()
+        return self._pool
+
+    async def search(
+        self,
+        embedding: Sequence[float],
+        payer_name: str,
+        top_k: int,
+        query_text: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the policy sections most relevant to a query for one payer.
+
+        Args:
+            embedding: Query embedding
+            payer_name: Payer whose policies are searched
+            top_k: Number of excerpts to return
+            query_text: Raw query for the full-text leg (hybrid mode only)
+
+        Returns:
+            Excerpts ordered by cosine similarity, or by fused RRF score
+            (`rrf_score`) in hybrid mode. At chunk granularity `id` and
+            `section_title` are the parent section's, `section_text` is
+            the chunk, and `chunk_id`/`chunk_index` are added.
+        """
+        pool = await self.get_pool()
+        vector = np.asarray(embedding, dtype=np.float32)
+
+        hybrid = self.mode == "hybrid" and bool(query_text)
+        if hybrid:
+            candidates = max(self.hybrid_candidates, top_k)
+            args = [vector, payer_name, query_text, candidates, self.rrf_k, top_k]
+            if self.precision != "full":
+                args.append(candidates * self.rerank_multiplier)
+            rows = await pool.fetch(self._hybrid_search_sql, *args)
+        else:
+            args = [vector, payer_name, top_k]
+            if self.precision != "full":
+                args.append(top_k * self.rerank_multiplier)
+            rows = await pool.fetch(self._search_sql, *args)
+
+        return [self._to_excerpt(row, hybrid) for row in rows]
+
+    async def search_many(
+        self,
+        queries: Sequence[Tuple[Sequence[float], str, Optional[str]]],
+        top_k: int
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches in one statement.
+
+        Args:
+            queries: (embedding, payer_name, query_text) per search
+            top_k: Number of excerpts per search
+
+        Returns:
+            One excerpt list per query, in input order, each exactly as
+            search() would return it
+        """
+        if not queries:
+            return []
+
+        pool = await self.get_pool()
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+
+        # Hybrid and vector-only queries need different statements
+        groups: Dict[bool, List[int]] = {}
+        for index, (_, _, query_text) in enumerate(queries):
+            groups.setdefault(self.mode == "hybrid" and bool(query_text), []).append(index)
+
+        for hybrid, indexes in groups.items():
+            vectors = [np.asarray(queries[i][0], dtype=np.float32) for i in indexes]
+            payers = [queries[i][1] for i in indexes]
+            if hybrid:
+                candidates = max(self.hybrid_candidates, top_k)
+                args = [vectors, payers, [queries[i][2] for i in indexes], candidates, self.rrf_k, top_k]
+                if self.precision != "full":
+                    args.append(candidates * self.rerank_multiplier)
+                rows = await pool.fetch(self._hybrid_search_many_sql, *args)
+            else:
+                args = [vectors, payers, top_k]
+                if self.precision != "full":
+                    args.append(top_k * self.rerank_multiplier)
+                rows = await pool.fetch(self._search_many_sql, *args)
+
+            for row in rows:
+                results[indexes[row["ord"] - 1]].append(self._to_excerpt(row, hybrid))
+
+        # LATERAL rows keep no order across the outer join; restore each ranking
+        score = "rrf_score" if self.mode == "hybrid" else "similarity_score"
+        for excerpts in results:
+            excerpts.sort(key=lambda excerpt: excerpt.get(score, excerpt["similarity_score"]), reverse=True)
+        return results
+
+    def _to_excerpt(self, row: asyncpg.Record, hybrid: bool) -> Dict[str, Any]:
+        excerpt = {
+            "id": str(row["id"]),
+            "section_title": row["section_title"],
+            "section_text": row["section_text"],
+            "payer_name": row["payer_name"],
+            "similarity_score": float(row["similarity"])
+        }
+        if self.granularity == "chunk":
+            excerpt["chunk_id"] = str(row["chunk_id"])
+            excerpt["chunk_index"] = row["chunk_index"]
+        if hybrid:
+            excerpt["rrf_score"] = float(row["rrf_score"])
+        return excerpt
+
+    async def payer_fingerprint(self, payer_name: str) -> str:
+        """Hash identifying the current state of a payer's embedded policies."""
+        pool = await self.get_pool()
+        return await pool.fetchval(PAYER_FINGERPRINT_SQL[self.granularity], payer_name)
+
+    async def fetch_payer_embeddings(self, payer_name: str) -> List[Dict[str, Any]]:
+        """Load every embedded policy (or chunk) for a payer (for the local index)."""
+        pool = await self.get_pool()
+        rows = await pool.fetch(PAYER_EMBEDDINGS_SQL[self.granularity], payer_name)
+
+        policies = []
+        for row in rows:
+            policy = {
+                "id": str(row["id"]),
+                "section_title": row["section_title"],
+                "section_text": row["section_text"],
+                "embedding": row["embedding"]
+            }
+            if self.granularity == "chunk":
+                policy["chunk_id"] = str(row["chunk_id"])
+                policy["chunk_index"] = row["chunk_index"]
+            policies.append(policy)
+        return policies
+
+
+# Global vector store instance
+policy_vector_store = PolicyVectorStore(
+    to_asyncpg_dsn(settings.DATABASE_URL),
+    min_size=settings.VECTOR_POOL_MIN_SIZE,
+    max_size=settings.VECTOR_POOL_MAX_SIZE,
+    statement_cache_size=settings.VECTOR_STATEMENT_CACHE_SIZE,
+    mode=settings.RETRIEVAL_MODE,
+    rrf_k=settings.RRF_K,
+    hybrid_candidates=settings.HYBRID_CANDIDATES,
+    search_settings=vector_search_settings(),
+    precision=settings.VECTOR_SEARCH_PRECISION,
+    rerank_multiplier=settings.VECTOR_RERANK_MULTIPLIER,
+    granularity=settings.RETRIEVAL_GRANULARITY,
+    dimension=EmbeddingFactory.dimension()
+)
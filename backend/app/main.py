@@ -9,11 +9,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from datetime import datetime
+from sqlalchemy import text
 import structlog
 
 from app.core.config import settings
-from app.db.session import engine, Base
-from app.api import claims, appeals, policies, audit
+from app.db.session import async_engine, engine, Base
+from app.db.retrieval_cache import retrieval_cache
+from app.db.vector_store import EmbeddingDimensionError, policy_vector_store
+from app.core.provider_registry import provider_registry
+from app.core.embedding_factory import close_embedding_provider
+from app.services.workflow_service import init_workflow, reset_workflow
+from app.services.job_queue import job_worker_pool
+from app.api import claims, appeals, policies, audit, metrics, jobs, batches, admin
 
 # Configure structured logging
 structlog.configure(
@@ -38,9 +45,44 @@ async def lifespan(app: FastAPI):
     # Create tables (in production, use Alembic migrations)
     # Base.metadata.create_all(bind=engine)
     
+    # Build pooled LLM providers up front so the first claim
+    # doesn't pay client construction and connection setup
+    try:
+        provider_registry.warm_up()
+    except ValueError as e:
+        logger.warning("llm_provider_warmup_failed", error=str(e))
+    
+    # Build shared agents and compile the LangGraph workflow once;
+    # on failure it is retried lazily by the first request
+    try:
+        init_workflow()
+    except Exception as e:
+        logger.warning("workflow_init_failed", error=str(e))
+    
+    # Open the vector search pool; on failure retrieval opens it lazily.
+    # A schema/model dimension mismatch is fatal: nothing could be embedded
+    try:
+        await policy_vector_store.open()
+    except EmbeddingDimensionError:
+        raise
+    except Exception as e:
+        logger.warning("vector_store_open_failed", error=str(e))
+    
+    # In-process queue workers; set JOB_WORKERS=0 to run them
+    # only as standalone processes (python -m app.worker)
+    if settings.JOB_WORKERS > 0:
+        await job_worker_pool.start()
+    
     yield
     
     # Shutdown
+    await job_worker_pool.stop()
+    reset_workflow()
+    await provider_registry.aclose()
+    await close_embedding_provider()
+    await retrieval_cache.close()
+    await policy_vector_store.close()
+    await async_engine.dispose()
     logger.info("application_shutdown")
 
 
@@ -79,10 +121,8 @@ async def health_check():
     """Health check endpoint for monitoring."""
     try:
         # Test database connection
-        from app.db.session import SessionLocal
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
         db_status = "healthy"
     except Exception as e:
         db_status = f"unhealthy: {str(e)}"
@@ -117,6 +157,10 @@ app.include_router(claims.router, prefix="/api/v1/claims", tags=["Claims"])
 app.include_router(appeals.router, prefix="/api/v1/appeals", tags=["Appeals"])
 app.include_router(policies.router, prefix="/api/v1/policies", tags=["Policies"])
 app.include_router(audit.router, prefix="/api/v1/audit", tags=["Audit"])
+app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["Metrics"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
+app.include_router(batches.router, prefix="/api/v1/batches", tags=["Batches"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
 
 
 # =====================================================
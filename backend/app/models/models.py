@@ -2,21 +2,27 @@
 SQLAlchemy Models
 
 Defines database models for claims, policies, appeals, and audit logs.
+
+Models are used through AsyncSession, which cannot lazy-load: server
+defaults are fetched eagerly on write, and relationships must be loaded
+explicitly (selectinload) when needed.
 """
 
-from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import BigInteger, Column, Computed, String, Text, Boolean, Integer, DateTime, ForeignKey, ForeignKeyConstraint, JSON, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.postgresql import BIT, UUID, JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 import uuid
 
 from app.db.session import Base
+from app.core.embedding_factory import EmbeddingFactory
 
 
 class Claim(Base):
     """Claim denial record."""
     __tablename__ = "claims"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     claim_id = Column(String(100), unique=True, nullable=False, index=True)
@@ -34,21 +40,91 @@ class Claim(Base):
 
 
 class Policy(Base):
-    """Policy document with vector embeddings for RAG."""
+    """
+    Policy document with vector embeddings for RAG.
+
+    The table is LIST-partitioned by payer_name (see database/init.sql),
+    so the partition key is part of the primary key. Call
+    partitions.ensure_partition() before inserting a new payer's
+    policies; until then (or a rebalance) they land in policies_default.
+    """
     __tablename__ = "policies"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    payer_name = Column(String(200), nullable=False, index=True)
+    payer_name = Column(String(200), primary_key=True, index=True)
     section_title = Column(String(500), nullable=False)
     section_text = Column(Text, nullable=False)
-    embedding = Column(Vector(1536), nullable=True)  # OpenAI text-embedding-3-small
+    embedding = Column(Vector(EmbeddingFactory.dimension()), nullable=True)  # Follows EMBEDDING_PROVIDER/model
+    # Compact copies for the quantized ANN first pass (VECTOR_SEARCH_PRECISION)
+    embedding_half = Column(
+        HALFVEC(EmbeddingFactory.dimension()),
+        Computed(f"CAST(embedding AS halfvec({EmbeddingFactory.dimension()}))", persisted=True)
+    )
+    embedding_bits = Column(
+        BIT(EmbeddingFactory.dimension()),
+        Computed(f"CAST(binary_quantize(embedding) AS bit({EmbeddingFactory.dimension()}))", persisted=True)
+    )
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(section_title, '')), 'A') || "
+            "setweight(to_tsvector('english', section_text), 'B')",
+            persisted=True
+        )
+    )  # Full-text leg of hybrid retrieval
     metadata = Column(JSONB, nullable=True)
     indexed_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class PolicyChunk(Base):
+    """
+    Token-bounded, overlapping piece of a policy section (chunk-level RAG).
+
+    Partitioned by payer_name like policies, which it references by
+    (policy_id, payer_name).
+    """
+    __tablename__ = "policy_chunks"
+    __table_args__ = (
+        UniqueConstraint("policy_id", "payer_name", "chunk_index"),
+        ForeignKeyConstraint(
+            ["policy_id", "payer_name"],
+            ["policies.id", "policies.payer_name"],
+            ondelete="CASCADE"
+        ),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    policy_id = Column(UUID(as_uuid=True), nullable=False)
+    payer_name = Column(String(200), primary_key=True)
+    chunk_index = Column(Integer, nullable=False)
+    section_title = Column(String(500), nullable=False)  # Copied from the parent for citations
+    chunk_text = Column(Text, nullable=False)
+    token_count = Column(Integer, nullable=False)
+    embedding = Column(Vector(EmbeddingFactory.dimension()), nullable=True)
+    embedding_half = Column(
+        HALFVEC(EmbeddingFactory.dimension()),
+        Computed(f"CAST(embedding AS halfvec({EmbeddingFactory.dimension()}))", persisted=True)
+    )
+    embedding_bits = Column(
+        BIT(EmbeddingFactory.dimension()),
+        Computed(f"CAST(binary_quantize(embedding) AS bit({EmbeddingFactory.dimension()}))", persisted=True)
+    )
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(section_title, '')), 'A') || "
+            "setweight(to_tsvector('english', chunk_text), 'B')",
+            persisted=True
+        )
+    )
+    indexed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class Appeal(Base):
     """Generated appeal letter."""
     __tablename__ = "appeals"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     claim_id = Column(UUID(as_uuid=True), ForeignKey("claims.id", ondelete="CASCADE"), nullable=False)
@@ -72,6 +148,7 @@ class Appeal(Base):
 class AuditLog(Base):
     """Audit trail for agent executions."""
     __tablename__ = "audit_logs"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     claim_id = Column(UUID(as_uuid=True), ForeignKey("claims.id", ondelete="CASCADE"), nullable=True)
@@ -85,3 +162,131 @@ class AuditLog(Base):
     # Relationships
     claim = relationship("Claim", back_populates="audit_logs")
     appeal = relationship("Appeal", back_populates="audit_logs")
+
+
+class LLMCacheEntry(Base):
+    """Persistent tier of the deterministic LLM response cache."""
+    __tablename__ = "llm_response_cache"
+    
+    cache_key = Column(String(64), primary_key=True)  # SHA-256 of the full request
+    provider = Column(String(50), nullable=False)
+    model = Column(String(200), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class EmbeddingCacheEntry(Base):
+    """Persistent tier of the query-embedding cache."""
+    __tablename__ = "embedding_cache"
+    
+    cache_key = Column(String(64), primary_key=True)  # SHA-256 of provider, model, dimension, normalized text
+    provider = Column(String(50), nullable=False)
+    model = Column(String(200), nullable=False)
+    dimension = Column(Integer, nullable=False)
+    embedding = Column(LargeBinary, nullable=False)  # float32 little-endian
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class PolicyVersion(Base):
+    """Per-payer policy change counter (bumped by triggers on policies)."""
+    __tablename__ = "policy_versions"
+    
+    payer_name = Column(String(200), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class RetrievalCacheEntry(Base):
+    """Persisted (prewarmed) retrieval results for the retrieval cache."""
+    __tablename__ = "retrieval_cache_entries"
+    
+    payer_name = Column(String(200), primary_key=True)
+    namespace = Column(String(64), primary_key=True)  # Hash of embedding model and retrieval settings
+    category = Column(String(50), primary_key=True)  # Provisional (rule table) category
+    bucket = Column(BigInteger, primary_key=True)  # SimHash of the query embedding
+    policy_version = Column(BigInteger, nullable=False)
+    results = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Job(Base):
+    """Durable background job (claimed by workers with FOR UPDATE SKIP LOCKED)."""
+    __tablename__ = "jobs"
+    __mapper_args__ = {"eager_defaults": True}
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_type = Column(String(50), nullable=False, index=True)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    locked_by = Column(String(200), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class BatchRun(Base):
+    """Bulk processing run over many claims (executed as a process_batch job)."""
+    __tablename__ = "batch_runs"
+    __mapper_args__ = {"eager_defaults": True}
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="SET NULL"), nullable=True)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, completed, failed
+    selection = Column(JSONB, nullable=False, default=dict)  # claim_ids count or filter used
+    concurrency = Column(Integer, nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    items = relationship("BatchItem", back_populates="batch", cascade="all, delete-orphan")
+
+
+class BatchItem(Base):
+    """Per-claim outcome within a batch run."""
+    __tablename__ = "batch_items"
+    __table_args__ = (UniqueConstraint("batch_id", "claim_id", name="uq_batch_items_batch_claim"),)
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("batch_runs.id", ondelete="CASCADE"), nullable=False)
+    claim_id = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, succeeded, failed
+    appeal_id = Column(UUID(as_uuid=True), nullable=True)
+    category = Column(String(50), nullable=True)
+    error = Column(Text, nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    batch = relationship("BatchRun", back_populates="items")
+
+
+class EmbeddingRun(Base):
+    """Policy embedding (re)generation run (executed as an embed_policies job)."""
+    __tablename__ = "embedding_runs"
+    __mapper_args__ = {"eager_defaults": True}
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="SET NULL"), nullable=True)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, completed, failed
+    payer_name = Column(String(200), nullable=True)  # None = all payers
+    reembed = Column(Boolean, nullable=False, default=False)  # False = only policies without an embedding
+    model = Column(String(200), nullable=False)
+    batch_size = Column(Integer, nullable=False)
+    concurrency = Column(Integer, nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    embedded = Column(Integer, nullable=False, default=0)
+    resume_after = Column(UUID(as_uuid=True), nullable=True)  # Every policy id <= resume_after is done
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -3,7 +3,7 @@ Pydantic Schemas for API Request/Response Validation
 """
 
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
 
@@ -95,6 +95,91 @@ class WorkflowResponse(BaseModel):
     message: str
 
 
+class JobAccepted(BaseModel):
+    """Schema for a workflow request accepted for background processing."""
+    job_id: UUID
+    status: str
+    status_url: str
+
+
+class BatchProcessRequest(BaseModel):
+    """Schema for processing many claims in one batch (claim ids and/or a filter)."""
+    claim_ids: Optional[List[str]] = Field(None, description="Explicit claim IDs to process")
+    payer_name: Optional[str] = Field(None, description="Only claims for this payer")
+    category: Optional[str] = Field(None, description="Only claims already classified in this category")
+    created_after: Optional[datetime] = Field(None, description="Only claims created at or after this time")
+    created_before: Optional[datetime] = Field(None, description="Only claims created before this time")
+    concurrency: Optional[int] = Field(None, ge=1, description="Claims processed at once (default BATCH_DEFAULT_CONCURRENCY)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "payer_name": "Blue Cross Blue Shield",
+                "created_after": "2024-06-01T00:00:00",
+                "concurrency": 16
+            }
+        }
+
+
+class BatchAccepted(BaseModel):
+    """Schema for a batch accepted for background processing."""
+    batch_id: UUID
+    job_id: UUID
+    total: int
+    status_url: str
+
+
+class BatchResponse(BaseModel):
+    """Schema for batch progress."""
+    id: UUID
+    job_id: Optional[UUID]
+    status: str
+    selection: Dict[str, Any]
+    concurrency: int
+    total: int
+    succeeded: int
+    failed: int
+    pending: int
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+class BatchItemResponse(BaseModel):
+    """Schema for a single claim outcome within a batch."""
+    claim_id: str
+    status: str
+    appeal_id: Optional[UUID]
+    category: Optional[str]
+    error: Optional[str]
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
+# =====================================================
+# Job Schemas
+# =====================================================
+
+class JobResponse(BaseModel):
+    """Schema for background job status."""
+    id: UUID
+    job_type: str
+    status: str
+    attempts: int
+    max_attempts: int
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
 # =====================================================
 # Policy Schemas
 # =====================================================
@@ -108,6 +193,63 @@ class PolicyExcerpt(BaseModel):
     payer_name: str
 
 
+class VectorIndexBuildRequest(BaseModel):
+    """Schema for building a pgvector index on policies.embedding."""
+    kind: str = Field("hnsw", description="Index type: hnsw or ivfflat")
+    payer_name: Optional[str] = Field(None, description="Build a partial index for this payer only")
+    m: Optional[int] = Field(None, ge=2, le=100, description="HNSW links per node (default sized from row count)")
+    ef_construction: Optional[int] = Field(None, ge=4, le=1000, description="HNSW build candidate list (default sized from row count)")
+    lists: Optional[int] = Field(None, ge=1, le=32768, description="IVFFlat list count (default sized from row count)")
+    precision: str = Field("full", description="Indexed column: full, halfvec or binary")
+
+
+class VectorRecallRequest(BaseModel):
+    """Schema for measuring ANN recall against exact search."""
+    payer_name: Optional[str] = Field(None, description="Sample queries from this payer only")
+    sample_size: int = Field(50, ge=1, le=1000)
+    top_k: Optional[int] = Field(None, ge=1, le=100, description="Default RAG_TOP_K")
+    ef_search: Optional[List[int]] = Field(None, description="hnsw.ef_search values to evaluate")
+    probes: Optional[List[int]] = Field(None, description="ivfflat.probes values to evaluate")
+    precision: str = Field("full", description="ANN first pass: full, halfvec or binary")
+    rerank_multiplier: Optional[int] = Field(None, ge=1, le=100, description="Default VECTOR_RERANK_MULTIPLIER")
+
+
+class EmbeddingRunRequest(BaseModel):
+    """Schema for starting a policy embedding run."""
+    payer_name: Optional[str] = Field(None, description="Only policies for this payer")
+    reembed: bool = Field(False, description="Re-embed policies that already have an embedding")
+    batch_size: Optional[int] = Field(None, ge=1, le=2048, description="Policies per provider call (default EMBEDDING_JOB_BATCH_SIZE)")
+    concurrency: Optional[int] = Field(None, ge=1, le=32, description="Batches embedded at once (default EMBEDDING_JOB_CONCURRENCY)")
+
+
+class EmbeddingRunAccepted(BaseModel):
+    """Schema for an embedding run accepted for background processing."""
+    run_id: UUID
+    job_id: UUID
+    total: int
+    status_url: str
+
+
+class EmbeddingRunResponse(BaseModel):
+    """Schema for embedding run progress."""
+    id: UUID
+    job_id: Optional[UUID]
+    status: str
+    payer_name: Optional[str]
+    reembed: bool
+    model: str
+    batch_size: int
+    concurrency: int
+    total: int
+    embedded: int
+    remaining: int
+    resume_after: Optional[UUID]
+    error: Optional[str]
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
 # =====================================================
 # Audit Log Schemas
 # =====================================================
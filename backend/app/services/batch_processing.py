@@ -0,0 +1,277 @@
+"""
+Batch Processing Service
+
+Processes many claims in one run (e.g. a nightly denial file).
+
+A batch is created with one batch_items row per claim and executed as a
+single `process_batch` job. Inside the job a fixed number of consumer
+coroutines pull claim ids from a shared iterator, so at most
+`concurrency` workflows are in flight regardless of batch size. Each
+claim's appeal and outcome are committed as soon as it finishes; if the
+job is retried or requeued, only items still `pending` are processed.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+import asyncio
+import structlog
+
+from sqlalchemy import String, any_, bindparam, func, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.db.session import AsyncSessionLocal
+from app.models.models import BatchItem, BatchRun, Claim
+from app.services.claim_processing import process_claim
+from app.services.job_queue import NonRetryableJobError, register_job_handler
+
+logger = structlog.get_logger()
+
+PROCESS_BATCH_JOB = "process_batch"
+
+
+class BatchNotFoundError(NonRetryableJobError):
+    """Raised when a process_batch job references a missing batch."""
+
+
+async def select_claim_ids(
+    claim_ids: Optional[List[str]] = None,
+    payer_name: Optional[str] = None,
+    category: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: Optional[int] = None
+) -> List[str]:
+    """
+    Resolve a batch selection to existing claim ids.
+
+    Explicit claim_ids are intersected with the filters (if any) and
+    keep their given order; otherwise claims are taken oldest first.
+    Callers should bound len(claim_ids) first (BATCH_MAX_CLAIMS); the ids
+    are sent as one array parameter, so any count fits in the statement.
+    """
+    query = select(Claim.claim_id)
+
+    if claim_ids is not None:
+        # = ANY(array) rather than IN (...): one bind parameter instead of
+        # one per id (asyncpg allows at most 32767)
+        query = query.where(Claim.claim_id == any_(bindparam("claim_ids", claim_ids, type_=ARRAY(String))))
+    if payer_name:
+        query = query.where(Claim.payer_name == payer_name)
+    if category:
+        query = query.where(Claim.category == category)
+    if created_after:
+        query = query.where(Claim.created_at >= created_after)
+    if created_before:
+        query = query.where(Claim.created_at < created_before)
+
+    if claim_ids is None:
+        query = query.order_by(Claim.created_at, Claim.claim_id)
+        if limit:
+            query = query.limit(limit)
+
+    async with AsyncSessionLocal() as db:
+        found = (await db.scalars(query)).all()
+
+    if claim_ids is not None:
+        found_set = set(found)
+        # dict.fromkeys drops duplicates while keeping order
+        selected = [claim_id for claim_id in dict.fromkeys(claim_ids) if claim_id in found_set]
+    else:
+        selected = list(found)
+
+    return selected[:limit] if limit else selected
+
+
+async def create_batch(
+    claim_ids: List[str],
+    concurrency: int,
+    selection: Dict[str, Any]
+) -> BatchRun:
+    """Insert a batch run and its pending items."""
+    async with AsyncSessionLocal() as db:
+        batch = BatchRun(
+            status="queued",
+            selection=selection,
+            concurrency=concurrency,
+            total=len(claim_ids)
+        )
+        db.add(batch)
+        await db.flush()
+
+        if claim_ids:
+            await db.execute(
+                insert(BatchItem),
+                [{"batch_id": batch.id, "claim_id": claim_id, "status": "pending"} for claim_id in claim_ids]
+            )
+
+        await db.commit()
+        return batch
+
+
+async def attach_job(batch_id: UUID, job_id: UUID) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(BatchRun).where(BatchRun.id == batch_id).values(job_id=job_id)
+        )
+        await db.commit()
+
+
+async def get_batch(batch_id: UUID) -> Optional[BatchRun]:
+    """Fetch a batch run by id, or None."""
+    async with AsyncSessionLocal() as db:
+        return await db.get(BatchRun, batch_id)
+
+
+async def list_batch_items(
+    batch_id: UUID,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[BatchItem]:
+    """Page through a batch's per-claim outcomes."""
+    query = select(BatchItem).where(BatchItem.batch_id == batch_id)
+    if status:
+        query = query.where(BatchItem.status == status)
+    query = query.order_by(BatchItem.claim_id).offset(skip).limit(limit)
+
+    async with AsyncSessionLocal() as db:
+        return list((await db.scalars(query)).all())
+
+
+async def _start_batch(batch_id: UUID) -> Optional[Dict[str, Any]]:
+    """Mark the batch running; return its settings and pending claim ids."""
+    async with AsyncSessionLocal() as db:
+        batch = await db.get(BatchRun, batch_id)
+        if batch is None:
+            return None
+
+        batch.status = "running"
+        batch.finished_at = None
+        if batch.started_at is None:
+            batch.started_at = func.now()
+
+        pending = (await db.scalars(
+            select(BatchItem.claim_id).where(
+                BatchItem.batch_id == batch_id,
+                BatchItem.status == "pending"
+            ).order_by(BatchItem.claim_id)
+        )).all()
+        concurrency = batch.concurrency
+        await db.commit()
+
+        return {"concurrency": concurrency, "pending": list(pending)}
+
+
+async def _record_item(
+    batch_id: UUID,
+    claim_id: str,
+    succeeded: bool,
+    appeal_id: Optional[str] = None,
+    category: Optional[str] = None,
+    error: Optional[str] = None
+) -> None:
+    """Commit one claim's outcome and bump the batch counters."""
+    counter = BatchRun.succeeded if succeeded else BatchRun.failed
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(BatchItem).where(
+                BatchItem.batch_id == batch_id,
+                BatchItem.claim_id == claim_id
+            ).values(
+                status="succeeded" if succeeded else "failed",
+                appeal_id=appeal_id,
+                category=category,
+                error=error,
+                finished_at=func.now()
+            )
+        )
+        await db.execute(
+            update(BatchRun).where(BatchRun.id == batch_id).values({counter: counter + 1})
+        )
+        await db.commit()
+
+
+async def _finish_batch(batch_id: UUID, status: str = "completed") -> Dict[str, Any]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(BatchRun).where(BatchRun.id == batch_id).values(
+                status=status,
+                finished_at=func.now()
+            ).returning(BatchRun.total, BatchRun.succeeded, BatchRun.failed)
+        )
+        row = result.one()
+        await db.commit()
+
+    return {
+        "batch_id": str(batch_id),
+        "total": row.total,
+        "succeeded": row.succeeded,
+        "failed": row.failed
+    }
+
+
+async def _process_item(batch_id: UUID, claim_id: str) -> None:
+    try:
+        result = await process_claim(claim_id)
+    except Exception as e:
+        logger.error("batch_item_failed", batch_id=str(batch_id), claim_id=claim_id, error=str(e))
+        await _record_item(batch_id, claim_id, False, error=str(e))
+        return
+
+    await _record_item(
+        batch_id,
+        claim_id,
+        result["success"],
+        appeal_id=result["appeal_id"],
+        category=result["category"],
+        error=None if result["success"] else result["message"]
+    )
+
+
+async def run_batch(batch_id: UUID) -> Dict[str, Any]:
+    """
+    Process every pending claim in a batch with bounded concurrency.
+
+    Returns:
+        Final counters for the batch
+    """
+    state = await _start_batch(batch_id)
+    if state is None:
+        raise BatchNotFoundError(f"Batch {batch_id} not found")
+
+    pending = state["pending"]
+    concurrency = max(1, min(state["concurrency"], len(pending) or 1))
+    log = logger.bind(batch_id=str(batch_id))
+    log.info("batch_started", pending=len(pending), concurrency=concurrency)
+
+    claim_iter: Iterator[str] = iter(pending)
+
+    async def consume() -> None:
+        # Iterators are safe to share between coroutines on one loop
+        for claim_id in claim_iter:
+            await _process_item(batch_id, claim_id)
+
+    consumers = [asyncio.create_task(consume()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*consumers)
+    except Exception as e:
+        # An outcome could not be recorded (e.g. the database is down):
+        # stop the other consumers and mark the run failed. A retried job
+        # sets it running again and resumes from the pending items.
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        summary = await _finish_batch(batch_id, "failed")
+        log.error("batch_failed", error=str(e), **summary)
+        raise
+
+    summary = await _finish_batch(batch_id)
+    log.info("batch_completed", **summary)
+    return summary
+
+
+@register_job_handler(PROCESS_BATCH_JOB)
+async def handle_process_batch(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler for `process_batch` jobs ({"batch_id": ...})."""
+    return await run_batch(UUID(payload["batch_id"]))
@@ -0,0 +1,118 @@
+"""
+Claim Processing Service
+
+Runs the appeal workflow for a stored claim and persists the results.
+Used by the `process_claim` background job; the HTTP layer only
+enqueues work and reports job status.
+"""
+
+from typing import Any, Dict, Optional
+import structlog
+
+from sqlalchemy import select
+
+from app.db.session import AsyncSessionLocal
+from app.models.models import Claim, Appeal
+from app.services.job_queue import NonRetryableJobError, register_job_handler
+from app.services.workflow_service import execute_workflow
+
+logger = structlog.get_logger()
+
+PROCESS_CLAIM_JOB = "process_claim"
+
+
+class ClaimNotFoundError(NonRetryableJobError):
+    """Raised when the claim to process does not exist."""
+
+
+def claim_to_workflow_input(claim: Claim) -> Dict[str, Any]:
+    """Build the workflow's claim_data from a Claim row."""
+    return {
+        "claim_id": claim.claim_id,
+        "denial_code": claim.denial_code,
+        "denial_description": claim.denial_description,
+        "payer_name": claim.payer_name,
+        "policy_text": claim.policy_text
+    }
+
+
+async def _load_claim_data(claim_id: str) -> Dict[str, Any]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Claim).where(Claim.claim_id == claim_id))
+        claim = result.scalar_one_or_none()
+        if not claim:
+            raise ClaimNotFoundError(f"Claim {claim_id} not found")
+        return claim_to_workflow_input(claim)
+
+
+async def _persist_results(claim_id: str, final_state: Dict[str, Any]) -> Optional[str]:
+    """Store the category and draft appeal; returns the appeal id."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Claim).where(Claim.claim_id == claim_id))
+        claim = result.scalar_one()
+
+        # Update claim with category
+        if final_state.get("category"):
+            claim.category = final_state["category"]
+
+        # Create appeal record if draft was generated
+        appeal = None
+        if final_state.get("draft_text"):
+            appeal = Appeal(
+                claim_id=claim.id,
+                draft_text=final_state["draft_text"],
+                policy_citations=final_state.get("policy_citations", []),
+                status="draft",
+                compliance_issues=final_state.get("compliance_issues", []),
+                retry_count=final_state.get("retry_count", 0)
+            )
+            db.add(appeal)
+
+        await db.commit()
+
+    if appeal is None:
+        return None
+
+    logger.info("appeal_draft_created", claim_id=claim_id, appeal_id=str(appeal.id))
+    return str(appeal.id)
+
+
+async def process_claim(claim_id: str) -> Dict[str, Any]:
+    """
+    Run the full agent workflow for a claim and persist its results.
+
+    Args:
+        claim_id: Business claim identifier
+
+    Returns:
+        WorkflowResponse-shaped dict (JSON-serializable)
+
+    Raises:
+        ClaimNotFoundError: If the claim does not exist
+    """
+    claim_data = await _load_claim_data(claim_id)
+
+    logger.info("workflow_triggered", claim_id=claim_id)
+    final_state = await execute_workflow(claim_data)
+
+    appeal_id = await _persist_results(claim_id, final_state)
+
+    # Determine success
+    success = final_state.get("routing_decision") == "proceed" and final_state.get("draft_text") is not None
+
+    return {
+        "success": success,
+        "claim_id": claim_id,
+        "appeal_id": appeal_id,
+        "category": final_state.get("category"),
+        "draft_text": final_state.get("draft_text"),
+        "policy_citations": final_state.get("policy_citations"),
+        "compliance_issues": final_state.get("compliance_issues"),
+        "message": "Appeal draft generated successfully" if success else final_state.get("validation_message", "Workflow failed")
+    }
+
+
+@register_job_handler(PROCESS_CLAIM_JOB)
+async def handle_process_claim(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler for `process_claim` jobs ({"claim_id": ...})."""
+    return await process_claim(payload["claim_id"])
@@ -0,0 +1,331 @@
+"""
+Policy Embedding Jobs
+
+(Re)generates policy embeddings as a resumable `embed_policies` job.
+Each section is also split into overlapping, token-bounded chunks
+(POLICY_CHUNK_TOKENS / POLICY_CHUNK_OVERLAP) whose embeddings replace
+the section's previous policy_chunks rows in the same transaction; a
+section that fits in one chunk reuses the section embedding.
+
+A run walks the matching policies in id order with keyset pagination,
+so no transaction stays open for the whole corpus and resuming is just
+`id > resume_after`. Pages are handed to `concurrency` consumers that
+embed a page with one provider call and commit it with a single bulk
+UPDATE. Pages can finish out of order, so `resume_after` only advances
+past pages whose predecessors have all committed; after a crash or a
+failed attempt, the retried job redoes at most the pages that were in
+flight. Progress is recounted from the rows the run has embedded
+since it started, so redone pages are not counted twice.
+"""
+
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import asyncio
+import structlog
+
+from sqlalchemy import func, or_, select, text, update
+
+from app.core.chunking import chunk_text
+from app.core.config import settings
+from app.core.embedding_factory import get_embedding_provider
+from app.db.retrieval_cache import PREWARM_RETRIEVAL_CACHE_JOB
+from app.db.session import AsyncSessionLocal
+from app.models.models import EmbeddingRun, Policy, PolicyChunk
+from app.services.job_queue import NonRetryableJobError, enqueue_job, register_job_handler
+
+logger = structlog.get_logger()
+
+EMBED_POLICIES_JOB = "embed_policies"
+
+# One round trip per page; unnest keeps the statement text (and its
+# prepared plan) identical for every page size. Matching on the full
+# (id, payer_name) key lets each row be routed to its payer's partition.
+_UPDATE_EMBEDDINGS_SQL = text("""
+    UPDATE policies AS p
+    SET embedding = CAST(v.embedding AS vector), indexed_at = now()
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:payer_names AS text[]), CAST(:embeddings AS text[]))
+        AS v(id, payer_name, embedding)
+    WHERE p.id = v.id AND p.payer_name = v.payer_name
+""")
+
+_DELETE_CHUNKS_SQL = text("""
+    DELETE FROM policy_chunks AS c
+    USING unnest(CAST(:ids AS uuid[]), CAST(:payer_names AS text[])) AS v(id, payer_name)
+    WHERE c.policy_id = v.id AND c.payer_name = v.payer_name
+""")
+
+_INSERT_CHUNKS_SQL = text("""
+    INSERT INTO policy_chunks (policy_id, payer_name, chunk_index, section_title, chunk_text, token_count, embedding)
+    SELECT policy_id, payer_name, chunk_index, section_title, chunk_text, token_count, CAST(embedding AS vector)
+    FROM unnest(
+        CAST(:policy_ids AS uuid[]), CAST(:payer_names AS text[]), CAST(:chunk_indexes AS integer[]),
+        CAST(:section_titles AS text[]), CAST(:chunk_texts AS text[]), CAST(:token_counts AS integer[]),
+        CAST(:embeddings AS text[])
+    ) AS c(policy_id, payer_name, chunk_index, section_title, chunk_text, token_count, embedding)
+""")
+
+
+class EmbeddingRunNotFoundError(NonRetryableJobError):
+    """Raised when an embed_policies job references a missing run."""
+
+
+def _policy_filter(payer_name: Optional[str], reembed: bool) -> List[Any]:
+    conditions = []
+    if payer_name:
+        conditions.append(Policy.payer_name == payer_name)
+    if not reembed:
+        # Also picks up sections embedded before chunking existed
+        has_chunks = select(PolicyChunk.id).where(
+            PolicyChunk.policy_id == Policy.id,
+            PolicyChunk.payer_name == Policy.payer_name
+        ).exists()
+        conditions.append(or_(Policy.embedding.is_(None), ~has_chunks))
+    return conditions
+
+
+def _embedded_count(payer_name: Optional[str]):
+    """Policies embedded since the run started (correlated to EmbeddingRun)."""
+    query = select(func.count()).select_from(Policy).where(
+        Policy.embedding.isnot(None),
+        Policy.indexed_at >= EmbeddingRun.started_at
+    )
+    if payer_name:
+        query = query.where(Policy.payer_name == payer_name)
+    return query.correlate(EmbeddingRun).scalar_subquery()
+
+
+def _vector_literal(vector: List[float]) -> str:
+    return "[" + ",".join(str(float(value)) for value in vector) + "]"
+
+
+async def create_embedding_run(
+    payer_name: Optional[str],
+    reembed: bool,
+    batch_size: int,
+    concurrency: int
+) -> EmbeddingRun:
+    """Insert a run sized to the policies it will embed."""
+    async with AsyncSessionLocal() as db:
+        total = await db.scalar(
+            select(func.count()).select_from(Policy).where(*_policy_filter(payer_name, reembed))
+        )
+        run = EmbeddingRun(
+            status="queued",
+            payer_name=payer_name,
+            reembed=reembed,
+            model=get_embedding_provider().model,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            total=total
+        )
+        db.add(run)
+        await db.commit()
+        return run
+
+
+async def attach_job(run_id: UUID, job_id: UUID) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(EmbeddingRun).where(EmbeddingRun.id == run_id).values(job_id=job_id, status="queued")
+        )
+        await db.commit()
+
+
+async def get_embedding_run(run_id: UUID) -> Optional[EmbeddingRun]:
+    """Fetch an embedding run by id, or None."""
+    async with AsyncSessionLocal() as db:
+        return await db.get(EmbeddingRun, run_id)
+
+
+async def _start_run(run_id: UUID) -> Optional[EmbeddingRun]:
+    async with AsyncSessionLocal() as db:
+        run = await db.get(EmbeddingRun, run_id)
+        if run is None:
+            return None
+
+        run.status = "running"
+        run.error = None
+        if run.started_at is None:
+            run.started_at = func.now()
+
+        await db.commit()
+        return run
+
+
+async def _end_run(run: EmbeddingRun, status: str, error: Optional[str] = None) -> Dict[str, Any]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(EmbeddingRun).where(EmbeddingRun.id == run.id).values(
+                status=status,
+                error=error,
+                embedded=_embedded_count(run.payer_name),
+                finished_at=func.now()
+            ).returning(EmbeddingRun.total, EmbeddingRun.embedded)
+        )
+        row = result.one()
+        await db.commit()
+
+    return {"run_id": str(run.id), "total": row.total, "embedded": row.embedded}
+
+
+async def _fetch_page(run: EmbeddingRun, after: Optional[UUID]) -> List[Any]:
+    query = select(Policy.id, Policy.payer_name, Policy.section_title, Policy.section_text).where(*_policy_filter(run.payer_name, run.reembed))
+    if after is not None:
+        query = query.where(Policy.id > after)
+    query = query.order_by(Policy.id).limit(run.batch_size)
+
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(query)).all()
+
+
+async def _embed_page(provider, page: List[Any]) -> Dict[str, List[Any]]:
+    """Embed a page's sections and their chunks with one provider call."""
+    chunked = [chunk_text(row.section_text, settings.POLICY_CHUNK_TOKENS, settings.POLICY_CHUNK_OVERLAP) for row in page]
+    extra_texts = [chunk.text for chunks in chunked if len(chunks) > 1 for chunk in chunks]
+
+    vectors = await provider.aembed([row.section_text for row in page] + extra_texts)
+    section_vectors, chunk_vectors = vectors[:len(page)], iter(vectors[len(page):])
+
+    chunk_rows: Dict[str, List[Any]] = {
+        key: [] for key in
+        ("policy_ids", "payer_names", "chunk_indexes", "section_titles", "chunk_texts", "token_counts", "embeddings")
+    }
+    for row, chunks, section_vector in zip(page, chunked, section_vectors):
+        for chunk in chunks:
+            vector = section_vector if len(chunks) == 1 else next(chunk_vectors)
+            chunk_rows["policy_ids"].append(row.id)
+            chunk_rows["payer_names"].append(row.payer_name)
+            chunk_rows["chunk_indexes"].append(chunk.index)
+            chunk_rows["section_titles"].append(row.section_title)
+            chunk_rows["chunk_texts"].append(chunk.text)
+            chunk_rows["token_counts"].append(chunk.token_count)
+            chunk_rows["embeddings"].append(_vector_literal(vector))
+
+    return {
+        "sections": {
+            "ids": [row.id for row in page],
+            "payer_names": [row.payer_name for row in page],
+            "embeddings": [_vector_literal(vector) for vector in section_vectors]
+        },
+        "chunks": chunk_rows
+    }
+
+
+async def _write_page(run: EmbeddingRun, embedded: Dict[str, Any]) -> None:
+    sections = embedded["sections"]
+    async with AsyncSessionLocal() as db:
+        await db.execute(_UPDATE_EMBEDDINGS_SQL, sections)
+        await db.execute(_DELETE_CHUNKS_SQL, {"ids": sections["ids"], "payer_names": sections["payer_names"]})
+        if embedded["chunks"]["policy_ids"]:
+            await db.execute(_INSERT_CHUNKS_SQL, embedded["chunks"])
+        await db.execute(
+            update(EmbeddingRun).where(EmbeddingRun.id == run.id).values(
+                embedded=_embedded_count(run.payer_name)
+            )
+        )
+        await db.commit()
+
+
+async def _advance_resume_point(run_id: UUID, resume_after: UUID) -> None:
+    # Pages commit out of order; never move the resume point backwards
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(EmbeddingRun).where(
+                EmbeddingRun.id == run_id,
+                or_(EmbeddingRun.resume_after.is_(None), EmbeddingRun.resume_after < resume_after)
+            ).values(resume_after=resume_after)
+        )
+        await db.commit()
+
+
+async def run_embedding(run_id: UUID) -> Dict[str, Any]:
+    """
+    Embed every policy selected by a run, resuming where it left off.
+
+    Returns:
+        Final counters for the run
+
+    Raises:
+        EmbeddingRunNotFoundError: If the run does not exist
+        Exception: The first page failure, after recording it on the run
+            (the job is retried and resumes from `resume_after`)
+    """
+    run = await _start_run(run_id)
+    if run is None:
+        raise EmbeddingRunNotFoundError(f"Embedding run {run_id} not found")
+
+    provider = get_embedding_provider()
+    log = logger.bind(embedding_run_id=str(run_id))
+    log.info(
+        "embedding_run_started",
+        resume_after=str(run.resume_after) if run.resume_after else None,
+        batch_size=run.batch_size,
+        concurrency=run.concurrency,
+        **provider.get_model_info()
+    )
+
+    pages: asyncio.Queue = asyncio.Queue(maxsize=run.concurrency)
+    finished: Dict[int, UUID] = {}
+    next_to_checkpoint = 0
+    errors: List[Exception] = []
+
+    async def produce() -> None:
+        after = run.resume_after
+        sequence = 0
+        try:
+            while not errors:
+                page = await _fetch_page(run, after)
+                if not page:
+                    break
+                await pages.put((sequence, page))
+                after = page[-1].id
+                sequence += 1
+        except Exception as e:
+            log.error("embedding_page_fetch_failed", after=str(after) if after else None, error=str(e))
+            errors.append(e)
+        finally:
+            for _ in range(run.concurrency):
+                await pages.put(None)
+
+    async def consume() -> None:
+        nonlocal next_to_checkpoint
+        while (item := await pages.get()) is not None:
+            # Keep draining after a failure so the producer never blocks
+            if errors:
+                continue
+
+            sequence, page = item
+            try:
+                await _write_page(run, await _embed_page(provider, page))
+            except Exception as e:
+                log.error("embedding_page_failed", first_policy_id=str(page[0].id), size=len(page), error=str(e))
+                errors.append(e)
+                continue
+
+            finished[sequence] = page[-1].id
+            resume_after = None
+            while next_to_checkpoint in finished:
+                resume_after = finished.pop(next_to_checkpoint)
+                next_to_checkpoint += 1
+            if resume_after is not None:
+                await _advance_resume_point(run_id, resume_after)
+
+    await asyncio.gather(produce(), *(consume() for _ in range(run.concurrency)))
+
+    if errors:
+        await _end_run(run, "failed", error=str(errors[0]))
+        raise errors[0]
+
+    summary = await _end_run(run, "completed")
+    log.info("embedding_run_completed", **summary)
+
+    # The new embeddings invalidated the payers' cached retrieval results
+    if settings.RETRIEVAL_CACHE_ENABLED and summary["embedded"]:
+        await enqueue_job(PREWARM_RETRIEVAL_CACHE_JOB, {"payer_name": run.payer_name} if run.payer_name else {})
+    return summary
+
+
+@register_job_handler(EMBED_POLICIES_JOB)
+async def handle_embed_policies(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler for `embed_policies` jobs ({"run_id": ...})."""
+    return await run_embedding(UUID(payload["run_id"]))
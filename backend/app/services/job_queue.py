@@ -0,0 +1,394 @@
+"""
+Background Job Queue
+
+Durable Postgres-backed queue for long-running work (claim processing).
+
+Jobs are rows in the `jobs` table. Workers claim the oldest runnable job
+with a single UPDATE over a `SELECT ... FOR UPDATE SKIP LOCKED` subquery,
+so any number of worker tasks and processes can poll the same table
+without blocking each other or claiming the same row twice.
+
+Lifecycle:
+    queued -> running -> succeeded
+                      -> queued (retry with backoff, until max_attempts)
+                      -> failed
+
+Workers refresh `locked_at` while a job runs; a job whose lock is older
+than JOB_LOCK_TIMEOUT (its worker crashed) is requeued by the reaper in
+JobWorkerPool.
+
+Workers run inside the API process (JOB_WORKERS tasks, started by the
+FastAPI lifespan) and/or as standalone processes (`python -m app.worker`),
+so processing capacity scales independently of API replicas.
+"""
+
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+import asyncio
+import os
+import socket
+import structlog
+
+from sqlalchemy import func, select, text, update
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.models import Job
+
+logger = structlog.get_logger()
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+# job_type -> coroutine taking the payload and returning a JSON result
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+class NonRetryableJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed."""
+
+
+def register_job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register a coroutine as the handler for a job type.
+
+    Usage:
+        @register_job_handler("process_claim")
+        async def handle_process_claim(payload):
+            ...
+    """
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = handler
+        return handler
+    return decorator
+
+
+# =====================================================
+# Queue operations
+# =====================================================
+
+_CLAIM_SQL = text("""
+    UPDATE jobs
+    SET status = 'running',
+        attempts = attempts + 1,
+        locked_by = :worker_id,
+        locked_at = now(),
+        started_at = COALESCE(started_at, now())
+    WHERE id = (
+        SELECT id FROM jobs
+        WHERE status = 'queued'
+          AND run_after <= now()
+          AND (CAST(:job_types AS text[]) IS NULL OR job_type = ANY(CAST(:job_types AS text[])))
+        ORDER BY run_after, created_at
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+    )
+    RETURNING id, job_type, payload, attempts, max_attempts
+""")
+
+_REQUEUE_STALE_SQL = text("""
+    UPDATE jobs
+    SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+        finished_at = CASE WHEN attempts >= max_attempts THEN now() ELSE NULL END,
+        error = 'Worker lock expired',
+        locked_by = NULL,
+        locked_at = NULL,
+        run_after = now()
+    WHERE status = 'running'
+      AND locked_at < now() - make_interval(secs => :lock_timeout)
+""")
+
+
+async def enqueue_job(
+    job_type: str,
+    payload: Dict[str, Any],
+    max_attempts: Optional[int] = None
+) -> Job:
+    """
+    Insert a queued job.
+
+    Args:
+        job_type: Registered handler name
+        payload: JSON-serializable handler input
+        max_attempts: Override JOB_MAX_ATTEMPTS
+
+    Returns:
+        The persisted Job row
+    """
+    async with AsyncSessionLocal() as db:
+        job = Job(
+            job_type=job_type,
+            payload=payload,
+            status="queued",
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS
+        )
+        db.add(job)
+        await db.commit()
+
+    logger.info("job_enqueued", job_id=str(job.id), job_type=job_type)
+    return job
+
+
+async def get_job(job_id: UUID) -> Optional[Job]:
+    """Fetch a job by id, or None."""
+    async with AsyncSessionLocal() as db:
+        return await db.get(Job, job_id)
+
+
+async def claim_next_job(worker_id: str, job_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Atomically claim the oldest runnable job.
+
+    Returns:
+        Dict with id, job_type, payload, attempts and max_attempts,
+        or None if the queue is empty
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            _CLAIM_SQL,
+            {"worker_id": worker_id, "job_types": job_types}
+        )
+        row = result.mappings().first()
+        await db.commit()
+        return dict(row) if row else None
+
+
+async def complete_job(job_id: UUID, result: Optional[Dict[str, Any]]) -> None:
+    """Mark a running job as succeeded."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Job).where(Job.id == job_id).values(
+                status="succeeded",
+                result=result,
+                error=None,
+                locked_by=None,
+                locked_at=None,
+                finished_at=func.now()
+            )
+        )
+        await db.commit()
+
+
+async def fail_job(
+    job_id: UUID,
+    error: str,
+    attempts: int,
+    max_attempts: int,
+    retryable: bool = True
+) -> bool:
+    """
+    Record a failed attempt, requeueing with exponential backoff if allowed.
+
+    Returns:
+        True if the job was requeued, False if it is now permanently failed
+    """
+    requeue = retryable and attempts < max_attempts
+    values: Dict[str, Any] = {
+        "error": error,
+        "locked_by": None,
+        "locked_at": None
+    }
+
+    if requeue:
+        delay = settings.JOB_RETRY_BACKOFF * (2 ** (attempts - 1))
+        values["status"] = "queued"
+        values["run_after"] = func.now() + timedelta(seconds=delay)
+    else:
+        values["status"] = "failed"
+        values["finished_at"] = func.now()
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Job).where(Job.id == job_id).values(**values))
+        await db.commit()
+
+    return requeue
+
+
+async def touch_job(job_id: UUID, worker_id: str) -> None:
+    """Refresh a running job's lock so long jobs are not reaped."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Job).where(
+                Job.id == job_id,
+                Job.status == "running",
+                Job.locked_by == worker_id
+            ).values(locked_at=func.now())
+        )
+        await db.commit()
+
+
+async def requeue_stale_jobs(lock_timeout: float) -> int:
+    """Requeue (or fail) running jobs whose lock expired; returns the row count."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(_REQUEUE_STALE_SQL, {"lock_timeout": float(lock_timeout)})
+        await db.commit()
+        return result.rowcount
+
+
+async def queue_depth() -> Dict[str, int]:
+    """Count jobs per status."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Job.status, func.count(Job.id)).group_by(Job.status)
+        )
+        return {job_status: count for job_status, count in result.all()}
+
+
+# =====================================================
+# Worker pool
+# =====================================================
+
+class JobWorkerPool:
+    """
+    Pool of asyncio tasks that claim and execute queued jobs.
+
+    Queue operations use the async engine, so polling never blocks the
+    event loop. Handlers are awaited directly and share the process-wide
+    LLM provider pools.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        poll_interval: float = 1.0,
+        lock_timeout: float = 900.0,
+        job_types: Optional[List[str]] = None
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lock_timeout = lock_timeout
+        self.job_types = job_types
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._stopping: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._counters = {"succeeded": 0, "retried": 0, "failed": 0}
+        self.logger = logger.bind(component="job_worker_pool", worker_id=self.worker_id)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Spawn the worker tasks and the stale-lock reaper."""
+        if self._tasks:
+            return
+
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(slot), name=f"job-worker-{slot}")
+            for slot in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._reap(), name="job-reaper"))
+        self.logger.info("job_workers_started", concurrency=self.concurrency)
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop polling and wait for in-flight jobs, cancelling after timeout."""
+        if not self._tasks:
+            return
+
+        self._stopping.set()
+        self._wakeup.set()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        self._tasks = []
+        self.logger.info("job_workers_stopped", cancelled=len(pending))
+
+    def notify(self) -> None:
+        """Wake idle workers in this process (e.g. right after enqueueing)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _idle(self) -> None:
+        """Sleep until notified, stopping, or the poll interval elapses."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        if not self._stopping.is_set():
+            self._wakeup.clear()
+
+    async def _run(self, slot: int) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await claim_next_job(self.worker_id, self.job_types)
+            except Exception as e:
+                self.logger.error("job_claim_failed", slot=slot, error=str(e))
+                await self._idle()
+                continue
+
+            if job is None:
+                await self._idle()
+                continue
+
+            await self.execute(job)
+
+    async def execute(self, job: Dict[str, Any]) -> None:
+        """Run a claimed job's handler and record the outcome."""
+        job_id = job["id"]
+        log = self.logger.bind(job_id=str(job_id), job_type=job["job_type"], attempt=job["attempts"])
+        handler = JOB_HANDLERS.get(job["job_type"])
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            if handler is None:
+                raise NonRetryableJobError(f"No handler registered for job type '{job['job_type']}'")
+            result = await handler(job["payload"])
+        except Exception as e:
+            retryable = not isinstance(e, NonRetryableJobError)
+            requeued = await fail_job(
+                job_id, str(e), job["attempts"], job["max_attempts"], retryable
+            )
+            self._counters["retried" if requeued else "failed"] += 1
+            log.error("job_failed", requeued=requeued, error=str(e))
+            return
+        finally:
+            heartbeat.cancel()
+
+        await complete_job(job_id, result)
+        self._counters["succeeded"] += 1
+        log.info("job_succeeded")
+
+    async def _heartbeat(self, job_id: UUID) -> None:
+        interval = max(1.0, self.lock_timeout / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await touch_job(job_id, self.worker_id)
+            except Exception as e:
+                self.logger.warning("job_heartbeat_failed", job_id=str(job_id), error=str(e))
+
+    async def _reap(self) -> None:
+        interval = max(self.poll_interval, self.lock_timeout / 2)
+        while not self._stopping.is_set():
+            try:
+                released = await requeue_stale_jobs(self.lock_timeout)
+                if released:
+                    self.logger.warning("stale_jobs_requeued", count=released)
+            except Exception as e:
+                self.logger.error("stale_job_reap_failed", error=str(e))
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": self.running
+        }
+
+
+# Global in-process worker pool (started by the FastAPI lifespan)
+job_worker_pool = JobWorkerPool(
+    concurrency=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+    lock_timeout=settings.JOB_LOCK_TIMEOUT
+)
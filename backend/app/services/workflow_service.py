@@ -4,14 +4,15 @@ LangGraph Workflow Orchestration
 Defines the agent workflow using LangGraph StateGraph.
 """
 
-from typing import TypedDict, Optional, List, Any
+from typing import TypedDict, Optional, List, Any, AsyncIterator, Dict, Tuple
 from langgraph.graph import StateGraph, END
+import asyncio
 import structlog
 
 from app.agents.intent_router import IntentRouterAgent
 from app.agents.denial_classifier import DenialClassifierAgent
 from app.agents.policy_retrieval import PolicyRetrievalAgent
-from app.agents.appeal_drafting import AppealDraftingAgent
+from app.agents.appeal_drafting import AppealDraftingAgent, policy_citations
 from app.agents.compliance_guardrail import ComplianceGuardrailAgent
 from app.core.config import settings
 
@@ -36,6 +37,7 @@ class WorkflowState(TypedDict):
     
     # Classifier
     category: Optional[str]
+    classification_path: Optional[str]  # "rule" or "llm"
     
     # Retrieval
     policy_excerpts: Optional[List[dict]]
@@ -61,37 +63,104 @@ class WorkflowState(TypedDict):
 
 
 # =====================================================
-# Agent Node Functions
+# Shared Agents
 # =====================================================
 
-async def route_intent(state: WorkflowState) -> WorkflowState:
-    """Execute IntentRouterAgent."""
-    agent = IntentRouterAgent()
-    return await agent.execute(state)
+class WorkflowAgents:
+    """
+    The agent instances used by the workflow.
+    
+    Agents hold only configuration and pooled clients (LLM providers,
+    embeddings), while all per-claim data lives in the workflow state,
+    so one set of instances is shared safely by concurrent requests.
+    Pass replacements to inject fakes in tests.
+    """
+    
+    def __init__(
+        self,
+        router: Optional[IntentRouterAgent] = None,
+        classifier: Optional[DenialClassifierAgent] = None,
+        retriever: Optional[PolicyRetrievalAgent] = None,
+        drafter: Optional[AppealDraftingAgent] = None,
+        guardrail: Optional[ComplianceGuardrailAgent] = None
+    ):
+        self.router = router or IntentRouterAgent()
+        self.classifier = classifier or DenialClassifierAgent()
+        self.retriever = retriever or PolicyRetrievalAgent()
+        self.drafter = drafter or AppealDraftingAgent()
+        self.guardrail = guardrail or ComplianceGuardrailAgent()
 
 
-async def classify_denial(state: WorkflowState) -> WorkflowState:
-    """Execute DenialClassifierAgent."""
-    agent = DenialClassifierAgent()
-    return await agent.execute(state)
+_agents: Optional[WorkflowAgents] = None
+_compiled_workflow = None
 
 
-async def retrieve_policies(state: WorkflowState) -> WorkflowState:
-    """Execute PolicyRetrievalAgent."""
-    agent = PolicyRetrievalAgent()
-    return await agent.execute(state)
+def init_workflow(agents: Optional[WorkflowAgents] = None) -> None:
+    """
+    Build the shared agents and compile the graph once.
+    
+    Called from the FastAPI lifespan at startup; tests can call it
+    with a WorkflowAgents of fakes to swap the whole pipeline.
+    """
+    global _agents, _compiled_workflow
+    
+    _agents = agents or WorkflowAgents()
+    _compiled_workflow = create_workflow(_agents)
+    
+    logger.info("workflow_initialized")
 
 
-async def draft_appeal(state: WorkflowState) -> WorkflowState:
-    """Execute AppealDraftingAgent."""
-    agent = AppealDraftingAgent()
-    return await agent.execute(state)
+def reset_workflow() -> None:
+    """Drop the shared agents and graph (rebuilt lazily on next use)."""
+    global _agents, _compiled_workflow
+    
+    _agents = None
+    _compiled_workflow = None
 
 
-async def check_compliance(state: WorkflowState) -> WorkflowState:
-    """Execute ComplianceGuardrailAgent."""
-    agent = ComplianceGuardrailAgent()
-    return await agent.execute(state)
+def get_agents() -> WorkflowAgents:
+    """Return the shared agents, building them on first use."""
+    if _agents is None:
+        init_workflow()
+    return _agents
+
+
+def get_workflow():
+    """Return the compiled graph, compiling it on first use."""
+    if _compiled_workflow is None:
+        init_workflow()
+    return _compiled_workflow
+
+
+# =====================================================
+# Parallel Analysis
+# =====================================================
+
+async def classify_and_retrieve(agents: WorkflowAgents, state: WorkflowState) -> WorkflowState:
+    """
+    Run DenialClassifier and PolicyRetrieval concurrently, then join.
+    
+    Retrieval only reads claim_data (payer and denial description), never
+    the category, so neither agent depends on the other. Each branch runs
+    on its own shallow copy of the state; fields a branch changed are
+    merged back, and errors from both branches are combined.
+    """
+    branches = await asyncio.gather(
+        agents.classifier.execute(dict(state)),
+        agents.retriever.execute(dict(state))
+    )
+    
+    errors = [state["error"]] if state.get("error") else []
+    for branch_state in branches:
+        for key, value in branch_state.items():
+            if key == "error":
+                if value and value not in errors:
+                    errors.append(value)
+            elif value is not state.get(key):
+                state[key] = value
+    
+    state["error"] = "; ".join(errors) if errors else None
+    return state
 
 
 # =====================================================
@@ -103,7 +172,7 @@ def should_proceed(state: WorkflowState) -> str:
     decision = state.get("routing_decision", "reject")
     
     if decision == "proceed":
-        return "classify"
+        return "analyze"
     else:
         return "end"
 
@@ -127,49 +196,70 @@ def is_compliant(state: WorkflowState) -> str:
 # Build Workflow Graph
 # =====================================================
 
-def create_workflow() -> StateGraph:
+def create_workflow(agents: Optional[WorkflowAgents] = None) -> StateGraph:
     """
     Build the LangGraph workflow.
     
     Flow:
     1. IntentRouter → validates input
-    2. DenialClassifier → categorizes denial
-    3. PolicyRetrieval → finds relevant policies (RAG)
-    4. AppealDrafting → generates letter
-    5. ComplianceGuardrail → validates draft
-    6. (Conditional retry if non-compliant)
-    7. Human approval (outside workflow)
+    2. In parallel, joined before drafting:
+       - DenialClassifier → categorizes denial
+       - PolicyRetrieval → finds relevant policies (RAG)
+    3. AppealDrafting → generates letter
+    4. ComplianceGuardrail → validates draft
+    5. (Conditional retry if non-compliant)
+    6. Human approval (outside workflow)
+    
+    Args:
+        agents: Agent instances bound into the nodes (defaults to new ones)
     
     Returns:
         Compiled StateGraph
     """
+    agents = agents or WorkflowAgents()
+    
+    async def route_intent(state: WorkflowState) -> WorkflowState:
+        """Execute IntentRouterAgent."""
+        return await agents.router.execute(state)
+    
+    async def analyze_claim(state: WorkflowState) -> WorkflowState:
+        """Execute DenialClassifierAgent and PolicyRetrievalAgent in parallel."""
+        return await classify_and_retrieve(agents, state)
+    
+    async def draft_appeal(state: WorkflowState) -> WorkflowState:
+        """Execute AppealDraftingAgent."""
+        # A failed compliance check means this is a re-draft
+        if state.get("compliance_passed") is False:
+            state["retry_count"] = state.get("retry_count", 0) + 1
+        return await agents.drafter.execute(state)
+    
+    async def check_compliance(state: WorkflowState) -> WorkflowState:
+        """Execute ComplianceGuardrailAgent."""
+        return await agents.guardrail.execute(state)
+    
     workflow = StateGraph(WorkflowState)
     
     # Add nodes
     workflow.add_node("route", route_intent)
-    workflow.add_node("classify", classify_denial)
-    workflow.add_node("retrieve", retrieve_policies)
+    workflow.add_node("analyze", analyze_claim)
     workflow.add_node("draft", draft_appeal)
     workflow.add_node("compliance", check_compliance)
     
     # Add edges
     workflow.set_entry_point("route")
     
-    # Router → Classifier or End
+    # Router → Classifier + Retrieval (parallel) or End
     workflow.add_conditional_edges(
         "route",
         should_proceed,
         {
-            "classify": "classify",
+            "analyze": "analyze",
             "end": END
         }
     )
     
-    # Classifier → Retrieval
-    workflow.add_edge("classify", "retrieve")
-    
-    # Retrieval → Drafting
-    workflow.add_edge("retrieve", "draft")
+    # Classifier + Retrieval → Drafting
+    workflow.add_edge("analyze", "draft")
     
     # Drafting → Compliance
     workflow.add_edge("draft", "compliance")
@@ -192,23 +282,15 @@ def create_workflow() -> StateGraph:
 # Workflow Execution
 # =====================================================
 
-async def execute_workflow(claim_data: dict) -> WorkflowState:
-    """
-    Execute the full agent workflow.
-    
-    Args:
-        claim_data: Claim input data
-        
-    Returns:
-        Final workflow state
-    """
-    # Initialize state
-    initial_state: WorkflowState = {
+def build_initial_state(claim_data: dict) -> WorkflowState:
+    """Create an empty workflow state for a claim."""
+    return {
         "claim_data": claim_data,
         "routing_decision": None,
         "validation_message": None,
         "missing_fields": None,
         "category": None,
+        "classification_path": None,
         "policy_excerpts": None,
         "draft_text": None,
         "policy_citations": None,
@@ -220,9 +302,23 @@ async def execute_workflow(claim_data: dict) -> WorkflowState:
         "user_feedback": None,
         "error": None
     }
+
+
+async def execute_workflow(claim_data: dict) -> WorkflowState:
+    """
+    Execute the full agent workflow.
     
-    # Create and execute workflow
-    workflow = create_workflow()
+    Args:
+        claim_data: Claim input data
+        
+    Returns:
+        Final workflow state
+    """
+    # Initialize state
+    initial_state = build_initial_state(claim_data)
+    
+    # Reuse the graph compiled at startup
+    workflow = get_workflow()
     
     logger.info("workflow_started", claim_id=claim_data.get("claim_id"))
     
@@ -234,3 +330,55 @@ async def execute_workflow(claim_data: dict) -> WorkflowState:
         logger.error("workflow_failed", error=str(e), claim_id=claim_data.get("claim_id"))
         initial_state["error"] = str(e)
         return initial_state
+
+
+async def stream_draft(claim_data: dict) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run the workflow with a token-streamed drafting step.
+    
+    Routing, classification and retrieval run as usual; the draft is then
+    streamed from the LLM and checked once by the compliance guardrail
+    (no automatic re-draft, since the reviewer already saw the text).
+    
+    Args:
+        claim_data: Claim input data
+        
+    Yields:
+        (event, data) pairs: "context", "token"*, then "done" or "error"
+    """
+    agents = get_agents()
+    state = build_initial_state(claim_data)
+    claim_id = claim_data.get("claim_id")
+    
+    logger.info("draft_stream_started", claim_id=claim_id)
+    
+    state = await agents.router.execute(state)
+    if state.get("routing_decision") != "proceed":
+        yield "error", {"message": state.get("validation_message")}
+        return
+    
+    state = await classify_and_retrieve(agents, state)
+    
+    yield "context", {
+        "category": state.get("category"),
+        "policy_citations": policy_citations(state.get("policy_excerpts") or [])
+    }
+    
+    async for token in agents.drafter.astream_draft(state):
+        yield "token", {"text": token}
+    
+    if not state.get("draft_text"):
+        yield "error", {"message": state.get("error") or "Appeal drafting failed"}
+        return
+    
+    state = await agents.guardrail.execute(state)
+    
+    logger.info("draft_stream_completed", claim_id=claim_id)
+    
+    yield "done", {
+        "category": state.get("category"),
+        "draft_text": state.get("draft_text"),
+        "policy_citations": state.get("policy_citations"),
+        "compliance_passed": state.get("compliance_passed"),
+        "compliance_issues": state.get("compliance_issues")
+    }
@@ -0,0 +1,109 @@
+"""
+ClaimPilot™ Standalone Job Worker
+
+Processes queued jobs without serving HTTP, so worker capacity can be
+scaled independently of API replicas:
+
+    python -m app.worker --concurrency 8
+
+Set JOB_WORKERS=0 on API replicas to leave all processing to these
+workers.
+"""
+
+from typing import List, Optional
+import argparse
+import asyncio
+import signal
+import structlog
+
+from app.core.config import settings
+from app.core.provider_registry import provider_registry
+from app.core.embedding_factory import close_embedding_provider
+from app.db.session import async_engine
+from app.db.retrieval_cache import retrieval_cache
+from app.db.vector_store import EmbeddingDimensionError, policy_vector_store
+from app.services.workflow_service import init_workflow, reset_workflow
+from app.services.job_queue import JobWorkerPool
+# Imported for their job handler registration
+from app.services import claim_processing, batch_processing, embedding_jobs  # noqa: F401
+from app.db import vector_indexes  # noqa: F401
+
+structlog.configure(
+    processors=[
+        structlog.stdlib.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.JSONRenderer()
+    ],
+    wrapper_class=structlog.stdlib.BoundLogger,
+    logger_factory=structlog.stdlib.LoggerFactory(),
+)
+
+logger = structlog.get_logger()
+
+
+async def run_worker(concurrency: int, job_types: Optional[List[str]] = None) -> None:
+    """Run a worker pool until SIGINT/SIGTERM."""
+    try:
+        provider_registry.warm_up()
+    except ValueError as e:
+        logger.warning("llm_provider_warmup_failed", error=str(e))
+    init_workflow()
+
+    # Fail fast on an embedding dimension mismatch; other errors are
+    # retried when a job first needs the pool
+    try:
+        await policy_vector_store.open()
+    except EmbeddingDimensionError:
+        raise
+    except Exception as e:
+        logger.warning("vector_store_open_failed", error=str(e))
+
+    pool = JobWorkerPool(
+        concurrency=concurrency,
+        poll_interval=settings.JOB_POLL_INTERVAL,
+        lock_timeout=settings.JOB_LOCK_TIMEOUT,
+        job_types=job_types
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await pool.start()
+    logger.info("worker_started", worker_id=pool.worker_id, job_types=job_types)
+
+    try:
+        await stop.wait()
+    finally:
+        await pool.stop()
+        reset_workflow()
+        await provider_registry.aclose()
+        await close_embedding_provider()
+        await retrieval_cache.close()
+        await policy_vector_store.close()
+        await async_engine.dispose()
+        logger.info("worker_stopped", **pool.stats())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ClaimPilot background job worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=max(1, settings.JOB_WORKERS),
+        help="Number of concurrent worker tasks"
+    )
+    parser.add_argument(
+        "--job-type",
+        action="append",
+        dest="job_types",
+        help="Only process this job type (repeatable)"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run_worker(args.concurrency, args.job_types))
+
+
+if __name__ == "__main__":
+    main()
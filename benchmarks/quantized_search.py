@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+ClaimPilot™ Quantized Vector Search Benchmark
+
+Compares policy vector search at full precision against the halfvec and
+binary-quantized first passes (re-ranked at full precision) on the
+policies already embedded in the configured database.
+
+For each precision and candidate multiplier it reports:
+- recall@k against an exact full-precision scan
+- mean and p95 query latency
+- average stored bytes per embedding and total index size
+
+Requires a running database with embedded policies and the quantized
+columns/indexes from database/init.sql.
+
+Usage:
+    python benchmarks/quantized_search.py [--samples 100] [--top-k 3] [--multipliers 1 2 4 8]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import settings  # noqa: E402
+from app.db import vector_indexes  # noqa: E402
+from app.db.vector_store import PRECISIONS, policy_vector_store  # noqa: E402
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+async def main(samples: int, top_k: int, multipliers: list, payer_name: str) -> None:
+    try:
+        storage = await vector_indexes.storage_report()
+
+        print("=" * 80)
+        print(f"Quantized vector search ({storage['rows']} embedded policies, "
+              f"{samples} sample queries, recall@{top_k})")
+        print("=" * 80)
+        print(f"{'precision':<9} {'mult':>4} {'recall':>7} {'mean ms':>9} {'p95 ms':>9} "
+              f"{'bytes/row':>10} {'index size':>11}")
+
+        exact_latency = None
+        for precision in PRECISIONS:
+            memory = storage["precisions"][precision]
+            for multiplier in ([1] if precision == "full" else multipliers):
+                report = await vector_indexes.recall_report(
+                    payer_name=payer_name,
+                    sample_size=samples,
+                    top_k=top_k,
+                    ef_search=[settings.VECTOR_HNSW_EF_SEARCH],
+                    probes=[],
+                    precision=precision,
+                    rerank_multiplier=multiplier
+                )
+                if not report["points"]:
+                    print("No embedded policies to sample; run generate-embeddings first.")
+                    return
+
+                exact_latency = report["exact_latency_ms"]
+                point = report["points"][0]
+                print(
+                    f"{precision:<9} {multiplier if precision != 'full' else '-':>4} "
+                    f"{point['recall']:>7.3f} {point['mean_latency_ms']:>9.3f} {point['p95_latency_ms']:>9.3f} "
+                    f"{memory['avg_bytes_per_row']:>10.0f} {format_bytes(memory['index_bytes']):>11}"
+                )
+
+        print(f"Exact scan (ground truth): mean {exact_latency:.3f} ms")
+        print(f"hnsw.ef_search={settings.VECTOR_HNSW_EF_SEARCH}")
+    finally:
+        await policy_vector_store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=settings.RAG_TOP_K)
+    parser.add_argument("--multipliers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--payer", default=None, help="Sample queries from one payer only")
+    args = parser.parse_args()
+    asyncio.run(main(args.samples, args.top_k, args.multipliers, args.payer))
@@ -6,8 +6,17 @@ CREATE EXTENSION IF NOT EXISTS vector;
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
 -- Drop tables if they exist (for development only)
+DROP TABLE IF EXISTS embedding_runs CASCADE;
+DROP TABLE IF EXISTS batch_items CASCADE;
+DROP TABLE IF EXISTS batch_runs CASCADE;
+DROP TABLE IF EXISTS jobs CASCADE;
+DROP TABLE IF EXISTS embedding_cache CASCADE;
+DROP TABLE IF EXISTS llm_response_cache CASCADE;
 DROP TABLE IF EXISTS audit_logs CASCADE;
 DROP TABLE IF EXISTS appeals CASCADE;
+DROP TABLE IF EXISTS retrieval_cache_entries CASCADE;
+DROP TABLE IF EXISTS policy_versions CASCADE;
+DROP TABLE IF EXISTS policy_chunks CASCADE;
 DROP TABLE IF EXISTS policies CASCADE;
 DROP TABLE IF EXISTS claims CASCADE;
 
@@ -34,18 +43,234 @@ CREATE INDEX idx_claims_created_at ON claims(created_at);
 -- =====================================================
 -- TABLE: policies
 -- =====================================================
+-- LIST-partitioned by payer: retrieval is always scoped to one payer, so
+-- each payer's heap and indexes are scanned in isolation. Payers without
+-- a partition land in policies_default; ensure_policy_partition() moves
+-- a payer into its own partition (the application calls it before
+-- inserting policies for a new payer).
 CREATE TABLE policies (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     payer_name VARCHAR(200) NOT NULL,
     section_title VARCHAR(500) NOT NULL,
     section_text TEXT NOT NULL,
-    embedding vector(1536), -- OpenAI text-embedding-3-small dimension
+    embedding vector(1536), -- Must match the embedding model dimension (EMBEDDING_DIMENSION; 1536 = text-embedding-3-small, 768 = nomic-embed-text); checked at startup
+    -- Compact copies for the quantized ANN first pass (VECTOR_SEARCH_PRECISION; pgvector >= 0.7)
+    embedding_half halfvec(1536) GENERATED ALWAYS AS (CAST(embedding AS halfvec(1536))) STORED,
+    embedding_bits bit(1536) GENERATED ALWAYS AS (CAST(binary_quantize(embedding) AS bit(1536))) STORED,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(section_title, '')), 'A') ||
+        setweight(to_tsvector('english', section_text), 'B')
+    ) STORED, -- Full-text leg of hybrid retrieval (RETRIEVAL_MODE=hybrid)
     metadata JSONB, -- Additional metadata (version, effective_date, etc.)
-    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, payer_name) -- Must include the partition key
+) PARTITION BY LIST (payer_name);
+
+CREATE TABLE policies_default PARTITION OF policies DEFAULT;
 
+-- Indexes on the partitioned table are created on every partition,
+-- including ones added later
 CREATE INDEX idx_policies_payer_name ON policies(payer_name);
-CREATE INDEX idx_policies_embedding ON policies USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- HNSW needs no training data, so it can be built on the empty table.
+-- Resize or add per-payer indexes via /api/v1/admin/vector-indexes
+CREATE INDEX idx_policies_embedding_hnsw ON policies USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX idx_policies_embedding_hnsw_halfvec ON policies USING hnsw (embedding_half halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX idx_policies_embedding_hnsw_binary ON policies USING hnsw (embedding_bits bit_hamming_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX idx_policies_search_vector ON policies USING GIN (search_vector);
+
+-- =====================================================
+-- TABLE: policy_chunks
+-- =====================================================
+-- Overlapping, token-bounded pieces of each policy section (written by
+-- the embed_policies job), searched when RETRIEVAL_GRANULARITY=chunk.
+-- section_title is copied from the parent so citations need no join.
+-- Partitioned like policies; ensure_policy_partition() creates both.
+CREATE TABLE policy_chunks (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    policy_id UUID NOT NULL,
+    payer_name VARCHAR(200) NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    section_title VARCHAR(500) NOT NULL,
+    chunk_text TEXT NOT NULL,
+    token_count INTEGER NOT NULL,
+    embedding vector(1536), -- Same model and dimension as policies.embedding
+    embedding_half halfvec(1536) GENERATED ALWAYS AS (CAST(embedding AS halfvec(1536))) STORED,
+    embedding_bits bit(1536) GENERATED ALWAYS AS (CAST(binary_quantize(embedding) AS bit(1536))) STORED,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(section_title, '')), 'A') ||
+        setweight(to_tsvector('english', chunk_text), 'B')
+    ) STORED,
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, payer_name),
+    UNIQUE (policy_id, payer_name, chunk_index),
+    FOREIGN KEY (policy_id, payer_name) REFERENCES policies(id, payer_name) ON DELETE CASCADE
+) PARTITION BY LIST (payer_name);
+
+CREATE TABLE policy_chunks_default PARTITION OF policy_chunks DEFAULT;
+
+CREATE INDEX idx_policy_chunks_embedding_hnsw ON policy_chunks USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX idx_policy_chunks_embedding_hnsw_halfvec ON policy_chunks USING hnsw (embedding_half halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX idx_policy_chunks_embedding_hnsw_binary ON policy_chunks USING hnsw (embedding_bits bit_hamming_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX idx_policy_chunks_search_vector ON policy_chunks USING GIN (search_vector);
+
+-- Deterministic, identifier-safe partition name for a payer
+CREATE OR REPLACE FUNCTION policy_partition_name(p_payer TEXT)
+RETURNS TEXT AS $$
+    SELECT format(
+        'policies_%s_%s',
+        left(trim(BOTH '_' FROM regexp_replace(lower(p_payer), '[^a-z0-9]+', '_', 'g')), 40),
+        left(md5(p_payer), 8)
+    );
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION policy_chunk_partition_name(p_payer TEXT)
+RETURNS TEXT AS $$
+    SELECT 'policy_chunks' || substr(policy_partition_name(p_payer), length('policies') + 1);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Create a payer's policies and policy_chunks partitions (idempotent),
+-- moving its rows out of the default partitions
+CREATE OR REPLACE FUNCTION ensure_policy_partition(p_payer TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    v_partition TEXT := policy_partition_name(p_payer);
+BEGIN
+    IF to_regclass(v_partition) IS NOT NULL THEN
+        RETURN v_partition;
+    END IF;
+
+    -- Serialize concurrent creators of the same payer's partition
+    PERFORM pg_advisory_xact_lock(hashtext('policies:' || p_payer));
+    IF to_regclass(v_partition) IS NOT NULL THEN
+        RETURN v_partition;
+    END IF;
+
+    -- A new partition may not overlap rows left in the default partition.
+    -- Generated columns are recomputed on re-insert, so they are not copied.
+    -- Chunks are saved first: deleting the policies cascades to them.
+    CREATE TEMP TABLE moving_policies AS
+        SELECT id, payer_name, section_title, section_text, embedding, metadata, indexed_at
+        FROM policies_default
+        WHERE payer_name = p_payer;
+    CREATE TEMP TABLE moving_chunks AS
+        SELECT id, policy_id, payer_name, chunk_index, section_title, chunk_text, token_count, embedding, indexed_at
+        FROM policy_chunks_default
+        WHERE payer_name = p_payer;
+    DELETE FROM policies_default WHERE payer_name = p_payer;
+
+    EXECUTE format('CREATE TABLE %I PARTITION OF policies FOR VALUES IN (%L)', v_partition, p_payer);
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF policy_chunks FOR VALUES IN (%L)',
+        policy_chunk_partition_name(p_payer), p_payer
+    );
+
+    INSERT INTO policies (id, payer_name, section_title, section_text, embedding, metadata, indexed_at)
+        SELECT id, payer_name, section_title, section_text, embedding, metadata, indexed_at
+        FROM moving_policies;
+    INSERT INTO policy_chunks (id, policy_id, payer_name, chunk_index, section_title, chunk_text, token_count, embedding, indexed_at)
+        SELECT id, policy_id, payer_name, chunk_index, section_title, chunk_text, token_count, embedding, indexed_at
+        FROM moving_chunks;
+    DROP TABLE moving_policies;
+    DROP TABLE moving_chunks;
+
+    RETURN v_partition;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Give every payer in the default partition with at least p_min_rows
+-- policies its own partition
+CREATE OR REPLACE FUNCTION rebalance_policy_partitions(p_min_rows INTEGER DEFAULT 1)
+RETURNS TABLE (payer TEXT, partition_name TEXT, moved_rows BIGINT) AS $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT d.payer_name, count(*) AS row_count
+        FROM policies_default d
+        GROUP BY d.payer_name
+        HAVING count(*) >= p_min_rows
+        ORDER BY d.payer_name
+    LOOP
+        payer := r.payer_name;
+        partition_name := ensure_policy_partition(r.payer_name);
+        moved_rows := r.row_count;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- TABLES: policy_versions, retrieval_cache_entries
+-- =====================================================
+-- Per-payer change counter behind the retrieval result cache
+-- (RETRIEVAL_CACHE_ENABLED). Any statement that inserts, updates
+-- (including re-embedding) or deletes a payer's policies bumps its
+-- version, drops its persisted cache entries and notifies
+-- 'policy_changes' so API processes drop their in-memory entries.
+CREATE TABLE policy_versions (
+    payer_name VARCHAR(200) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Prewarmed retrieval results (prewarm_retrieval_cache job)
+CREATE TABLE retrieval_cache_entries (
+    payer_name VARCHAR(200) NOT NULL,
+    namespace VARCHAR(64) NOT NULL, -- Hash of the embedding model and retrieval settings
+    category VARCHAR(50) NOT NULL, -- Provisional (rule table) category
+    bucket BIGINT NOT NULL, -- SimHash of the query embedding
+    policy_version BIGINT NOT NULL, -- policy_versions.version the results were computed against
+    results JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (payer_name, namespace, category, bucket)
+);
+
+CREATE OR REPLACE FUNCTION bump_policy_versions()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_payers TEXT[];
+    v_payer TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT payer_name) INTO v_payers FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT payer_name) INTO v_payers FROM old_rows;
+    ELSE
+        SELECT array_agg(DISTINCT payer_name) INTO v_payers
+        FROM (SELECT payer_name FROM old_rows UNION SELECT payer_name FROM new_rows) changed;
+    END IF;
+
+    IF v_payers IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO policy_versions (payer_name, version, updated_at)
+        SELECT payer, 1, now() FROM unnest(v_payers) AS payer
+    ON CONFLICT (payer_name) DO UPDATE
+        SET version = policy_versions.version + 1, updated_at = now();
+
+    DELETE FROM retrieval_cache_entries WHERE payer_name = ANY(v_payers);
+
+    -- Delivered on commit
+    FOREACH v_payer IN ARRAY v_payers LOOP
+        PERFORM pg_notify('policy_changes', json_build_object('payer', v_payer)::text);
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level with transition tables: one bump per payer per
+-- statement, however many rows (e.g. a page of re-embedded policies)
+CREATE TRIGGER trg_policies_version_insert AFTER INSERT ON policies
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_policy_versions();
+CREATE TRIGGER trg_policies_version_update AFTER UPDATE ON policies
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_policy_versions();
+CREATE TRIGGER trg_policies_version_delete AFTER DELETE ON policies
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_policy_versions();
 
 -- =====================================================
 -- TABLE: appeals
@@ -88,6 +313,121 @@ CREATE INDEX idx_audit_logs_claim_id ON audit_logs(claim_id);
 CREATE INDEX idx_audit_logs_agent_name ON audit_logs(agent_name);
 CREATE INDEX idx_audit_logs_created_at ON audit_logs(created_at);
 
+-- =====================================================
+-- TABLE: llm_response_cache
+-- =====================================================
+-- Persistent tier for deterministic (temperature 0) LLM responses
+CREATE TABLE llm_response_cache (
+    cache_key VARCHAR(64) PRIMARY KEY, -- SHA-256 of provider/model/params/prompts
+    provider VARCHAR(50) NOT NULL,
+    model VARCHAR(200) NOT NULL,
+    response TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX idx_llm_response_cache_expires_at ON llm_response_cache(expires_at);
+
+-- =====================================================
+-- TABLE: embedding_cache
+-- =====================================================
+-- Persistent tier of the query-embedding cache (EMBEDDING_CACHE_PERSISTENT)
+CREATE TABLE embedding_cache (
+    cache_key VARCHAR(64) PRIMARY KEY, -- SHA-256 of provider, model, dimension, normalized text
+    provider VARCHAR(50) NOT NULL,
+    model VARCHAR(200) NOT NULL,
+    dimension INTEGER NOT NULL,
+    embedding BYTEA NOT NULL, -- float32 little-endian
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- =====================================================
+-- TABLE: jobs
+-- =====================================================
+-- Durable work queue; workers claim rows with FOR UPDATE SKIP LOCKED
+CREATE TABLE jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_type VARCHAR(50) NOT NULL, -- process_claim, ...
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, succeeded, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    result JSONB,
+    error TEXT,
+    locked_by VARCHAR(200), -- host:pid of the claiming worker
+    locked_at TIMESTAMP,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- delayed retries
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX idx_jobs_job_type ON jobs(job_type);
+CREATE INDEX idx_jobs_status ON jobs(status);
+-- Keeps the claim query an index scan over only the runnable rows
+CREATE INDEX idx_jobs_queued ON jobs(run_after, created_at) WHERE status = 'queued';
+CREATE INDEX idx_jobs_running_locked_at ON jobs(locked_at) WHERE status = 'running';
+
+-- =====================================================
+-- TABLE: batch_runs
+-- =====================================================
+CREATE TABLE batch_runs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_id UUID REFERENCES jobs(id) ON DELETE SET NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, completed, failed
+    selection JSONB NOT NULL DEFAULT '{}'::jsonb, -- claim_ids count or filter used
+    concurrency INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX idx_batch_runs_status ON batch_runs(status);
+
+-- =====================================================
+-- TABLE: batch_items
+-- =====================================================
+CREATE TABLE batch_items (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    batch_id UUID NOT NULL REFERENCES batch_runs(id) ON DELETE CASCADE,
+    claim_id VARCHAR(100) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, succeeded, failed
+    appeal_id UUID,
+    category VARCHAR(50),
+    error TEXT,
+    finished_at TIMESTAMP,
+    CONSTRAINT uq_batch_items_batch_claim UNIQUE (batch_id, claim_id)
+);
+
+-- Resuming a batch scans only its pending items
+CREATE INDEX idx_batch_items_batch_status ON batch_items(batch_id, status);
+
+-- =====================================================
+-- TABLE: embedding_runs
+-- =====================================================
+CREATE TABLE embedding_runs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_id UUID REFERENCES jobs(id) ON DELETE SET NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, completed, failed
+    payer_name VARCHAR(200), -- NULL = all payers
+    reembed BOOLEAN NOT NULL DEFAULT FALSE, -- FALSE = only policies without an embedding or chunks
+    model VARCHAR(200) NOT NULL,
+    batch_size INTEGER NOT NULL,
+    concurrency INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    embedded INTEGER NOT NULL DEFAULT 0,
+    resume_after UUID, -- every policy id <= resume_after is done
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX idx_embedding_runs_status ON embedding_runs(status);
+
 -- =====================================================
 -- TRIGGERS: Updated timestamp
 -- =====================================================
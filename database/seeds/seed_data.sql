@@ -109,6 +109,9 @@ INSERT INTO policies (payer_name, section_title, section_text, metadata) VALUES
     '{"version": "2024.4", "effective_date": "2024-04-01", "category": "Administrative"}'::jsonb
 );
 
+-- Move each seeded payer out of the default partition into its own
+SELECT * FROM rebalance_policy_partitions();
+
 -- =====================================================
 -- SEED: Sample Appeals (for testing UI)
 -- =====================================================
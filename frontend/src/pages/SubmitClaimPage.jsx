@@ -32,7 +32,7 @@ export default function SubmitClaimPage() {
             console.log('Claim created:', claimResponse.data);
 
             setProcessing(true);
-            const workflowResponse = await claimsAPI.process(formData.claim_id);
+            const workflowResponse = await claimsAPI.processAndWait(formData.claim_id);
 
             setResult(workflowResponse.data);
             setProcessing(false);
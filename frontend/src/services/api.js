@@ -15,6 +15,31 @@ export const claimsAPI = {
     list: (params) => api.get('/claims/', { params }),
     get: (claimId) => api.get(`/claims/${claimId}`),
     process: (claimId) => api.post('/claims/process', { claim_id: claimId }),
+    // Queue the workflow and poll its job until the result is ready
+    processAndWait: async (claimId, { intervalMs = 1500, timeoutMs = 300000 } = {}) => {
+        const accepted = await api.post('/claims/process', { claim_id: claimId });
+        if (!accepted.data.job_id) {
+            return accepted;
+        }
+
+        const deadline = Date.now() + timeoutMs;
+        while (Date.now() < deadline) {
+            await new Promise((resolve) => setTimeout(resolve, intervalMs));
+            const job = await jobsAPI.get(accepted.data.job_id);
+            if (job.data.status === 'succeeded') {
+                return { ...job, data: job.data.result };
+            }
+            if (job.data.status === 'failed') {
+                throw new Error(job.data.error || 'Claim processing failed');
+            }
+        }
+        throw new Error('Timed out waiting for claim processing');
+    },
+};
+
+// Jobs API
+export const jobsAPI = {
+    get: (jobId) => api.get(`/jobs/${jobId}`),
 };
 
 // Appeals API
@@ -29,7 +54,8 @@ export const appealsAPI = {
 // Policies API
 export const policiesAPI = {
     list: (params) => api.get('/policies/', { params }),
-    generateEmbeddings: () => api.post('/policies/generate-embeddings'),
+    generateEmbeddings: (options) => api.post('/policies/generate-embeddings', options),
+    getEmbeddingRun: (runId) => api.get(`/policies/embedding-runs/${runId}`),
     listPayers: () => api.get('/policies/payers'),
 };
 
@@ -386,6 +386,183 @@ def test_env_example():
 
 test("Environment Configuration Template", test_env_example)
 
+# TEST 18: Denial Code Rule Table
+def test_denial_rule_table():
+    """Test CARC rules resolve common codes and defer contradictions to the LLM."""
+    from app.agents.classification_rules import denial_rule_table
+    
+    match = denial_rule_table.lookup(
+        "CO-197",
+        "Precertification/authorization/notification absent."
+    )
+    if match is None or match.category != "Authorization" or not match.is_decisive("high"):
+        return False
+    
+    # Description points at a different category: not decisive
+    contradicted = denial_rule_table.lookup("CO-197", "Exact duplicate claim/service.")
+    if contradicted is None or contradicted.is_decisive("high"):
+        return False
+    
+    # Codes that disagree on the category fall back to the LLM
+    if denial_rule_table.lookup("CO-97, CO-96", "") is not None:
+        return False
+    
+    return True
+
+test("Denial Code Rule Table", test_denial_rule_table)
+
+# TEST 19: Policy Chunker
+def test_policy_chunker():
+    """Test sections split into bounded, overlapping chunks."""
+    from app.core.chunking import chunk_text, count_tokens
+    
+    short = chunk_text("Prior authorization is required.", max_tokens=50, overlap=10)
+    if len(short) != 1 or short[0].text != "Prior authorization is required.":
+        return False
+    
+    text = " ".join(f"Rule {i} requires documentation of medical necessity." for i in range(40))
+    chunks = chunk_text(text, max_tokens=50, overlap=10)
+    if len(chunks) < 2 or any(chunk.token_count > 50 for chunk in chunks):
+        return False
+    if any(count_tokens(chunk.text) != chunk.token_count for chunk in chunks):
+        return False
+    
+    # Consecutive chunks share text, and the last one reaches the end
+    if not all(chunks[i].text[-20:] in chunks[i + 1].text for i in range(len(chunks) - 1)):
+        return False
+    return chunks[-1].text.endswith(text[-20:])
+
+test("Policy Chunker", test_policy_chunker)
+
+# TEST 20: Batched Policy Search
+def test_search_many():
+    """Test search_many sends one unnest + LATERAL statement per mode and maps rows back by ord."""
+    import asyncio
+    from app.db.vector_store import PolicyVectorStore, search_many_policies_sql, hybrid_search_many_policies_sql
+    
+    sql = hybrid_search_many_policies_sql("halfvec", "chunk")
+    if "unnest($1::vector[], $2::text[], $3::text[]) WITH ORDINALITY" not in sql or "CROSS JOIN LATERAL" not in sql:
+        return False
+    # The per-query body reads the unnested columns, not the scalar placeholders
+    if "payer_name = $2" in sql or "q.query_payer" not in sql or "q.query_text" not in sql:
+        return False
+    if "unnest($1::vector[], $2::text[]) WITH ORDINALITY" not in search_many_policies_sql("full"):
+        return False
+    
+    class FakePool:
+        def __init__(self):
+            self.calls = []
+        
+        async def fetch(self, sql, *args):
+            self.calls.append((sql, args))
+            return [
+                {"ord": ord_, "id": f"p{ord_}", "section_title": "T", "section_text": "S",
+                 "payer_name": payer, "similarity": 0.5, "rrf_score": 0.03}
+                for ord_, payer in enumerate(args[1], 1)
+            ]
+    
+    store = PolicyVectorStore("postgresql://test", mode="hybrid", rrf_k=60, hybrid_candidates=20)
+    store._pool = FakePool()
+    results = asyncio.run(store.search_many(
+        [([0.1, 0.2], "Aetna", "prior auth"), ([0.3, 0.4], "Cigna", None), ([0.5, 0.6], "BCBS", "CO-197")],
+        5
+    ))
+    
+    calls = {sql: args for sql, args in store._pool.calls}
+    hybrid_args = calls.get(store._hybrid_search_many_sql)
+    vector_args = calls.get(store._search_many_sql)
+    if len(store._pool.calls) != 2 or hybrid_args is None or vector_args is None:
+        return False
+    if list(hybrid_args[1]) != ["Aetna", "BCBS"] or list(hybrid_args[2]) != ["prior auth", "CO-197"]:
+        return False
+    if list(hybrid_args[3:]) != [20, 60, 5] or list(vector_args[1]) != ["Cigna"] or list(vector_args[2:]) != [5]:
+        return False
+    
+    return [excerpts[0]["payer_name"] for excerpts in results] == ["Aetna", "Cigna", "BCBS"]
+
+test("Batched Policy Search", test_search_many)
+
+# TEST 21: Policy Search Batching
+def test_search_batching():
+    """Test concurrent searches are coalesced into one search_many call and failures reach every caller."""
+    import asyncio
+    from app.db.search_batching import BatchingPolicyRetriever
+    
+    class FakeStore:
+        def __init__(self, fail=False):
+            self.fail = fail
+            self.calls = []
+        
+        async def search_many(self, queries, top_k):
+            self.calls.append((list(queries), top_k))
+            if self.fail:
+                raise RuntimeError("database unavailable")
+            return [[{"payer_name": payer}] for _, payer, _ in queries]
+    
+    async def run(store):
+        retriever = BatchingPolicyRetriever(store, max_batch_size=8, max_inflight=1)
+        return await asyncio.gather(
+            *(retriever.search([0.1], payer, 5, "query") for payer in ("Aetna", "Cigna", "BCBS")),
+            return_exceptions=True
+        )
+    
+    store = FakeStore()
+    results = asyncio.run(run(store))
+    if len(store.calls) != 1 or len(store.calls[0][0]) != 3 or store.calls[0][1] != 5:
+        return False
+    if [excerpts[0]["payer_name"] for excerpts in results] != ["Aetna", "Cigna", "BCBS"]:
+        return False
+    
+    failing = FakeStore(fail=True)
+    failures = asyncio.run(run(failing))
+    return len(failing.calls) == 1 and all(isinstance(result, RuntimeError) for result in failures)
+
+test("Policy Search Batching", test_search_batching)
+
+# TEST 22: Compliance Pre-checks
+def test_compliance_precheck():
+    """Test deterministic draft checks catch length, reference, tone and citation failures."""
+    from app.agents.compliance_rules import precheck_draft
+    
+    claim = {"claim_id": "CLM-2024-001", "denial_code": "CO-197"}
+    titles = ["Section 5.2 - Prior Authorization Requirements"]
+    body = " ".join(
+        "The consultation was scheduled as an emergency and documented in the medical record."
+        for _ in range(18)
+    )
+    draft = (
+        "Dear Appeals Committee,\n\n"
+        "I am writing to appeal the denial of claim CLM-2024-001 under denial code CO 197.\n\n"
+        f"{body}\n\n"
+        "Section 5.2 exempts emergency consultations from prior authorization. "
+        "We respectfully request that you reconsider this denial.\n\n"
+        "Sincerely,\nBilling Department"
+    )
+    
+    result = precheck_draft(draft, claim, titles)
+    if not result.passed or result.cited_sections != titles:
+        return False
+    
+    # Too short, missing the claim ID and the closing
+    if precheck_draft("Dear Appeals Committee, please reconsider CO-197.", claim, titles).passed:
+        return False
+    
+    # Banned tone and a citation of an unprovided section
+    hostile = draft.replace("We respectfully", "This is unacceptable. We")
+    if precheck_draft(hostile, claim, titles).passed:
+        return False
+    if precheck_draft(draft, claim, ["Section 5.21 - Referrals"]).passed:
+        return False
+    
+    # "writing to appeal" in the body is not a salutation
+    no_greeting = precheck_draft(draft.replace("Dear Appeals Committee,\n\n", ""), claim, titles)
+    if no_greeting.checks["section_greeting"]:
+        return False
+    
+    return True
+
+test("Compliance Pre-checks", test_compliance_precheck)
+
 # Print Summary
 print()
 print("=" * 80)